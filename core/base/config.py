@@ -1,12 +1,35 @@
 from typing import Dict
 
 CELERY_BEAT_SCHEDULE_CONFIG: Dict[str, Dict] = {
+    # NOTE: Scheduling is driven by capacity change events, this is only a safety net
     "process_enqueued_deployments": {
         "task": "core.tasks.consume_enqueued_deployments",
-        "schedule": 60.0,  # Runs every 60 seconds
+        "schedule": 300.0,  # Runs every 5 minutes
     },
     "process_terminal_deployments": {
         "task": "core.tasks.consume_terminal_deployments",
         "schedule": 120.0,  # Runs every 2 minutes
     },
+    "expire_queued_deployments": {
+        "task": "core.tasks.expire_queued_deployments",
+        "schedule": 60.0,  # Runs every minute
+    },
+    "reconcile_deployment_queues": {
+        "task": "core.tasks.reconcile_deployment_queues",
+        "schedule": 600.0,  # Runs every 10 minutes
+    },
+    # NOTE: A drift is only fixed once found by two consecutive runs, i.e. within 10 to 20 minutes
+    "reconcile_capacity_ledgers": {
+        "task": "core.tasks.reconcile_capacity_ledgers",
+        "schedule": 600.0,  # Runs every 10 minutes
+    },
+    # NOTE: Events are relayed on commit, this only catches up on the ones which failed to
+    "relay_lifecycle_events": {
+        "task": "core.tasks.relay_lifecycle_events",
+        "schedule": 60.0,  # Runs every minute
+    },
+    "archive_finalized_deployments": {
+        "task": "core.tasks.archive_finalized_deployments",
+        "schedule": 3600.0,  # Runs every hour, moves a bounded no. of batches per run
+    },
 }
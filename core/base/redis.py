@@ -1,4 +1,7 @@
+from typing import Optional
+
 import redis
+from django.conf import settings
 
 
 class RedisClient:
@@ -17,17 +20,28 @@ class RedisClient:
 
         return cls._instance
 
-    def __init__(self, host="localhost", port=6379, db=0):
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, db: Optional[int] = None):
         """
-        Initialize Redis connection if not already initialized.
+        Initialize Redis connection if not already initialized, defaults to the `REDIS_*` settings.
         """
 
         if not self._initialized:
             self._initialized = True
             self.connection = redis.StrictRedis(
-                host=host, port=port, db=db, decode_responses=True
+                host=host or settings.REDIS_HOST,
+                port=port or settings.REDIS_PORT,
+                db=settings.REDIS_DB if db is None else db,
+                decode_responses=True,
             )
 
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Drops the singleton, the next instantiation connects again (with its own arguments).
+        """
+
+        cls._instance = None
+
     def get_connection(self):
         """
         Returns the Redis connection instance.
@@ -49,9 +63,105 @@ class RedisClient:
 
         return self.connection.zrangebyscore(key, min_score, max_score)
 
-    def z_rem(self, key: str, member: str) -> int:
+    def z_rem(self, key: str, *members: str) -> int:
+        """
+        Removes one or more members from a sorted set.
+        """
+
+        return self.connection.zrem(key, *members)
+
+    def z_card(self, key: str) -> int:
+        """
+        Returns the number of members in a sorted set.
+        """
+
+        return self.connection.zcard(key)
+
+    def s_add(self, key: str, *members: str) -> int:
+        """
+        Adds one or more members to a set.
+        """
+
+        return self.connection.sadd(key, *members)
+
+    def s_rem(self, key: str, *members: str) -> int:
+        """
+        Removes one or more members from a set.
+        """
+
+        return self.connection.srem(key, *members)
+
+    def s_members(self, key: str) -> set:
+        """
+        Returns all members of a set.
+        """
+
+        return self.connection.smembers(key)
+
+    def pipeline(self, transaction: bool = True):
+        """
+        Returns a pipeline to batch multiple commands in a single round trip.
+        """
+
+        return self.connection.pipeline(transaction=transaction)
+
+    def register_script(self, script: str):
+        """
+        Registers a Lua script, returns a callable which executes it on the server.
+        """
+
+        return self.connection.register_script(script)
+
+    def set_nx(self, key: str, value: str, ttl_ms: int) -> bool:
+        """
+        Sets the key only if it does not exist, with an expiry (in milliseconds).
+        """
+
+        return bool(self.connection.set(key, value, nx=True, px=ttl_ms))
+
+    def delete(self, *keys: str) -> int:
+        """
+        Deletes one or more keys.
+        """
+
+        return self.connection.delete(*keys)
+
+    def h_get_all(self, key: str) -> dict:
+        """
+        Returns all fields and values of a hash.
+        """
+
+        return self.connection.hgetall(key)
+
+    def x_group_create(self, key: str, group: str, last_id: str = "0") -> bool:
+        """
+        Creates a consumer group on a stream (and the stream itself if missing), False if it already exists.
+        """
+
+        try:
+            return bool(self.connection.xgroup_create(key, group, id=last_id, mkstream=True))
+        except redis.ResponseError as exception:
+            if "BUSYGROUP" not in str(exception):
+                raise
+            return False
+
+    def x_read_group(self, key: str, group: str, consumer: str, count: int, block_ms: Optional[int] = None) -> list:
+        """
+        Reads new messages of a stream for a consumer of the group.
+        """
+
+        return self.connection.xreadgroup(group, consumer, {key: ">"}, count=count, block=block_ms)
+
+    def x_ack(self, key: str, group: str, *message_ids: str) -> int:
+        """
+        Acknowledges messages of a stream for the group.
+        """
+
+        return self.connection.xack(key, group, *message_ids)
+
+    def x_auto_claim(self, key: str, group: str, consumer: str, min_idle_ms: int, count: int) -> list:
         """
-        Removes a member from a sorted set.
+        Transfers messages pending for longer than `min_idle_ms` (on any consumer) to the consumer.
         """
 
-        return self.connection.zrem(key, member)
+        return self.connection.xautoclaim(key, group, consumer, min_idle_time=min_idle_ms, count=count)
@@ -0,0 +1,41 @@
+from typing import Set
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+from core.base.redis import RedisClient
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Test runner isolating the test run from the Redis DB (and the Celery broker) used by the app.
+
+    Tests run against `REDIS_TEST_DB` with capacity change events turned off, tests which need events
+    turn them on explicitly (and mock the dispatch). Keys created during the run are deleted afterwards,
+    the ones which were already there are left untouched.
+    """
+
+    def setup_test_environment(self, **kwargs) -> None:
+        super().setup_test_environment(**kwargs)
+
+        if settings.REDIS_TEST_DB == settings.REDIS_DB:
+            raise RuntimeError(f"REDIS_TEST_DB ({settings.REDIS_TEST_DB}) must not be the app's Redis DB")
+
+        self.__redis_db, self.__events_enabled = settings.REDIS_DB, settings.SCHEDULER_EVENTS_ENABLED
+        settings.REDIS_DB, settings.SCHEDULER_EVENTS_ENABLED = settings.REDIS_TEST_DB, False
+
+        # Connect again, now to the test DB
+        RedisClient.reset()
+        self.__existing_keys: Set[str] = set(RedisClient().get_connection().scan_iter(count=1000))
+
+    def teardown_test_environment(self, **kwargs) -> None:
+        connection = RedisClient().get_connection()
+        created_keys = [key for key in connection.scan_iter(count=1000) if key not in self.__existing_keys]
+
+        for index in range(0, len(created_keys), 1000):
+            connection.delete(*created_keys[index:index + 1000])
+
+        settings.REDIS_DB, settings.SCHEDULER_EVENTS_ENABLED = self.__redis_db, self.__events_enabled
+        RedisClient.reset()
+
+        super().teardown_test_environment(**kwargs)
@@ -12,3 +12,31 @@ class DeploymentStatus(TextChoices):
     QUEUED = "QUEUED", "In Queue"
     IN_PROGRESS = "IN_PROGRESS", "In Progress"
     COMPLETED = "COMPLETED", "Deployment Completed"
+    CANCELLED = "CANCELLED", "Deployment Cancelled"
+    PARKED = "PARKED", "Parked, Exceeds Cluster Capacity"
+
+
+# Terminal statuses reported for deployments, their resources are released by the cleanup (Cancel releases right away)
+TERMINAL_DEPLOYMENT_STATUSES = (DeploymentStatus.COMPLETED, DeploymentStatus.FAILED)
+
+# Statuses of deployments waiting to start, only queued ones are visible to the scheduler (parked ones can't fit yet)
+WAITING_DEPLOYMENT_STATUSES = (DeploymentStatus.QUEUED, DeploymentStatus.PARKED)
+
+
+class PlacementStrategy(TextChoices):
+    GREEDY = "GREEDY", "Greedy By Priority"
+    BACKFILL = "BACKFILL", "Backfill With Head Of Queue Reservation"
+    KNAPSACK = "KNAPSACK", "Priority Weighted Knapsack"
+    BEST_FIT_DECREASING = "BEST_FIT_DECREASING", "Best Fit Decreasing"
+
+
+class LifecycleEvent(TextChoices):
+    DEPLOYMENT_QUEUED = "deployment.queued", "Deployment Queued"
+    DEPLOYMENT_STARTED = "deployment.started", "Deployment Started"
+    DEPLOYMENT_PARKED = "deployment.parked", "Deployment Parked Till Its Cluster Is Resized"
+    DEPLOYMENT_PREEMPTED = "deployment.preempted", "Deployment Preempted And Queued Again"
+    DEPLOYMENT_COMPLETED = "deployment.completed", "Deployment Completed"
+    DEPLOYMENT_FAILED = "deployment.failed", "Deployment Failed"
+    DEPLOYMENT_CANCELLED = "deployment.cancelled", "Deployment Cancelled"
+    ALLOCATION_CREATED = "allocation.created", "Resources Allocated"
+    ALLOCATION_RELEASED = "allocation.released", "Resources Released"
@@ -4,3 +4,7 @@ class ResourceDoesNotExistsError(Exception):
 
 class BadRequestError(Exception):
     pass
+
+
+class InsufficientResourcesError(BadRequestError):
+    pass
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from core.models.resource import Cluster
+from core.services.cluster import ClusterService
+from core.utils.ledger import CapacityLedger
+
+
+class Command(BaseCommand):
+    """
+    Recomputes clusters' allocated resource counters from the allocation table and reports drift.
+    """
+
+    help = "Recomputes clusters' allocated resource counters from the allocation table and reports drift"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--dry-run", action="store_true", help="Only report the drift, don't fix it")
+        parser.add_argument(
+            "--reset-ledger",
+            action="store_true",
+            help="Re-seed Redis capacity ledgers from the DB (in-flight reservations are dropped)",
+        )
+
+    def handle(self, *args, **options) -> None:
+        _ = args
+        drifts = ClusterService().reconcile_allocated_counters(dry_run=options["dry_run"])
+
+        for drift in drifts:
+            self.stdout.write(
+                f"Cluster {drift['cluster_id']}: counters {drift['counters']} != allocated {drift['allocated']}"
+            )
+
+        action = "found" if options["dry_run"] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{len(drifts)} clusters with drifted counters {action}"))
+
+        if options["reset_ledger"] and not options["dry_run"]:
+            ledger = CapacityLedger()
+            clusters = Cluster.objects.filter(is_deleted=False)
+
+            for cluster in clusters:
+                ledger.seed(cluster, overwrite=True)
+
+            self.stdout.write(self.style.SUCCESS(f"Capacity ledgers of {len(clusters)} clusters re-seeded"))
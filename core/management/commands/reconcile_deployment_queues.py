@@ -0,0 +1,48 @@
+from json import dumps
+
+from django.core.management.base import BaseCommand
+
+from core.utils.reconciliation import DRIFTS, QueueReconciler
+
+
+class Command(BaseCommand):
+    """
+    Reconciles the Redis deployment queues with the DB and reports drift.
+    """
+
+    help = (
+        "Restores QUEUED deployments missing from their cluster's Redis queue (e.g. after Redis lost data), "
+        "removes queue entries which aren't QUEUED in the DB and reports the drift"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--dry-run", action="store_true", help="Only report the drift, don't fix it")
+        parser.add_argument("--json", action="store_true", help="Prints the report as JSON")
+
+    def handle(self, *args, **options) -> None:
+        _ = args
+        report = QueueReconciler().reconcile(dry_run=options["dry_run"])
+
+        if options["json"]:
+            self.stdout.write(dumps(report, indent=2))
+            return
+
+        for cluster_id, drift in report["drift"].items():
+            self.stdout.write(f"Cluster {cluster_id}: " + ", ".join(f"{drift[name]} {name}" for name in DRIFTS))
+
+        for cluster_id in report["dropped"]:
+            action = "to be dropped" if options["dry_run"] else "dropped"
+            self.stdout.write(f"Cluster {cluster_id}: does not exist or is deleted, queue {action}")
+
+        if report["skipped"]:
+            self.stdout.write(
+                self.style.WARNING(f"Clusters {', '.join(report['skipped'])} are being scheduled, skipped")
+            )
+
+        action = "found" if options["dry_run"] else "fixed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report['clusters']} queues ({report['queued']} queued deployments) reconciled in "
+                f"{report['duration_ms']}ms, drift {action}: " + ", ".join(f"{report[name]} {name}" for name in DRIFTS)
+            )
+        )
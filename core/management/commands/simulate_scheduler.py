@@ -0,0 +1,146 @@
+from json import dumps, loads
+from pathlib import Path
+from typing import Set
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from pydantic import ValidationError
+
+from core.base.redis import RedisClient
+from core.constants import PlacementStrategy
+from core.utils.placement import get_placement_engine
+from core.utils.simulation import SchedulerSimulation, WorkloadTrace, synthetic_trace
+
+
+class Command(BaseCommand):
+    """
+    Replays a workload trace against the scheduler in isolation and reports its performance.
+    """
+
+    help = (
+        "Replays a recorded (--trace) or synthetic (--synthetic) workload against the scheduler, "
+        "on a throwaway test DB and a dedicated Redis DB, and reports its performance"
+    )
+
+    def add_arguments(self, parser) -> None:
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument("--trace", type=Path, help="JSON workload trace, with `clusters` and `deployments`")
+        source.add_argument("--synthetic", type=int, metavar="DEPLOYMENTS", help="No. of deployments to generate")
+
+        parser.add_argument("--clusters", type=int, default=1, help="No. of clusters of the synthetic workload")
+        parser.add_argument("--arrival-rate", type=float, default=0.05, help="Synthetic arrivals per second")
+        parser.add_argument("--seed", type=int, default=None, help="Seed of the synthetic workload")
+        parser.add_argument("--export-trace", type=Path, help="Writes the (synthetic) workload to this file")
+
+        parser.add_argument("--strategy", choices=PlacementStrategy.values, help="Placement strategy to simulate")
+        parser.add_argument("--preemption", action="store_true", help="Enables preemption")
+
+        parser.add_argument("--redis-host", default="localhost")
+        parser.add_argument("--redis-port", type=int, default=6379)
+        parser.add_argument("--redis-db", type=int, default=15, help="Empty Redis DB for the simulation, cleaned up afterwards")
+
+        parser.add_argument("--json", action="store_true", help="Prints the report as JSON")
+
+    def handle(self, *args, **options) -> None:
+        _ = args
+
+        if options["redis_db"] in self.reserved_redis_dbs():
+            raise CommandError(f"Redis DB {options['redis_db']} is used by the application or Celery, use a dedicated DB")
+
+        if options["trace"]:
+            try:
+                trace = WorkloadTrace.model_validate(loads(options["trace"].read_text()))
+            except (OSError, ValueError, ValidationError) as exception:
+                raise CommandError(f"Invalid workload trace, Err: {exception}") from exception
+        else:
+            trace = synthetic_trace(
+                deployments=options["synthetic"],
+                clusters=options["clusters"],
+                seed=options["seed"],
+                arrival_rate=options["arrival_rate"],
+            )
+
+        if options["export_trace"]:
+            options["export_trace"].write_text(trace.model_dump_json(indent=2))
+
+        strategy = options["strategy"] or settings.SCHEDULER_PLACEMENT_STRATEGY
+        engine = get_placement_engine(strategy)
+
+        RedisClient.reset()
+        redis = RedisClient(host=options["redis_host"], port=options["redis_port"], db=options["redis_db"])
+
+        # NOTE: Everything in the DB is deleted afterwards, so it must not hold anything to begin with
+        keys = redis.get_connection().dbsize()
+        if keys:
+            RedisClient.reset()
+            raise CommandError(f"Redis DB {options['redis_db']} already holds {keys} keys, use an empty dedicated DB")
+
+        database = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        try:
+            # Cycles are driven by the simulation, capacity change events must not reach the real workers
+            with override_settings(SCHEDULER_EVENTS_ENABLED=False, SCHEDULER_PREEMPTION_ENABLED=options["preemption"]):
+                report = SchedulerSimulation(trace=trace, engine=engine).run()
+        finally:
+            connection.creation.destroy_test_db(database, verbosity=0)
+            self.clean_up(redis)
+            RedisClient.reset()
+
+        report["strategy"] = strategy
+
+        if options["json"]:
+            self.stdout.write(dumps(report, indent=2))
+            return
+
+        self.write_report(report)
+
+    def reserved_redis_dbs(self) -> Set[int]:
+        """
+        Returns the Redis DBs used by the application and by Celery (broker and results).
+        """
+
+        reserved = {settings.REDIS_DB}
+        for url in (settings.CELERY_BROKER_URL, settings.CELERY_RESULT_BACKEND):
+            if url.startswith("redis"):
+                reserved.add(int(urlparse(url).path.lstrip("/") or 0))
+
+        return reserved
+
+    def clean_up(self, redis: RedisClient) -> None:
+        """
+        Deletes the keys written by the simulation, the DB was empty before it.
+        """
+
+        connection = redis.get_connection()
+        keys = list(connection.scan_iter(count=1000))
+
+        for index in range(0, len(keys), 1000):
+            connection.delete(*keys[index : index + 1000])
+
+    def write_report(self, report: dict) -> None:
+        """
+        Prints the report in a human readable form.
+        """
+
+        deployments = report["deployments"]
+        self.stdout.write(self.style.SUCCESS(f"Simulated {deployments['submitted']} deployments with {report['strategy']}"))
+        self.stdout.write(
+            f"Completed: {deployments['completed']}, Never scheduled: {deployments['unscheduled']}, "
+            f"Preemptions: {deployments['preemptions']}"
+        )
+        self.stdout.write(f"Makespan: {report['makespan']}s")
+        self.stdout.write(
+            f"Throughput: {report['throughput_per_hour']} deployments/hour, "
+            f"{report['placements_per_second']} placements/second of scheduling"
+        )
+        self.stdout.write(
+            "Utilization: " + ", ".join(f"{resource.upper()} {share:.1%}" for resource, share in report["utilization"].items())
+        )
+        self.stdout.write("Queue wait (s): " + ", ".join(f"{key} {value}" for key, value in report["queue_wait"].items()))
+        self.stdout.write(
+            "Cycle latency (ms): " + ", ".join(f"{key} {value}" for key, value in report["cycle_latency_ms"].items())
+        )
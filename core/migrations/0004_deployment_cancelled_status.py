@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_remove_resourceallocation_allocated_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="deployment",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("FAILED", "Failed"),
+                    ("QUEUED", "In Queue"),
+                    ("IN_PROGRESS", "In Progress"),
+                    ("COMPLETED", "Deployment Completed"),
+                    ("CANCELLED", "Deployment Cancelled"),
+                ],
+                default="QUEUED",
+                max_length=32,
+            ),
+        ),
+    ]
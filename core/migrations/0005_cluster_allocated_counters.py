@@ -0,0 +1,68 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:23
+
+from django.db import migrations, models
+
+
+def backfill_allocated_counters(apps, schema_editor):
+    """
+    Computes allocated counters of existing clusters from their live allocations.
+
+    Releasing resources used to add the released amounts back to the cluster's total capacity (and soft delete
+    the allocation), so the totals are inflated by the released allocations, which are taken back off here.
+    """
+
+    _ = schema_editor
+    Cluster = apps.get_model("core", "Cluster")
+    ResourceAllocation = apps.get_model("core", "ResourceAllocation")
+
+    def sum_by_cluster(is_deleted: bool) -> dict:
+        allocations = (
+            ResourceAllocation.objects.filter(is_deleted=is_deleted)
+            .values("cluster_id")
+            .annotate(
+                cpu=models.Sum("cpu_allocated"),
+                ram=models.Sum("ram_allocated"),
+                gpu=models.Sum("gpu_allocated"),
+            )
+        )
+        return {allocation["cluster_id"]: allocation for allocation in allocations}
+
+    allocated, released = sum_by_cluster(is_deleted=False), sum_by_cluster(is_deleted=True)
+
+    for cluster in Cluster.objects.filter(id__in=allocated.keys() | released.keys()):
+        live, inflated = allocated.get(cluster.id, {}), released.get(cluster.id, {})
+
+        Cluster.objects.filter(id=cluster.id).update(
+            cpu=max(cluster.cpu - (inflated.get("cpu") or 0), 0),
+            ram=max(cluster.ram - (inflated.get("ram") or 0), 0),
+            gpu=max(cluster.gpu - (inflated.get("gpu") or 0), 0),
+            cpu_allocated=live.get("cpu") or 0,
+            ram_allocated=live.get("ram") or 0,
+            gpu_allocated=live.get("gpu") or 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_deployment_cancelled_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cluster",
+            name="cpu_allocated",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="cluster",
+            name="gpu_allocated",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="cluster",
+            name="ram_allocated",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_allocated_counters, migrations.RunPython.noop),
+    ]
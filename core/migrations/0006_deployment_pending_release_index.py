@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_cluster_allocated_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="deployment",
+            index=models.Index(
+                condition=models.Q(("completed_at__isnull", True)),
+                fields=["status", "cluster"],
+                name="deployment_pending_release_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_deployment_pending_release_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxEvent",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("is_deleted", models.BooleanField(default=False)),
+                ("modified_at", models.DateTimeField(auto_now=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "event",
+                    models.CharField(
+                        choices=[
+                            ("deployment.queued", "Deployment Queued"),
+                            ("deployment.started", "Deployment Started"),
+                            (
+                                "deployment.preempted",
+                                "Deployment Preempted And Queued Again",
+                            ),
+                            ("deployment.completed", "Deployment Completed"),
+                            ("deployment.failed", "Deployment Failed"),
+                            ("deployment.cancelled", "Deployment Cancelled"),
+                            ("allocation.created", "Resources Allocated"),
+                            ("allocation.released", "Resources Released"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("entity_id", models.IntegerField()),
+                ("cluster_id", models.IntegerField()),
+                ("data", models.JSONField(default=dict)),
+                ("published_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("published_at__isnull", True)),
+                        fields=["id"],
+                        name="outbox_unpublished_idx",
+                    )
+                ],
+            },
+        ),
+    ]
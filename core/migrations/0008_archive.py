@@ -0,0 +1,86 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_outboxevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedDeployment",
+            fields=[
+                ("id", models.IntegerField(primary_key=True, serialize=False)),
+                ("priority", models.IntegerField()),
+                ("cpu_required", models.PositiveIntegerField()),
+                ("ram_required", models.PositiveIntegerField()),
+                ("gpu_required", models.PositiveIntegerField()),
+                ("image_path", models.CharField(max_length=512)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("FAILED", "Failed"),
+                            ("QUEUED", "In Queue"),
+                            ("IN_PROGRESS", "In Progress"),
+                            ("COMPLETED", "Deployment Completed"),
+                            ("CANCELLED", "Deployment Cancelled"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("queued_at", models.DateTimeField()),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField()),
+                ("modified_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "cluster",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_deployments",
+                        to="core.cluster",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedResourceAllocation",
+            fields=[
+                ("id", models.IntegerField(primary_key=True, serialize=False)),
+                ("cpu_allocated", models.PositiveIntegerField()),
+                ("ram_allocated", models.PositiveIntegerField()),
+                ("gpu_allocated", models.PositiveIntegerField()),
+                ("created_at", models.DateTimeField()),
+                ("released_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "cluster",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_resource_allocations",
+                        to="core.cluster",
+                    ),
+                ),
+                (
+                    "deployment",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resource_allocation",
+                        to="core.archiveddeployment",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="archiveddeployment",
+            index=models.Index(
+                fields=["cluster", "id"], name="core_archiv_cluster_33b72f_idx"
+            ),
+        ),
+    ]
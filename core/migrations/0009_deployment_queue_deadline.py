@@ -0,0 +1,36 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_archive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archiveddeployment",
+            name="failure_reason",
+            field=models.CharField(blank=True, default="", max_length=256),
+        ),
+        migrations.AddField(
+            model_name="deployment",
+            name="failure_reason",
+            field=models.CharField(blank=True, default="", max_length=256),
+        ),
+        migrations.AddField(
+            model_name="deployment",
+            name="queue_deadline",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="deployment",
+            index=models.Index(
+                condition=models.Q(("queue_deadline__isnull", False)),
+                fields=["status", "queue_deadline"],
+                name="deployment_queue_deadline_idx",
+            ),
+        ),
+    ]
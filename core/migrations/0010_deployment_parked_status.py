@@ -0,0 +1,65 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_deployment_queue_deadline"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="archiveddeployment",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("FAILED", "Failed"),
+                    ("QUEUED", "In Queue"),
+                    ("IN_PROGRESS", "In Progress"),
+                    ("COMPLETED", "Deployment Completed"),
+                    ("CANCELLED", "Deployment Cancelled"),
+                    ("PARKED", "Parked, Exceeds Cluster Capacity"),
+                ],
+                max_length=32,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="deployment",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("FAILED", "Failed"),
+                    ("QUEUED", "In Queue"),
+                    ("IN_PROGRESS", "In Progress"),
+                    ("COMPLETED", "Deployment Completed"),
+                    ("CANCELLED", "Deployment Cancelled"),
+                    ("PARKED", "Parked, Exceeds Cluster Capacity"),
+                ],
+                default="QUEUED",
+                max_length=32,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="outboxevent",
+            name="event",
+            field=models.CharField(
+                choices=[
+                    ("deployment.queued", "Deployment Queued"),
+                    ("deployment.started", "Deployment Started"),
+                    (
+                        "deployment.parked",
+                        "Deployment Parked Till Its Cluster Is Resized",
+                    ),
+                    ("deployment.preempted", "Deployment Preempted And Queued Again"),
+                    ("deployment.completed", "Deployment Completed"),
+                    ("deployment.failed", "Deployment Failed"),
+                    ("deployment.cancelled", "Deployment Cancelled"),
+                    ("allocation.created", "Resources Allocated"),
+                    ("allocation.released", "Resources Released"),
+                ],
+                max_length=32,
+            ),
+        ),
+    ]
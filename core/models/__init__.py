@@ -1,7 +1,9 @@
 from typing import Union
 
 from core.models.abstract import AbstractModel
+from core.models.archive import ArchivedDeployment, ArchivedResourceAllocation
 from core.models.deployment import Deployment
+from core.models.event import OutboxEvent
 from core.models.organization import InviteCode, Membership, Organization
 from core.models.resource import Cluster, ResourceAllocation
 
@@ -11,6 +13,9 @@ Models = Union[
     InviteCode,
     Deployment,
     Organization,
+    OutboxEvent,
     AbstractModel,
     ResourceAllocation,
+    ArchivedDeployment,
+    ArchivedResourceAllocation,
 ]
@@ -0,0 +1,60 @@
+from django.db import models
+
+from core.constants import DeploymentStatus
+from core.models.resource import Cluster
+
+
+class ArchivedDeployment(models.Model):
+    """
+    Cold storage of finalized deployments, moved out of `Deployment` once old enough.
+
+    Rows keep their original id and timestamps, hence no `AbstractModel` (which would stamp them anew).
+    """
+
+    id = models.IntegerField(primary_key=True)  # Original `Deployment` id
+    priority = models.IntegerField()
+    cpu_required = models.PositiveIntegerField()
+    ram_required = models.PositiveIntegerField()
+    gpu_required = models.PositiveIntegerField()
+
+    image_path = models.CharField(max_length=512)
+    cluster = models.ForeignKey(Cluster, on_delete=models.CASCADE, related_name="archived_deployments")
+    status = models.CharField(max_length=32, choices=DeploymentStatus.choices)
+
+    queued_at = models.DateTimeField()
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    failure_reason = models.CharField(max_length=256, blank=True, default="")
+
+    created_at = models.DateTimeField()
+    modified_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["cluster", "id"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"<ArchivedDeployment> {self.id} - {self.status}"
+
+
+class ArchivedResourceAllocation(models.Model):
+    """
+    Cold storage of released allocations, archived along with their deployment.
+    """
+
+    id = models.IntegerField(primary_key=True)  # Original `ResourceAllocation` id
+    cluster = models.ForeignKey(Cluster, on_delete=models.CASCADE, related_name="archived_resource_allocations")
+    deployment = models.OneToOneField(ArchivedDeployment, on_delete=models.CASCADE, related_name="resource_allocation")
+
+    cpu_allocated = models.PositiveIntegerField()
+    ram_allocated = models.PositiveIntegerField()
+    gpu_allocated = models.PositiveIntegerField()
+
+    created_at = models.DateTimeField()
+    released_at = models.DateTimeField()  # i.e. when it was soft deleted
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"<ArchivedResourceAllocation> {self.id}"
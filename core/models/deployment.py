@@ -23,9 +23,26 @@ class Deployment(AbstractModel):
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
+    queue_deadline = models.DateTimeField(null=True, blank=True)  # Fails if still queued by then
+    failure_reason = models.CharField(max_length=256, blank=True, default="")
+
     class Meta:
         indexes = [
             models.Index(fields=["status", "priority", "queued_at"]),
+            # Deployments yet to be finalized, which includes the cleanup backlog i.e. terminal ones with
+            # resources yet to be released. NOTE: Statuses aren't part of the condition, since SQLite only
+            # uses partial indexes whose condition matches the query literally (Django binds the statuses)
+            models.Index(
+                fields=["status", "cluster"],
+                name="deployment_pending_release_idx",
+                condition=models.Q(completed_at__isnull=True),
+            ),
+            # Queued deployments with a deadline, read by the expiry in deadline order
+            models.Index(
+                fields=["status", "queue_deadline"],
+                name="deployment_queue_deadline_idx",
+                condition=models.Q(queue_deadline__isnull=False),
+            ),
         ]
 
     def __str__(self) -> str:
@@ -0,0 +1,26 @@
+from django.db import models
+
+from core.constants import LifecycleEvent
+from core.models.abstract import AbstractModel
+
+
+class OutboxEvent(AbstractModel):
+    """
+    Transactional outbox of lifecycle events, relayed to a Redis Stream once committed.
+    """
+
+    event = models.CharField(max_length=32, choices=LifecycleEvent.choices)
+    entity_id = models.IntegerField()  # Deployment or allocation id, as per the event
+    cluster_id = models.IntegerField()  # Not a foreign key, events outlive the rows they describe
+    data = models.JSONField(default=dict)
+
+    published_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Relay backlog, i.e. events yet to be published
+            models.Index(fields=["id"], name="outbox_unpublished_idx", condition=models.Q(published_at__isnull=True)),
+        ]
+
+    def __str__(self) -> str:
+        return f"<OutboxEvent> {self.id} - {self.event}"
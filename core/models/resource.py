@@ -18,21 +18,20 @@ class Cluster(AbstractModel):
     ram = models.PositiveIntegerField()  # Total RAM in MB
     gpu = models.PositiveIntegerField()  # Total GPU units
 
+    # Resources held by live allocations, kept in sync with `ResourceAllocation` rows
+    cpu_allocated = models.PositiveIntegerField(default=0)
+    ram_allocated = models.PositiveIntegerField(default=0)
+    gpu_allocated = models.PositiveIntegerField(default=0)
+
     def available_resources(self) -> Dict[str, int]:
         """
         Returns the available resources in the cluster.
         """
 
-        allocated = self.resource_allocations.aggregate(
-            cpu_allocated=models.Sum("cpu_allocated"),
-            ram_allocated=models.Sum("ram_allocated"),
-            gpu_allocated=models.Sum("gpu_allocated"),
-        )
-
         return {
-            "cpu": self.cpu - (allocated["cpu_allocated"] or 0),
-            "ram": self.ram - (allocated["ram_allocated"] or 0),
-            "gpu": self.gpu - (allocated["gpu_allocated"] or 0),
+            "cpu": self.cpu - self.cpu_allocated,
+            "ram": self.ram - self.ram_allocated,
+            "gpu": self.gpu - self.gpu_allocated,
         }
 
     def __str__(self) -> str:
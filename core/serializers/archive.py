@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+from core.models.archive import ArchivedDeployment, ArchivedResourceAllocation
+
+
+class ArchivedResourceAllocationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedResourceAllocation
+        exclude = ["deployment"]
+
+
+class ArchivedDeploymentSerializer(serializers.ModelSerializer):
+    resource_allocation = ArchivedResourceAllocationSerializer(read_only=True, default=None)
+
+    class Meta:
+        model = ArchivedDeployment
+        fields = "__all__"
@@ -1,15 +1,24 @@
+from typing import Dict
+
 from rest_framework import serializers
 
 from core.models.resource import Cluster, ResourceAllocation
 
 
 class ClusterSerializer(serializers.ModelSerializer):
-    available_resources = serializers.ReadOnlyField(source="available_resources")
+    available_resources = serializers.SerializerMethodField()
 
     class Meta:
         model = Cluster
         fields = "__all__"
 
+    def get_available_resources(self, cluster: Cluster) -> Dict[str, int]:
+        # Annotated by `ClusterService.list_available`, so it matches what the listing was filtered on
+        if hasattr(cluster, "cpu_available"):
+            return {"cpu": cluster.cpu_available, "ram": cluster.ram_available, "gpu": cluster.gpu_available}
+
+        return cluster.available_resources()
+
 
 class ResourceAllocationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,5 +1,6 @@
-from rest_framework import serializers
+from typing import List, Optional
 
+from rest_framework import serializers
 
 from core.models.deployment import Deployment
 
@@ -8,3 +9,14 @@ class DeploymentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Deployment
         fields = "__all__"
+
+    def __init__(self, *args, fields: Optional[List[str]] = None, **kwargs) -> None:
+        """
+        `fields` limits the serialized fields to the given ones (Sparse fieldsets).
+        """
+
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
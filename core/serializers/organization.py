@@ -10,7 +10,7 @@ class OrganizationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Organization
-        fields = ["id", "name", "created_at", "updated_at", "invite_code"]
+        fields = ["id", "name", "created_at", "modified_at", "invite_code"]
 
     def get_invite_code(self, instance: Organization):
         """
@@ -18,7 +18,11 @@ class OrganizationSerializer(serializers.ModelSerializer):
         Assumes there is at least one active invite code for the organization.
         """
 
-        invite_code = InviteCode.objects.filter(organization=instance, is_active=True).first()
+        # Prefetched by `OrganizationService.list_with_invite_codes`, for listings
+        if hasattr(instance, "active_invite_codes"):
+            invite_code = next(iter(instance.active_invite_codes), None)
+        else:
+            invite_code = InviteCode.objects.filter(organization=instance, is_active=True).first()
 
         return str(invite_code.code) if invite_code else None
 
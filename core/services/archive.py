@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+from logging import getLogger
+from typing import Dict, Optional, Tuple, Union
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from core.constants import TERMINAL_DEPLOYMENT_STATUSES, DeploymentStatus
+from core.errors import ResourceDoesNotExistsError
+from core.models.archive import ArchivedDeployment, ArchivedResourceAllocation
+from core.models.deployment import Deployment
+from core.models.resource import ResourceAllocation
+
+logger = getLogger(__name__)
+
+# Deployments in these statuses are done for good (once `completed_at` is set), so they can be archived
+ARCHIVABLE_STATUSES = (*TERMINAL_DEPLOYMENT_STATUSES, DeploymentStatus.CANCELLED)
+
+
+class ArchiveService:
+    """
+    Service Layer For Archived Deployments And Allocations
+    """
+
+    def archive(self, older_than: Optional[timedelta] = None, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """
+        Moves deployments finalized before `older_than` (defaults to `ARCHIVE_AFTER` setting), along with
+        their released allocations, into the archive tables.
+
+        Rows are moved in batches of `ARCHIVE_BATCH_SIZE`, each in its own transaction, and at most
+        `max_batches` (defaults to `ARCHIVE_MAX_BATCHES` setting) batches are moved per call.
+        """
+
+        threshold = timezone.now() - (older_than or timedelta(seconds=settings.ARCHIVE_AFTER))
+        archived = {"deployments": 0, "allocations": 0}
+
+        for _ in range(max_batches or settings.ARCHIVE_MAX_BATCHES):
+            deployments, allocations = self.archive_batch(threshold=threshold)
+            archived["deployments"] += deployments
+            archived["allocations"] += allocations
+
+            if deployments < settings.ARCHIVE_BATCH_SIZE:
+                break
+
+        logger.info(f"[ArchiveService]: Archived {archived['deployments']} deployments, {archived['allocations']} allocations")
+        return archived
+
+    @transaction.atomic
+    def archive_batch(self, threshold: datetime) -> Tuple[int, int]:
+        """
+        Moves a single batch of deployments finalized before the threshold, returns the no. of deployments and
+        allocations moved.
+        """
+
+        deployments = list(
+            Deployment.objects.select_for_update(of=("self",))
+            .filter(status__in=ARCHIVABLE_STATUSES, completed_at__lt=threshold)
+            # Never archive anything still holding resources
+            .exclude(resource_allocation__is_deleted=False)
+            .order_by("id")[: settings.ARCHIVE_BATCH_SIZE]
+        )
+
+        if not deployments:
+            return 0, 0
+
+        deployment_ids = [deployment.id for deployment in deployments]
+        allocations = list(ResourceAllocation.objects.filter(deployment_id__in=deployment_ids))
+
+        ArchivedDeployment.objects.bulk_create(
+            ArchivedDeployment(
+                id=deployment.id,
+                priority=deployment.priority,
+                cpu_required=deployment.cpu_required,
+                ram_required=deployment.ram_required,
+                gpu_required=deployment.gpu_required,
+                image_path=deployment.image_path,
+                cluster_id=deployment.cluster_id,
+                status=deployment.status,
+                queued_at=deployment.queued_at,
+                started_at=deployment.started_at,
+                completed_at=deployment.completed_at,
+                failure_reason=deployment.failure_reason,
+                created_at=deployment.created_at,
+                modified_at=deployment.modified_at,
+            )
+            for deployment in deployments
+        )
+        ArchivedResourceAllocation.objects.bulk_create(
+            ArchivedResourceAllocation(
+                id=allocation.id,
+                cluster_id=allocation.cluster_id,
+                deployment_id=allocation.deployment_id,
+                cpu_allocated=allocation.cpu_allocated,
+                ram_allocated=allocation.ram_allocated,
+                gpu_allocated=allocation.gpu_allocated,
+                created_at=allocation.created_at,
+                released_at=allocation.modified_at,
+            )
+            for allocation in allocations
+        )
+
+        # NOTE: Hard deletes, `QuerySet.delete` doesn't go through the soft delete of `AbstractModel`
+        ResourceAllocation.objects.filter(deployment_id__in=deployment_ids).delete()
+        Deployment.objects.filter(id__in=deployment_ids).delete()
+
+        return len(deployments), len(allocations)
+
+    def list(self) -> QuerySet[ArchivedDeployment]:
+        """
+        Returns all `ArchivedDeployment`, along with their allocation
+        """
+
+        return ArchivedDeployment.objects.select_related("resource_allocation")
+
+    def get(self, deployment_id: Union[str, int]) -> ArchivedDeployment:
+        """
+        Returns `ArchivedDeployment` if exists
+        """
+
+        try:
+            return self.list().get(id=deployment_id)
+        except ArchivedDeployment.DoesNotExist as exception:
+            raise ResourceDoesNotExistsError("Archived deployment does not exists") from exception
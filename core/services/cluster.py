@@ -1,10 +1,20 @@
+from logging import getLogger
+from typing import Dict, Iterable, List, Union
+
 from django.db import transaction
-from django.db.models import QuerySet
+from django.db.models import F, QuerySet, Sum
+from django.utils import timezone
 
-from core.errors import ResourceDoesNotExistsError
+from core.errors import BadRequestError, ResourceDoesNotExistsError
 from core.models.organization import Organization
-from core.models.resource import Cluster
-from core.types.request import ClusterRequestEntity
+from core.models.resource import Cluster, ResourceAllocation
+from core.services.deployment import DeploymentService
+from core.types.request import ClusterRequestEntity, ClusterResizeRequestEntity
+from core.utils.cache import invalidate_cluster
+from core.utils.events import emit_capacity_changed
+from core.utils.ledger import CapacityLedger
+
+logger = getLogger(__name__)
 
 
 class ClusterService:
@@ -23,7 +33,7 @@ class ClusterService:
         except Organization.DoesNotExist as exception:
             raise ResourceDoesNotExistsError("Organization does not exists") from exception
 
-        return Cluster.objects.create(
+        cluster = Cluster.objects.create(
             cpu=payload.cpu,
             gpu=payload.gpu,
             ram=payload.ram,
@@ -31,6 +41,10 @@ class ClusterService:
             organization=organization,
         )
 
+        emit_capacity_changed(cluster_id=cluster.id)
+        invalidate_cluster(cluster_id=cluster.id, organization_id=organization.id)
+        return cluster
+
     def list(self) -> QuerySet[Cluster]:
         """
         Returns all `Cluster`
@@ -38,6 +52,17 @@ class ClusterService:
 
         return Cluster.objects.all()
 
+    def list_available(self) -> QuerySet[Cluster]:
+        """
+        Returns live `Cluster` annotated with their available resources (`cpu_available`, ...), computed in SQL
+        """
+
+        return Cluster.objects.filter(is_deleted=False).annotate(
+            cpu_available=F("cpu") - F("cpu_allocated"),
+            ram_available=F("ram") - F("ram_allocated"),
+            gpu_available=F("gpu") - F("gpu_allocated"),
+        )
+
     def get(self, cluster_id: str) -> Cluster:
         """
         Returns `Cluster` if exists
@@ -47,3 +72,128 @@ class ClusterService:
             return Cluster.objects.get(id=cluster_id)
         except Exception as exception:
             raise ResourceDoesNotExistsError("Cluster does not exists") from exception
+
+    def resize(self, cluster_id: Union[str, int], payload: ClusterResizeRequestEntity) -> Cluster:
+        """
+        Changes the total capacity of the cluster, it can't shrink below what is allocated.
+
+        The capacity ledger is shifted by the change before the DB write (and shifted back if it fails),
+        so reservations in flight are kept. Parked and queued deployments are re-checked against the new
+        capacity, and the cluster is rescheduled once committed.
+        """
+
+        ledger = CapacityLedger()
+        shifted = False
+
+        try:
+            with transaction.atomic():
+                try:
+                    cluster = Cluster.objects.select_for_update().get(id=cluster_id, is_deleted=False)
+                except Cluster.DoesNotExist as exception:
+                    raise ResourceDoesNotExistsError("Cluster does not exists") from exception
+
+                resized = {
+                    "cpu": payload.cpu or cluster.cpu,
+                    "gpu": payload.gpu or cluster.gpu,
+                    "ram": payload.ram or cluster.ram,
+                }
+
+                for resource, total in resized.items():
+                    allocated = getattr(cluster, f"{resource}_allocated")
+                    if total < allocated:
+                        raise BadRequestError(f"{cluster} has {allocated} {resource.upper()} allocated, can not shrink below it")
+
+                delta = {resource: total - getattr(cluster, resource) for resource, total in resized.items()}
+
+                # Not seeded yet, it'll be seeded from the DB once committed (Dropped, in case seeded meanwhile)
+                shifted = ledger.adjust(cluster_id=cluster.id, **delta)
+                if not shifted:
+                    transaction.on_commit(lambda: ledger.forget(cluster.id), robust=True)
+
+                Cluster.objects.filter(id=cluster.id).update(**resized, modified_at=timezone.now())
+                for resource, total in resized.items():
+                    setattr(cluster, resource, total)
+
+                DeploymentService().recheck_parked(cluster)
+                emit_capacity_changed(cluster_id=cluster.id)
+                invalidate_cluster(cluster_id=cluster.id, organization_id=cluster.organization_id)
+
+        except Exception:
+            # Compensation, the ledger must not keep a resize which was never written
+            if shifted:
+                ledger.adjust(cluster_id=cluster.id, **{resource: -change for resource, change in delta.items()})
+            raise
+
+        logger.info(f"[ClusterService]: {cluster} resized to {resized}")
+        return cluster
+
+    @transaction.atomic
+    def delete(self, cluster_id: Union[str, int]) -> Dict[str, List[int]]:
+        """
+        Soft deletes the cluster, and eagerly purges its work.
+
+        Its unfinished deployments are cancelled and their allocations released in bulk, and its queue
+        is dropped, within the same transaction (Redis once committed). Returns ids of the cancelled and
+        the released deployments.
+        """
+
+        try:
+            cluster = Cluster.objects.select_for_update().get(id=cluster_id, is_deleted=False)
+        except Cluster.DoesNotExist as exception:
+            raise ResourceDoesNotExistsError("Cluster does not exists") from exception
+
+        Cluster.objects.filter(id=cluster.id).update(is_deleted=True, modified_at=timezone.now())
+        invalidate_cluster(cluster_id=cluster.id, organization_id=cluster.organization_id)
+
+        purged = DeploymentService().purge_cluster(cluster)
+
+        logger.info(f"[ClusterService]: {cluster} deleted")
+        return purged
+
+    def available_resources(self, clusters: Iterable[Cluster]) -> Dict[int, Dict[str, int]]:
+        """
+        Returns available resources of many clusters (keyed by cluster id).
+        """
+
+        return {cluster.id: cluster.available_resources() for cluster in clusters}
+
+    @transaction.atomic
+    def reconcile_allocated_counters(self, dry_run: bool = False) -> List[Dict]:
+        """
+        Recomputes allocated counters of all clusters from their live allocations.
+
+        Returns the drift (counter value and the actual allocated value) of the clusters which were out
+        of sync, which are corrected unless it's a `dry_run`.
+        """
+
+        allocations = (
+            ResourceAllocation.objects.filter(is_deleted=False)
+            .values("cluster_id")
+            .annotate(cpu=Sum("cpu_allocated"), ram=Sum("ram_allocated"), gpu=Sum("gpu_allocated"))
+        )
+        actuals = {allocation["cluster_id"]: allocation for allocation in allocations}
+
+        drifts: List[Dict] = []
+        clusters = Cluster.objects.select_for_update().only(
+            "id", "organization_id", "cpu_allocated", "ram_allocated", "gpu_allocated"
+        )
+
+        for cluster in clusters:
+            actual = actuals.get(cluster.id, {})
+            expected = {resource: actual.get(resource) or 0 for resource in ("cpu", "ram", "gpu")}
+            current = {"cpu": cluster.cpu_allocated, "ram": cluster.ram_allocated, "gpu": cluster.gpu_allocated}
+
+            if current == expected:
+                continue
+
+            drifts.append({"cluster_id": cluster.id, "counters": current, "allocated": expected})
+
+            if not dry_run:
+                Cluster.objects.filter(id=cluster.id).update(
+                    cpu_allocated=expected["cpu"],
+                    ram_allocated=expected["ram"],
+                    gpu_allocated=expected["gpu"],
+                )
+                invalidate_cluster(cluster_id=cluster.id, organization_id=cluster.organization_id)
+
+        return drifts
@@ -1,23 +1,47 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from logging import getLogger
-from typing import Dict
+from typing import Dict, Iterable, List, Optional, Set, Union
 
+from django.conf import settings
 from django.db import transaction
-from django.db.models import QuerySet
+from django.db.models import Q, QuerySet
+from django.utils import timezone
 
-from core.base.redis import RedisClient
-from core.constants import DeploymentStatus
-from core.errors import BadRequestError, ResourceDoesNotExistsError
+from core.constants import (
+    TERMINAL_DEPLOYMENT_STATUSES,
+    WAITING_DEPLOYMENT_STATUSES,
+    DeploymentStatus,
+    LifecycleEvent,
+)
+from core.errors import (
+    BadRequestError,
+    InsufficientResourcesError,
+    ResourceDoesNotExistsError,
+)
 from core.models.deployment import Deployment
-from core.models.resource import Cluster
+from core.models.resource import Cluster, ResourceAllocation
 from core.services.resource import ResourceAllocationService
 from core.types.request import (
+    DeploymentStatusTransitionEntity,
     NewDeploymentRequestEntity,
     ResourceAllocationRequestEntity,
 )
+from core.utils.events import emit_capacity_changed
+from core.utils.ledger import CapacityLedger
+from core.utils.outbox import (
+    TERMINAL_EVENTS,
+    LifecycleOutbox,
+    allocation_event,
+    deployment_event,
+)
+from core.utils.queue import DeploymentQueue
 
 logger = getLogger(__name__)
 
+QUEUE_DEADLINE_EXCEEDED: str = "Queue deadline exceeded"
+
+CLUSTER_DELETED: str = "Cluster deleted"
+
 
 class DeploymentService:
     """
@@ -25,7 +49,9 @@ class DeploymentService:
     """
 
     def __init__(self) -> None:
-        self.__redis_client = RedisClient()
+        self.__queue = DeploymentQueue()
+        self.__ledger = CapacityLedger()
+        self.__outbox = LifecycleOutbox()
 
     def has_sufficient_resources(
         self,
@@ -44,10 +70,12 @@ class DeploymentService:
             and available["ram"] >= ram_required
         )
 
-    @transaction.atomic
     def create(self, payload: NewDeploymentRequestEntity) -> Deployment:
         """
         Creates new `Deployment` state
+
+        Resources are reserved on the cluster's capacity ledger before anything is written to the DB,
+        and the reservation is given back if the DB writes fail.
         """
 
         try:
@@ -55,51 +83,281 @@ class DeploymentService:
         except Cluster.DoesNotExist as exception:
             raise ResourceDoesNotExistsError("Cluster does not exists") from exception
 
-        available_resource: Dict[str, int] = cluster.available_resources()
-        has_sufficient_resources = self.has_sufficient_resources(
-            available=available_resource,
-            cpu_required=payload.cpu_required,
-            gpu_required=payload.gpu_required,
-            ram_required=payload.ram_required,
+        # Can never be scheduled as is, so it is kept out of the queue
+        if self.exceeds_capacity(cluster, payload.cpu_required, payload.gpu_required, payload.ram_required):
+            parked = self.park(cluster=cluster, payload=payload)
+            if parked is not None:
+                return parked
+
+        has_sufficient_resources = self.__ledger.reserve(
+            cluster=cluster,
+            cpu=payload.cpu_required,
+            gpu=payload.gpu_required,
+            ram=payload.ram_required,
         )
 
+        queue_deadline = None
+
         if has_sufficient_resources:
-            started_at = datetime.now()
+            started_at = timezone.now()
             status = DeploymentStatus.IN_PROGRESS
         else:
             started_at = None
             status = DeploymentStatus.QUEUED
+            queue_deadline = self.queue_deadline(payload)
+
+        try:
+            with transaction.atomic():
+                new_deployment = Deployment.objects.create(
+                    status=status,
+                    cluster=cluster,
+                    started_at=started_at,
+                    queue_deadline=queue_deadline,
+                    priority=payload.priority,
+                    image_path=payload.image_path,
+                    cpu_required=payload.cpu_required,
+                    gpu_required=payload.gpu_required,
+                    ram_required=payload.ram_required,
+                )
+
+                self.__outbox.record(
+                    deployment_event(
+                        LifecycleEvent.DEPLOYMENT_STARTED if has_sufficient_resources else LifecycleEvent.DEPLOYMENT_QUEUED,
+                        new_deployment,
+                    )
+                )
+
+                # Let's Allocate resources to the deployment if we've sufficient resource
+                if has_sufficient_resources:
+                    ResourceAllocationService().create(
+                        payload=ResourceAllocationRequestEntity(
+                            cluster_id=cluster.id,
+                            deployment_id=new_deployment.id,
+                            cpu_allocated=new_deployment.cpu_required,
+                            gpu_allocated=new_deployment.gpu_required,
+                            ram_allocated=new_deployment.ram_required,
+                        ),
+                        reserved=True,
+                    )
+                else:
+                    # Add deployment to its cluster's Redis queue (once committed) if resources are insufficient
+                    transaction.on_commit(lambda: self.__queue.push(new_deployment), robust=True)
+
+        except Exception:
+            # Compensation, the reservation must not outlive a failed DB write
+            if has_sufficient_resources:
+                self.__ledger.release(
+                    cluster_id=cluster.id,
+                    cpu=payload.cpu_required,
+                    gpu=payload.gpu_required,
+                    ram=payload.ram_required,
+                )
+            raise
+
+        return new_deployment
+
+    def create_many(self, payloads: List[NewDeploymentRequestEntity]) -> List[Dict]:
+        """
+        Creates many `Deployment` at once, e.g. a batch submitted by a CI pipeline.
+
+        Clusters are read once. Resources of each cluster's deployments are reserved on its capacity
+        ledger in a single call (in submission order, each one only if it still fits), then all of
+        them are written in one transaction with a single insert of deployments and one of allocations
+        per cluster. The rest are queued with a single Redis pipeline once committed, or parked if they
+        exceed their cluster's total capacity. Reservations are given back if the DB writes fail.
+
+        Returns a result per payload (in order), the deployment's id and status, or why it was rejected.
+        """
+
+        results: List[Dict] = [{"index": index} for index in range(len(payloads))]
 
-        new_deployment = Deployment.objects.create(
-            status=status,
+        cluster_ids = {int(payload.cluster_id) for payload in payloads if str(payload.cluster_id).isdigit()}
+        clusters = Cluster.objects.filter(is_deleted=False).in_bulk(cluster_ids)
+
+        by_cluster: Dict[int, List[int]] = {}
+        for index, payload in enumerate(payloads):
+            cluster_id = int(payload.cluster_id) if str(payload.cluster_id).isdigit() else None
+
+            if cluster_id not in clusters:
+                results[index]["error"] = "Cluster does not exists"
+            else:
+                by_cluster.setdefault(cluster_id, []).append(index)
+
+        if not by_cluster:
+            return results
+
+        reserved: Dict[int, List[int]] = {}
+        for cluster_id, indices in by_cluster.items():
+            cluster = clusters[cluster_id]
+            feasible = [
+                index
+                for index in indices
+                if not self.exceeds_capacity(
+                    cluster, payloads[index].cpu_required, payloads[index].gpu_required, payloads[index].ram_required
+                )
+            ]
+
+            is_reserved = self.__ledger.reserve_many(
+                cluster=cluster,
+                requests=[(payloads[index].cpu_required, payloads[index].gpu_required, payloads[index].ram_required) for index in feasible],
+            )
+            reserved[cluster_id] = [index for index, is_reserved in zip(feasible, is_reserved) if is_reserved]
+
+        committed = False
+
+        try:
+            with transaction.atomic():
+                # Locked and re-read, so that a concurrent resize either sees the parked ones or is seen by them
+                totals = Cluster.objects.select_for_update().only("cpu", "gpu", "ram").in_bulk(list(by_cluster))
+
+                now = timezone.now()
+                deployments: Dict[int, Deployment] = {}
+
+                for cluster_id, indices in by_cluster.items():
+                    cluster = clusters[cluster_id]
+                    cluster.cpu, cluster.gpu, cluster.ram = totals[cluster_id].cpu, totals[cluster_id].gpu, totals[cluster_id].ram
+                    running = set(reserved[cluster_id])
+
+                    for index in indices:
+                        payload = payloads[index]
+
+                        if index in running:
+                            status, started_at, queue_deadline = DeploymentStatus.IN_PROGRESS, now, None
+                        elif self.exceeds_capacity(cluster, payload.cpu_required, payload.gpu_required, payload.ram_required):
+                            status, started_at, queue_deadline = DeploymentStatus.PARKED, None, self.queue_deadline(payload)
+                        else:
+                            status, started_at, queue_deadline = DeploymentStatus.QUEUED, None, self.queue_deadline(payload)
+
+                        deployments[index] = Deployment(
+                            status=status,
+                            cluster=cluster,
+                            started_at=started_at,
+                            queue_deadline=queue_deadline,
+                            priority=payload.priority,
+                            image_path=payload.image_path,
+                            cpu_required=payload.cpu_required,
+                            gpu_required=payload.gpu_required,
+                            ram_required=payload.ram_required,
+                        )
+
+                Deployment.objects.bulk_create(deployments.values())
+
+                events = {
+                    DeploymentStatus.IN_PROGRESS: LifecycleEvent.DEPLOYMENT_STARTED,
+                    DeploymentStatus.QUEUED: LifecycleEvent.DEPLOYMENT_QUEUED,
+                    DeploymentStatus.PARKED: LifecycleEvent.DEPLOYMENT_PARKED,
+                }
+                self.__outbox.record(*(deployment_event(events[deployment.status], deployment) for deployment in deployments.values()))
+
+                allocation_service = ResourceAllocationService()
+                for cluster_id, indices in reserved.items():
+                    allocation_service.bulk_create(cluster=clusters[cluster_id], deployments=[deployments[index] for index in indices])
+
+                queued = [deployment for deployment in deployments.values() if deployment.status == DeploymentStatus.QUEUED]
+                transaction.on_commit(lambda: self.__queue.push_many(queued), robust=True)
+
+            committed = True
+
+        finally:
+            # Compensation, reservations must not outlive a failed DB write
+            if not committed:
+                for cluster_id, indices in reserved.items():
+                    if indices:
+                        self.__ledger.release(
+                            cluster_id=cluster_id,
+                            cpu=sum(payloads[index].cpu_required for index in indices),
+                            gpu=sum(payloads[index].gpu_required for index in indices),
+                            ram=sum(payloads[index].ram_required for index in indices),
+                        )
+
+        for index, deployment in deployments.items():
+            results[index].update(id=deployment.id, status=deployment.status)
+
+        logger.info(f"[DeploymentService]: {len(deployments)} out of {len(payloads)} deployments created in bulk")
+        return results
+
+    @staticmethod
+    def exceeds_capacity(cluster: Cluster, cpu_required: int, gpu_required: int, ram_required: int) -> bool:
+        """
+        Returns whether the requirement exceeds the cluster's total capacity, i.e. it can never run there.
+        """
+
+        return cpu_required > cluster.cpu or gpu_required > cluster.gpu or ram_required > cluster.ram
+
+    @staticmethod
+    def queue_deadline(payload: NewDeploymentRequestEntity) -> Optional[datetime]:
+        """
+        Returns the time by which the deployment must leave the queue, None if it may wait forever.
+        """
+
+        queue_ttl = payload.queue_ttl or settings.DEPLOYMENT_QUEUE_TTL
+        return timezone.now() + timedelta(seconds=queue_ttl) if queue_ttl else None
+
+    @transaction.atomic
+    def park(self, cluster: Cluster, payload: NewDeploymentRequestEntity) -> Optional[Deployment]:
+        """
+        Creates the deployment as PARKED, as it exceeds the cluster's total capacity.
+
+        Parked deployments are not queued, they are re-checked only when the cluster is resized. The
+        cluster is locked and re-read first, so a concurrent resize either sees the parked deployment
+        or is seen by it, in which case None is returned as the deployment may fit after all.
+        """
+
+        resized = Cluster.objects.select_for_update().only("cpu", "gpu", "ram").get(id=cluster.id)
+        cluster.cpu, cluster.gpu, cluster.ram = resized.cpu, resized.gpu, resized.ram
+
+        if not self.exceeds_capacity(cluster, payload.cpu_required, payload.gpu_required, payload.ram_required):
+            return None
+
+        deployment = Deployment.objects.create(
+            status=DeploymentStatus.PARKED,
             cluster=cluster,
-            started_at=started_at,
+            queue_deadline=self.queue_deadline(payload),
             priority=payload.priority,
             image_path=payload.image_path,
             cpu_required=payload.cpu_required,
             gpu_required=payload.gpu_required,
             ram_required=payload.ram_required,
         )
+        self.__outbox.record(deployment_event(LifecycleEvent.DEPLOYMENT_PARKED, deployment))
 
-        # Let's Allocate resources to the deployment if we've sufficient resource
-        if has_sufficient_resources:
-            ResourceAllocationService().create(
-                payload=ResourceAllocationRequestEntity(
-                    cluster_id=cluster.id,
-                    deployment_id=new_deployment.id,
-                    cpu_allocated=new_deployment.cpu_required,
-                    gpu_allocated=new_deployment.gpu_required,
-                    ram_allocated=new_deployment.ram_required,
-                )
-            )
-        else:
-            # Add deployment to Redis queue if resources are insufficient
-            # NOTE:- -ve value, since higher priority deployments should be scheduled first.
-            self.__redis_client.z_add(
-                "DEPLOYMENT_QUEUE", {new_deployment.id: -new_deployment.priority}
-            )
+        logger.info(f"[DeploymentService]: {deployment} exceeds the capacity of {cluster}, parked")
+        return deployment
 
-        return new_deployment
+    def recheck_parked(self, cluster: Cluster) -> Dict[str, List[int]]:
+        """
+        Re-checks the cluster's waiting deployments against its (resized) total capacity, in the current transaction.
+
+        Parked deployments which fit now are queued again, and queued ones which don't fit anymore are
+        parked, so that the scheduler only ever sees feasible work. Redis queues are updated once
+        committed. Returns ids of the unparked and the parked deployments.
+        """
+
+        exceeds = Q(cpu_required__gt=cluster.cpu) | Q(gpu_required__gt=cluster.gpu) | Q(ram_required__gt=cluster.ram)
+        waiting = Deployment.objects.select_for_update().filter(cluster_id=cluster.id, is_deleted=False)
+
+        unparked = list(waiting.filter(status=DeploymentStatus.PARKED).exclude(exceeds).only("id", "cluster_id", "priority"))
+        parked = list(waiting.filter(exceeds, status=DeploymentStatus.QUEUED).only("id", "cluster_id", "priority"))
+
+        now = timezone.now()
+        for deployments, status in ((unparked, DeploymentStatus.QUEUED), (parked, DeploymentStatus.PARKED)):
+            Deployment.objects.filter(id__in=[deployment.id for deployment in deployments]).update(status=status, modified_at=now)
+            for deployment in deployments:
+                deployment.status = status
+
+        self.__outbox.record(
+            *(deployment_event(LifecycleEvent.DEPLOYMENT_QUEUED, deployment) for deployment in unparked),
+            *(deployment_event(LifecycleEvent.DEPLOYMENT_PARKED, deployment) for deployment in parked),
+        )
+
+        def on_commit() -> None:
+            self.__queue.push_many(unparked)
+            self.__queue.flush({cluster.id: [deployment.id for deployment in parked]})
+
+        transaction.on_commit(on_commit, robust=True)
+
+        logger.info(f"[DeploymentService]: {len(unparked)} deployments unparked and {len(parked)} parked on {cluster}")
+        return {"unparked": [deployment.id for deployment in unparked], "parked": [deployment.id for deployment in parked]}
 
     def list(self) -> QuerySet[Deployment]:
         """
@@ -136,9 +394,434 @@ class DeploymentService:
         ResourceAllocationService().release_resources(deployment_id=deployment.id)
 
         deployment.status = status
-        deployment.completed_at = datetime.now()
+        deployment.completed_at = timezone.now()
 
         deployment.save()
+        self.__outbox.record(deployment_event(TERMINAL_EVENTS[status], deployment))
+
         logger.info(f"[DeploymentService]: {deployment} is completed")
 
         return deployment
+
+    def pending_release(self) -> QuerySet[Deployment]:
+        """
+        Returns terminal deployments whose resources are yet to be released (Served by a partial index).
+        """
+
+        return Deployment.objects.filter(
+            status__in=TERMINAL_DEPLOYMENT_STATUSES,
+            completed_at__isnull=True,
+            is_deleted=False,
+        )
+
+    @transaction.atomic
+    def release_terminal_deployments(self, deployment_ids: Iterable[Union[str, int]]) -> List[int]:
+        """
+        Frees resources of terminal deployments in bulk and marks them as completed.
+
+        Deployments which are not terminal, or were already released, are skipped.
+        Returns ids of the released deployments.
+        """
+
+        deployments = list(
+            self.pending_release()
+            .select_for_update()
+            .filter(id__in=list(deployment_ids))
+            .only("id", "cluster_id", "status", "priority")
+        )
+
+        if not deployments:
+            return []
+
+        released = [deployment.id for deployment in deployments]
+        ResourceAllocationService().bulk_release_resources(deployment_ids=released)
+
+        now = timezone.now()
+        Deployment.objects.filter(id__in=released).update(completed_at=now, modified_at=now)
+
+        self.__outbox.record(*(deployment_event(TERMINAL_EVENTS[deployment.status], deployment) for deployment in deployments))
+
+        logger.info(f"[DeploymentService]: {len(released)} terminal deployments released")
+        return released
+
+    def overdue(self) -> QuerySet[Deployment]:
+        """
+        Returns queued (or parked) deployments past their queue deadline (Served by a partial index).
+        """
+
+        return Deployment.objects.filter(
+            status__in=WAITING_DEPLOYMENT_STATUSES,
+            queue_deadline__lte=timezone.now(),
+            is_deleted=False,
+        )
+
+    def expire_overdue(self, max_batches: Optional[int] = None) -> int:
+        """
+        Fails queued (or parked) deployments past their queue deadline, in batches of `DEPLOYMENT_EXPIRY_BATCH_SIZE`.
+
+        At most `max_batches` (defaults to `DEPLOYMENT_EXPIRY_MAX_BATCHES` setting) batches are expired per call.
+        Returns the no. of deployments expired.
+        """
+
+        expired = 0
+
+        for _ in range(max_batches or settings.DEPLOYMENT_EXPIRY_MAX_BATCHES):
+            batch = self.expire_queued()
+            expired += len(batch)
+
+            if len(batch) < settings.DEPLOYMENT_EXPIRY_BATCH_SIZE:
+                break
+
+        logger.info(f"[DeploymentService]: {expired} queued deployments expired")
+        return expired
+
+    @transaction.atomic
+    def expire_queued(self, deployment_ids: Optional[Iterable[Union[str, int]]] = None) -> List[int]:
+        """
+        Marks a batch of overdue queued or parked deployments (all, or only the given ones) as FAILED, with the reason.
+
+        Nothing is allocated to a waiting deployment, so they are finalized right away, and are removed
+        from their cluster queues in a single Redis pipeline once committed. Returns ids of the expired ones.
+        """
+
+        overdue = self.overdue().select_for_update().order_by("status", "queue_deadline")
+        if deployment_ids is not None:
+            overdue = overdue.filter(id__in=list(deployment_ids))
+
+        deployments = list(overdue.only("id", "cluster_id", "status", "priority")[: settings.DEPLOYMENT_EXPIRY_BATCH_SIZE])
+        if not deployments:
+            return []
+
+        expired = [deployment.id for deployment in deployments]
+
+        now = timezone.now()
+        Deployment.objects.filter(id__in=expired).update(
+            status=DeploymentStatus.FAILED,
+            failure_reason=QUEUE_DEADLINE_EXCEEDED,
+            completed_at=now,
+            modified_at=now,
+        )
+
+        removals: Dict[int, List[int]] = {}
+        for deployment in deployments:
+            deployment.status = DeploymentStatus.FAILED
+            removals.setdefault(deployment.cluster_id, []).append(deployment.id)
+
+        self.__outbox.record(*(deployment_event(LifecycleEvent.DEPLOYMENT_FAILED, deployment) for deployment in deployments))
+        transaction.on_commit(lambda: self.__queue.flush(removals), robust=True)
+
+        logger.info(f"[DeploymentService]: {len(expired)} queued deployments expired {expired}")
+        return expired
+
+    @transaction.atomic
+    def bulk_finalize(self, transitions: List[DeploymentStatusTransitionEntity]) -> Dict[str, List]:
+        """
+        Moves many in-progress deployments to terminal statuses and frees their resources, in one transaction.
+
+        Statuses are applied with one update per status and resources are released with one counter
+        update per cluster, which then get rescheduled (on commit). Transitions of deployments which
+        don't exist or aren't in progress (or have a non-numeric id) are rejected, the rest are still applied.
+        """
+
+        requested: Dict[int, str] = {}
+        rejected: List[Dict] = []
+
+        for transition in transitions:
+            if not str(transition.deployment_id).isdigit():
+                rejected.append({"deployment_id": transition.deployment_id, "error": "Invalid deployment id"})
+                continue
+
+            deployment_id = int(transition.deployment_id)
+
+            if deployment_id in requested:
+                rejected.append({"deployment_id": deployment_id, "error": "Duplicate transition"})
+                continue
+
+            requested[deployment_id] = transition.status
+
+        running = set(
+            Deployment.objects.select_for_update()
+            .filter(id__in=list(requested), status=DeploymentStatus.IN_PROGRESS, is_deleted=False)
+            .values_list("id", flat=True)
+        )
+
+        by_status: Dict[str, List[int]] = {}
+        for deployment_id, status in requested.items():
+            if deployment_id in running:
+                by_status.setdefault(status, []).append(deployment_id)
+            else:
+                rejected.append({"deployment_id": deployment_id, "error": "Deployment does not exist or is not in progress"})
+
+        for status, deployment_ids in by_status.items():
+            Deployment.objects.filter(id__in=deployment_ids).update(status=status, modified_at=timezone.now())
+
+        finalized = self.release_terminal_deployments(deployment_ids=running) if running else []
+        logger.info(f"[DeploymentService]: {len(finalized)} deployments finalized, {len(rejected)} transitions rejected")
+
+        return {
+            "finalized": [{"deployment_id": deployment_id, "status": requested[deployment_id]} for deployment_id in finalized],
+            "rejected": rejected,
+        }
+
+    @transaction.atomic
+    def cancel(self, deployment_id: str) -> Deployment:
+        """
+        Cancels a queued, parked or in-progress deployment, frees its resources (if any).
+        """
+
+        try:
+            deployment = Deployment.objects.select_for_update().get(id=deployment_id, is_deleted=False)
+        except Deployment.DoesNotExist as exception:
+            raise ResourceDoesNotExistsError("Deployment does not exist") from exception
+
+        if deployment.status == DeploymentStatus.QUEUED:
+            # Dropped from its cluster's Redis queue only once committed, a rolled back cancel keeps it queued
+            transaction.on_commit(lambda: self.__queue.remove(deployment.cluster_id, [deployment.id]), robust=True)
+
+        elif deployment.status == DeploymentStatus.PARKED:
+            logger.info(f"[DeploymentService]: {deployment} is parked, nothing to release")
+
+        elif deployment.status == DeploymentStatus.IN_PROGRESS:
+            ResourceAllocationService().release_resources(deployment_id=deployment.id)
+
+        else:
+            raise BadRequestError(f"{deployment} is already finalized, can not be cancelled")
+
+        deployment.status = DeploymentStatus.CANCELLED
+        deployment.completed_at = timezone.now()
+        deployment.save()
+        self.__outbox.record(deployment_event(LifecycleEvent.DEPLOYMENT_CANCELLED, deployment))
+
+        emit_capacity_changed(cluster_id=deployment.cluster_id)
+        logger.info(f"[DeploymentService]: {deployment} is cancelled")
+
+        return deployment
+
+    @transaction.atomic
+    def purge_cluster(self, cluster: Cluster) -> Dict[str, List[int]]:
+        """
+        Cancels all unfinished deployments of a (deleted) cluster in bulk, and releases their allocations.
+
+        Queued, parked and in-progress ones are cancelled with a single update, and allocations (also of
+        terminal ones yet to be released) are released with one counter update. The cluster's queue and
+        capacity ledger are dropped once committed, in single round trips, so the scheduler never has to
+        come across its deployments. Returns ids of the cancelled deployments and of the released ones.
+        """
+
+        unfinished = list(
+            Deployment.objects.select_for_update()
+            .filter(
+                cluster_id=cluster.id,
+                status__in=[*WAITING_DEPLOYMENT_STATUSES, DeploymentStatus.IN_PROGRESS],
+                is_deleted=False,
+            )
+            .only("id", "cluster_id", "status", "priority")
+        )
+        cancelled = [deployment.id for deployment in unfinished]
+        running = [deployment.id for deployment in unfinished if deployment.status == DeploymentStatus.IN_PROGRESS]
+
+        if cancelled:
+            now = timezone.now()
+            Deployment.objects.filter(id__in=cancelled).update(
+                status=DeploymentStatus.CANCELLED,
+                failure_reason=CLUSTER_DELETED,
+                completed_at=now,
+                modified_at=now,
+            )
+
+            for deployment in unfinished:
+                deployment.status = DeploymentStatus.CANCELLED
+
+            self.__outbox.record(*(deployment_event(LifecycleEvent.DEPLOYMENT_CANCELLED, deployment) for deployment in unfinished))
+
+        if running:
+            ResourceAllocationService().bulk_release_resources(deployment_ids=running)
+
+        # Terminal ones whose resources were yet to be released by the cleanup job
+        released = running + self.release_terminal_deployments(
+            deployment_ids=self.pending_release().filter(cluster_id=cluster.id).values_list("id", flat=True)
+        )
+
+        def on_commit() -> None:
+            self.__queue.drop(cluster.id)
+            self.__ledger.forget(cluster.id)
+
+        # NOTE: Registered after the ledger releases, so that the ledger is dropped last
+        transaction.on_commit(on_commit, robust=True)
+
+        logger.info(f"[DeploymentService]: {cluster} purged, {len(cancelled)} deployments cancelled, {len(released)} released")
+        return {"cancelled": cancelled, "released": released}
+
+    def start(self, deployment: Deployment) -> None:
+        """
+        Saves the deployment's move from QUEUED to IN_PROGRESS, as long as it is still queued.
+
+        Guards against starting a deployment which got cancelled or expired after it was read.
+        """
+
+        started = Deployment.objects.filter(id=deployment.id, status=DeploymentStatus.QUEUED).update(
+            status=deployment.status,
+            started_at=deployment.started_at,
+            modified_at=timezone.now(),
+        )
+
+        if not started:
+            raise BadRequestError(f"{deployment} is not queued anymore, can not be started")
+
+    def start_many(self, cluster: Cluster, deployments: List[Deployment]) -> List[Deployment]:
+        """
+        Starts queued deployments of the cluster in bulk, e.g. the placements of a scheduling cycle.
+
+        Resources of all of them are reserved on the capacity ledger in a single call. Then, in one
+        transaction, the ones still queued are moved to IN_PROGRESS with a single (narrow) update and
+        allocated with a single insert. Reservations of the ones which didn't start are given back.
+        Returns the deployments which were started.
+        """
+
+        if not deployments:
+            return []
+
+        reserved = self.__ledger.reserve_many(
+            cluster=cluster,
+            requests=[(deployment.cpu_required, deployment.gpu_required, deployment.ram_required) for deployment in deployments],
+        )
+        candidates = [deployment for deployment, is_reserved in zip(deployments, reserved) if is_reserved]
+        started: List[Deployment] = []
+        committed: Set[int] = set()
+
+        try:
+            with transaction.atomic():
+                # Cancelled or expired after it was read, it must not be started
+                queued = set(
+                    Deployment.objects.select_for_update()
+                    .filter(id__in=[deployment.id for deployment in candidates], status=DeploymentStatus.QUEUED)
+                    .values_list("id", flat=True)
+                )
+                started = [deployment for deployment in candidates if deployment.id in queued]
+
+                if started:
+                    now = timezone.now()
+                    Deployment.objects.filter(id__in=queued).update(
+                        status=DeploymentStatus.IN_PROGRESS, started_at=now, modified_at=now
+                    )
+
+                    for deployment in started:
+                        deployment.status, deployment.started_at = DeploymentStatus.IN_PROGRESS, now
+
+                    self.__outbox.record(*(deployment_event(LifecycleEvent.DEPLOYMENT_STARTED, deployment) for deployment in started))
+                    ResourceAllocationService().bulk_create(cluster=cluster, deployments=started)
+
+            committed = {deployment.id for deployment in started}
+
+        finally:
+            # Compensation, reservations must not outlive a failed DB write (or deployments which didn't start)
+            unused = [deployment for deployment in candidates if deployment.id not in committed]
+            if unused:
+                self.__ledger.release(
+                    cluster_id=cluster.id,
+                    cpu=sum(deployment.cpu_required for deployment in unused),
+                    gpu=sum(deployment.gpu_required for deployment in unused),
+                    ram=sum(deployment.ram_required for deployment in unused),
+                )
+
+        logger.info(f"[DeploymentService]: {len(started)} out of {len(deployments)} deployments started on {cluster}")
+        return started
+
+    def preempt(self, deployment: Deployment, victims: List[Deployment]) -> Deployment:
+        """
+        Starts a queued deployment by preempting the (lower priority) IN_PROGRESS `victims`.
+
+        In a single transaction, the victims' allocations are released and they are moved back to
+        QUEUED keeping their original `queued_at`, and the deployment is allocated. Only the part of
+        the deployment's requirement which the victims don't cover is reserved on the capacity ledger,
+        and whatever the victims free beyond that is given back to it once committed.
+        """
+
+        cluster: Cluster = deployment.cluster
+        required = {"cpu": deployment.cpu_required, "gpu": deployment.gpu_required, "ram": deployment.ram_required}
+        released = {
+            "cpu": sum(victim.cpu_required for victim in victims),
+            "gpu": sum(victim.gpu_required for victim in victims),
+            "ram": sum(victim.ram_required for victim in victims),
+        }
+
+        shortfall = {resource: max(required[resource] - released[resource], 0) for resource in required}
+        surplus = {resource: max(released[resource] - required[resource], 0) for resource in required}
+
+        if not self.__ledger.reserve(cluster=cluster, **shortfall):
+            raise InsufficientResourcesError(f"{cluster} does not have sufficient resources to preempt for {deployment}")
+
+        allocation_service = ResourceAllocationService()
+        victim_ids = [victim.id for victim in victims]
+
+        try:
+            with transaction.atomic():
+                # NOTE: Victims were admitted already, they don't get a queue deadline again
+                requeued = Deployment.objects.filter(id__in=victim_ids, status=DeploymentStatus.IN_PROGRESS).update(
+                    started_at=None, queue_deadline=None, status=DeploymentStatus.QUEUED
+                )
+                if requeued != len(victims):
+                    raise BadRequestError(f"Preemption victims of {deployment} are not running anymore")
+
+                for victim in victims:
+                    victim.status, victim.started_at, victim.queue_deadline = DeploymentStatus.QUEUED, None, None
+
+                # NOTE: Hard deleted, since victims get a new allocation once re-scheduled
+                victim_allocations = ResourceAllocation.objects.filter(deployment_id__in=victim_ids, is_deleted=False)
+                released_allocations = list(
+                    victim_allocations.values_list("id", "deployment_id", "cpu_allocated", "gpu_allocated", "ram_allocated")
+                )
+                victim_allocations.delete()
+
+                allocation_service.update_allocated_counters(
+                    cluster_id=cluster.id,
+                    organization_id=cluster.organization_id,
+                    **{resource: -value for resource, value in released.items()},
+                )
+
+                allocation_service.create(
+                    payload=ResourceAllocationRequestEntity(
+                        cluster_id=cluster.id,
+                        deployment_id=deployment.id,
+                        cpu_allocated=deployment.cpu_required,
+                        gpu_allocated=deployment.gpu_required,
+                        ram_allocated=deployment.ram_required,
+                    ),
+                    reserved=True,
+                )
+
+                deployment.started_at = timezone.now()
+                deployment.status = DeploymentStatus.IN_PROGRESS
+                self.start(deployment)
+
+                self.__outbox.record(
+                    *(deployment_event(LifecycleEvent.DEPLOYMENT_PREEMPTED, victim) for victim in victims),
+                    *(
+                        allocation_event(
+                            LifecycleEvent.ALLOCATION_RELEASED,
+                            allocation_id=allocation_id,
+                            deployment_id=victim_id,
+                            cluster_id=cluster.id,
+                            cpu=cpu,
+                            gpu=gpu,
+                            ram=ram,
+                        )
+                        for allocation_id, victim_id, cpu, gpu, ram in released_allocations
+                    ),
+                    deployment_event(LifecycleEvent.DEPLOYMENT_STARTED, deployment),
+                )
+
+                def on_commit() -> None:
+                    self.__ledger.release(cluster_id=cluster.id, **surplus)
+                    for victim in victims:
+                        self.__queue.push(victim)
+
+                transaction.on_commit(on_commit, robust=True)
+
+        except Exception:
+            # Compensation, the reservation must not outlive a failed DB write
+            self.__ledger.release(cluster_id=cluster.id, **shortfall)
+            raise
+
+        logger.info(f"[DeploymentService]: {deployment} started by preempting {len(victims)} deployments {victim_ids}")
+        return deployment
@@ -1,9 +1,10 @@
 from django.db import transaction
-from django.db.models import QuerySet
+from django.db.models import Prefetch, QuerySet
 
 from core.errors import ResourceDoesNotExistsError
 from core.models.organization import InviteCode, Organization
 from core.types.request import OrganizationRequestEntity
+from core.utils.cache import invalidate_organizations
 
 
 class OrganizationService:
@@ -21,6 +22,7 @@ class OrganizationService:
 
         # Also creating an invite code for this organization
         InviteCode.objects.create(organization=organization)
+        invalidate_organizations()
 
         return organization
 
@@ -31,6 +33,20 @@ class OrganizationService:
 
         return Organization.objects.all()
 
+    def list_with_invite_codes(self) -> QuerySet[Organization]:
+        """
+        Returns live `Organization` with their active invite codes prefetched (`active_invite_codes`),
+        in two queries (organizations + prefetched invite codes)
+        """
+
+        return Organization.objects.filter(is_deleted=False).prefetch_related(
+            Prefetch(
+                "invite_codes",
+                queryset=InviteCode.objects.filter(is_active=True).order_by("id"),
+                to_attr="active_invite_codes",
+            )
+        )
+
     def get(self, organization_id: str) -> Organization:
         """
         Returns `Organization` if exists
@@ -1,12 +1,19 @@
 from logging import getLogger
+from typing import Dict, Iterable, List, Union
 
 from django.db import transaction
-from django.db.models import QuerySet
+from django.db.models import F, QuerySet
+from django.utils import timezone
 
-from core.errors import ResourceDoesNotExistsError
+from core.constants import LifecycleEvent
+from core.errors import InsufficientResourcesError, ResourceDoesNotExistsError
 from core.models.deployment import Deployment
 from core.models.resource import Cluster, ResourceAllocation
 from core.types.request import ResourceAllocationRequestEntity
+from core.utils.cache import invalidate_cluster
+from core.utils.events import emit_capacity_changed
+from core.utils.ledger import CapacityLedger
+from core.utils.outbox import LifecycleOutbox, allocation_event
 
 logger = getLogger(__name__)
 
@@ -16,10 +23,16 @@ class ResourceAllocationService:
     Service Layer For ResourceAllocation
     """
 
-    @transaction.atomic
-    def create(self, payload: ResourceAllocationRequestEntity) -> ResourceAllocation:
+    def __init__(self) -> None:
+        self.__ledger = CapacityLedger()
+        self.__outbox = LifecycleOutbox()
+
+    def create(self, payload: ResourceAllocationRequestEntity, reserved: bool = False) -> ResourceAllocation:
         """
         Creates new `ResourceAllocation`
+
+        Resources are first reserved on the cluster's capacity ledger (unless the caller already
+        did, i.e. `reserved`), the reservation is given back if the DB write fails.
         """
 
         try:
@@ -27,19 +40,109 @@ class ResourceAllocationService:
         except Cluster.DoesNotExist as exception:
             raise ResourceDoesNotExistsError("cluster does not exists") from exception
 
+        if not reserved and not self.__ledger.reserve(
+            cluster=cluster,
+            cpu=payload.cpu_allocated,
+            gpu=payload.gpu_allocated,
+            ram=payload.ram_allocated,
+        ):
+            raise InsufficientResourcesError(f"{cluster} does not have sufficient resources")
+
         try:
-            deployment = Deployment.objects.get(id=payload.deployment_id)
-        except Deployment.DoesNotExist as exception:
-            raise ResourceDoesNotExistsError("Deployment does not exists") from exception
+            with transaction.atomic():
+                try:
+                    deployment = Deployment.objects.get(id=payload.deployment_id)
+                except Deployment.DoesNotExist as exception:
+                    raise ResourceDoesNotExistsError("Deployment does not exists") from exception
 
-        return ResourceAllocation.objects.create(
-            cluster=cluster,
-            deployment=deployment,
-            cpu_allocated=payload.cpu_allocated,
-            gpu_allocated=payload.gpu_allocated,
-            ram_allocated=payload.ram_allocated,
+                allocation = ResourceAllocation.objects.create(
+                    cluster=cluster,
+                    deployment=deployment,
+                    cpu_allocated=payload.cpu_allocated,
+                    gpu_allocated=payload.gpu_allocated,
+                    ram_allocated=payload.ram_allocated,
+                )
+
+                self.update_allocated_counters(
+                    cluster_id=cluster.id,
+                    organization_id=cluster.organization_id,
+                    cpu=payload.cpu_allocated,
+                    gpu=payload.gpu_allocated,
+                    ram=payload.ram_allocated,
+                )
+
+                self.__outbox.record(
+                    allocation_event(
+                        LifecycleEvent.ALLOCATION_CREATED,
+                        allocation_id=allocation.id,
+                        deployment_id=deployment.id,
+                        cluster_id=cluster.id,
+                        cpu=allocation.cpu_allocated,
+                        gpu=allocation.gpu_allocated,
+                        ram=allocation.ram_allocated,
+                    )
+                )
+
+        except Exception:
+            # Compensation, the reservation must not outlive a failed DB write (Callers own their reservations)
+            if not reserved:
+                self.__ledger.release(
+                    cluster_id=cluster.id,
+                    cpu=payload.cpu_allocated,
+                    gpu=payload.gpu_allocated,
+                    ram=payload.ram_allocated,
+                )
+            raise
+
+        return allocation
+
+    @transaction.atomic
+    def bulk_create(self, cluster: Cluster, deployments: List[Deployment]) -> List[ResourceAllocation]:
+        """
+        Allocates resources to many deployments of the cluster, with one insert and one counters update.
+
+        Resources must be reserved on the capacity ledger already (Callers own their reservations).
+        """
+
+        if not deployments:
+            return []
+
+        allocations = ResourceAllocation.objects.bulk_create(
+            ResourceAllocation(
+                cluster=cluster,
+                deployment=deployment,
+                cpu_allocated=deployment.cpu_required,
+                gpu_allocated=deployment.gpu_required,
+                ram_allocated=deployment.ram_required,
+            )
+            for deployment in deployments
+        )
+
+        self.update_allocated_counters(
+            cluster_id=cluster.id,
+            organization_id=cluster.organization_id,
+            cpu=sum(allocation.cpu_allocated for allocation in allocations),
+            gpu=sum(allocation.gpu_allocated for allocation in allocations),
+            ram=sum(allocation.ram_allocated for allocation in allocations),
+        )
+
+        self.__outbox.record(
+            *(
+                allocation_event(
+                    LifecycleEvent.ALLOCATION_CREATED,
+                    allocation_id=allocation.id,
+                    deployment_id=allocation.deployment_id,
+                    cluster_id=cluster.id,
+                    cpu=allocation.cpu_allocated,
+                    gpu=allocation.gpu_allocated,
+                    ram=allocation.ram_allocated,
+                )
+                for allocation in allocations
+            )
         )
 
+        return allocations
+
     def list(self) -> QuerySet[ResourceAllocation]:
         """
         Returns all `ResourceAllocation`
@@ -64,19 +167,46 @@ class ResourceAllocationService:
         """
 
         try:
-            allocation = ResourceAllocation.objects.get(deployment_id=deployment_id)
+            allocation = ResourceAllocation.objects.select_related("cluster").get(deployment_id=deployment_id, is_deleted=False)
             deployment: Deployment = allocation.deployment
 
-            # Update cluster's resources by adding back the allocated resources
-            cluster = allocation.cluster
-            cluster.cpu += allocation.cpu_allocated
-            cluster.gpu += allocation.gpu_allocated
-            cluster.ram += allocation.ram_allocated
-            cluster.save()
+            # Give the allocated resources back to the cluster
+            self.update_allocated_counters(
+                cluster_id=allocation.cluster_id,
+                organization_id=allocation.cluster.organization_id,
+                cpu=-allocation.cpu_allocated,
+                gpu=-allocation.gpu_allocated,
+                ram=-allocation.ram_allocated,
+            )
 
             logger.info(f"[ResourceAllocationService]: Released resources for {deployment}")
             allocation.delete()
 
+            self.__outbox.record(
+                allocation_event(
+                    LifecycleEvent.ALLOCATION_RELEASED,
+                    allocation_id=allocation.id,
+                    deployment_id=allocation.deployment_id,
+                    cluster_id=allocation.cluster_id,
+                    cpu=allocation.cpu_allocated,
+                    gpu=allocation.gpu_allocated,
+                    ram=allocation.ram_allocated,
+                )
+            )
+
+            # Capacity is given back to the ledger only once the release is committed
+            transaction.on_commit(
+                lambda: self.__ledger.release(
+                    cluster_id=allocation.cluster_id,
+                    cpu=allocation.cpu_allocated,
+                    gpu=allocation.gpu_allocated,
+                    ram=allocation.ram_allocated,
+                ),
+                robust=True,
+            )
+
+            emit_capacity_changed(cluster_id=allocation.cluster_id)
+
         except ResourceAllocation.DoesNotExist as exception:
             logger.exception(f"[ResourceAllocationService]: Resource allocation for {deployment_id} does not exist.")
             raise ResourceDoesNotExistsError("Resource allocation does not exist.") from exception
@@ -84,3 +214,88 @@ class ResourceAllocationService:
         except Exception as exception:
             logger.exception(f"[ResourceAllocationService]: {exception}")
             raise
+
+    @transaction.atomic
+    def bulk_release_resources(self, deployment_ids: Iterable[Union[str, int]]) -> Dict[int, Dict[str, int]]:
+        """
+        Releases resources allocated to many deployments, with a single counter update per cluster.
+
+        Deployments without a live allocation are skipped. Returns the released resources per cluster.
+        """
+
+        allocations = list(
+            ResourceAllocation.objects.select_for_update()
+            .filter(deployment_id__in=list(deployment_ids), is_deleted=False)
+            .values_list(
+                "id", "deployment_id", "cluster_id", "cpu_allocated", "gpu_allocated", "ram_allocated", "cluster__organization_id"
+            )
+        )
+
+        if not allocations:
+            return {}
+
+        released: Dict[int, Dict[str, int]] = {}
+        organizations: Dict[int, int] = {}
+        for _, _, cluster_id, cpu, gpu, ram, organization_id in allocations:
+            organizations[cluster_id] = organization_id
+            resources = released.setdefault(cluster_id, {"cpu": 0, "gpu": 0, "ram": 0})
+            resources["cpu"] += cpu
+            resources["gpu"] += gpu
+            resources["ram"] += ram
+
+        ResourceAllocation.objects.filter(id__in=[allocation[0] for allocation in allocations]).update(
+            is_deleted=True, modified_at=timezone.now()
+        )
+
+        for cluster_id, resources in released.items():
+            self.update_allocated_counters(
+                cluster_id=cluster_id,
+                organization_id=organizations[cluster_id],
+                **{resource: -value for resource, value in resources.items()},
+            )
+
+            # Capacity is given back to the ledger only once the release is committed
+            transaction.on_commit(
+                lambda cluster_id=cluster_id, resources=resources: self.__ledger.release(
+                    cluster_id=cluster_id, **resources
+                ),
+                robust=True,
+            )
+
+            emit_capacity_changed(cluster_id=cluster_id)
+
+        self.__outbox.record(
+            *(
+                allocation_event(
+                    LifecycleEvent.ALLOCATION_RELEASED,
+                    allocation_id=allocation_id,
+                    deployment_id=deployment_id,
+                    cluster_id=cluster_id,
+                    cpu=cpu,
+                    gpu=gpu,
+                    ram=ram,
+                )
+                for allocation_id, deployment_id, cluster_id, cpu, gpu, ram, _ in allocations
+            )
+        )
+
+        logger.info(f"[ResourceAllocationService]: Released resources of {len(allocations)} deployments")
+        return released
+
+    def update_allocated_counters(
+        self, cluster_id: Union[str, int], organization_id: Union[str, int], cpu: int, gpu: int, ram: int
+    ) -> int:
+        """
+        Atomically adds (or with -ve values, subtracts) resources to the cluster's allocated counters.
+
+        Cached reads of the cluster's capacity (and its organization's listings) are invalidated once committed,
+        the organization is passed in as callers have it at hand, so the hot path doesn't read it again.
+        """
+
+        invalidate_cluster(cluster_id=cluster_id, organization_id=organization_id)
+
+        return Cluster.objects.filter(id=cluster_id).update(
+            cpu_allocated=F("cpu_allocated") + cpu,
+            gpu_allocated=F("gpu_allocated") + gpu,
+            ram_allocated=F("ram_allocated") + ram,
+        )
@@ -1,26 +1,133 @@
 from datetime import datetime
 from logging import getLogger
+from typing import Union
 
 from celery import shared_task
+from django.conf import settings
 
+from core.base.redis import RedisClient
+from core.services.archive import ArchiveService
+from core.services.deployment import DeploymentService
+from core.utils.events import pending_schedule_key
+from core.utils.outbox import LifecycleOutbox
+from core.utils.queue import DeploymentQueue
+from core.utils.reconciliation import LedgerReconciler, QueueReconciler
 from core.utils.scheduler import Scheduler
+from core.utils.singleton import singleton
 
 logger = getLogger(__name__)
 
 
 @shared_task
+@singleton()
 def consume_enqueued_deployments() -> None:
-    """ """
+    """
+    Fans out one scheduling task per cluster having queued deployments, across the worker pool.
+    """
 
     logger.info(f"[Task]: Process InQueued Deployment Task Started at {datetime.now()}")
-    Scheduler().schedule_deployment()
-    logger.info(f"[Task]: Process InQueued Deployment Task Completed at {datetime.now()}")
+
+    cluster_ids = DeploymentQueue().clusters()
+    for cluster_id in cluster_ids:
+        schedule_cluster_deployments.delay(cluster_id)
+
+    logger.info(f"[Task]: {len(cluster_ids)} Cluster Scheduling Tasks Dispatched at {datetime.now()}")
+
+
+@shared_task(bind=True, max_retries=settings.SCHEDULER_LOCK_MAX_RETRIES)
+def schedule_cluster_deployments(self, cluster_id: Union[str, int]) -> None:
+    """
+    Schedules queued deployments of a cluster, dispatched by the beat job or on capacity change events.
+
+    If another worker is already scheduling the cluster, it is retried later, as the running cycle may have
+    missed capacity which was released meanwhile.
+    """
+
+    # Events arriving from here on should dispatch a fresh run
+    RedisClient().delete(pending_schedule_key(cluster_id))
+
+    logger.info(f"[Task]: Schedule Cluster {cluster_id} Task Started at {datetime.now()}")
+
+    if not Scheduler().schedule_cluster(cluster_id=cluster_id):
+        raise self.retry(countdown=settings.SCHEDULER_LOCK_RETRY_DELAY)
+
+    logger.info(f"[Task]: Schedule Cluster {cluster_id} Task Completed at {datetime.now()}")
 
 
 @shared_task
+@singleton()
 def consume_terminal_deployments() -> None:
     """ """
 
     logger.info(f"[Task]: Deployment Cleanup Task Started at {datetime.now()}")
     Scheduler().cleanup_completed_deployments()
     logger.info(f"[Task]: Deployment Cleanup Task Completed at {datetime.now()}")
+
+
+@shared_task
+@singleton()
+def expire_queued_deployments() -> None:
+    """
+    Fails queued deployments which are past their queue deadline, so that the queues only hold runnable work.
+    """
+
+    logger.info(f"[Task]: Queue Expiry Task Started at {datetime.now()}")
+    expired = DeploymentService().expire_overdue()
+    logger.info(f"[Task]: {expired} Queued Deployments Expired at {datetime.now()}")
+
+
+@shared_task
+@singleton()
+def reconcile_deployment_queues() -> None:
+    """
+    Restores queued deployments missing from the Redis queues and removes the orphaned ones.
+    """
+
+    logger.info(f"[Task]: Queue Reconciliation Task Started at {datetime.now()}")
+    report = QueueReconciler().reconcile()
+    logger.info(
+        f"[Task]: Queue Reconciliation Task Completed at {datetime.now()}, "
+        f"{report['missing']} Missing, {report['rescored']} Re-scored, {report['orphaned']} Orphaned"
+    )
+
+
+@shared_task
+@singleton()
+def reconcile_capacity_ledgers() -> None:
+    """
+    Re-seeds Redis capacity ledgers which drifted from the clusters' allocated counters, e.g. leaked reservations.
+    """
+
+    logger.info(f"[Task]: Ledger Reconciliation Task Started at {datetime.now()}")
+    report = LedgerReconciler().reconcile()
+    logger.info(
+        f"[Task]: Ledger Reconciliation Task Completed at {datetime.now()}, "
+        f"{len(report['drift'])} Drifted, {len(report['reseeded'])} Re-seeded"
+    )
+
+
+@shared_task
+@singleton()
+def relay_lifecycle_events() -> None:
+    """
+    Publishes lifecycle events which were not relayed on commit, and purges old published ones.
+    """
+
+    outbox = LifecycleOutbox()
+
+    published = outbox.relay()
+    purged = outbox.purge()
+
+    logger.info(f"[Task]: {published} Lifecycle Events Relayed, {purged} Purged at {datetime.now()}")
+
+
+@shared_task
+@singleton()
+def archive_finalized_deployments() -> None:
+    """
+    Moves old finalized deployments and their released allocations into the archive tables.
+    """
+
+    logger.info(f"[Task]: Archival Task Started at {datetime.now()}")
+    archived = ArchiveService().archive()
+    logger.info(f"[Task]: {archived['deployments']} Deployments Archived at {datetime.now()}")
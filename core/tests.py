@@ -1,19 +1,106 @@
+from base64 import urlsafe_b64encode
+from datetime import datetime, timedelta
 from json import dumps
+from tempfile import NamedTemporaryFile
+from time import sleep
+from typing import Dict, Optional, Tuple
 from unittest.mock import patch
 
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from pydantic import ValidationError
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.constants import DeploymentStatus
-from core.models import Cluster, Deployment, Organization
-from core.services import DeploymentService, ResourceAllocationService
+from core.base.redis import RedisClient
+from core.constants import DeploymentStatus, LifecycleEvent, PlacementStrategy, UserRole
+from core.errors import BadRequestError, ResourceDoesNotExistsError
+from core.models import (
+    ArchivedDeployment,
+    Cluster,
+    Deployment,
+    InviteCode,
+    Membership,
+    Organization,
+    OutboxEvent,
+    ResourceAllocation,
+)
+from core.services import (
+    ArchiveService,
+    ClusterService,
+    DeploymentService,
+    OrganizationService,
+    ResourceAllocationService,
+)
+from core.tasks import consume_enqueued_deployments
 from core.types.request import (
+    ClusterRequestEntity,
+    ClusterResizeRequestEntity,
+    DeploymentStatusTransitionEntity,
     NewDeploymentRequestEntity,
+    OrganizationRequestEntity,
     ResourceAllocationRequestEntity,
 )
+from core.utils.cache import (
+    CLUSTERS_SCOPE,
+    ResponseCache,
+    cluster_scope,
+    organization_scope,
+)
+from core.utils.events import pending_schedule_key
+from core.utils.ledger import CapacityLedger
+from core.utils.lock import RedisLock
+from core.utils.outbox import STREAM_KEY, LifecycleEventConsumer, LifecycleOutbox
+from core.utils.placement import PlacementEngine, get_placement_engine
+from core.utils.queue import DeploymentQueue
+from core.utils.reconciliation import (
+    LEDGER_DRIFT_KEY,
+    METRICS_KEY,
+    LedgerReconciler,
+    QueueReconciler,
+)
+from core.utils.scheduler import Scheduler
+from core.utils.singleton import singleton
+from core.utils.simulation import (
+    SchedulerSimulation,
+    SimulatedCluster,
+    SimulatedDeployment,
+    WorkloadTrace,
+    synthetic_trace,
+)
+
+
+def reset_cluster_state(cluster_id: int) -> None:
+    """
+    Drops Redis state of a cluster, since ids are re-used across test cases
+    """
+
+    DeploymentQueue().drop(cluster_id)
+    CapacityLedger().forget(cluster_id)
+    ResponseCache().invalidate(cluster_scope(cluster_id))
+    RedisClient().delete(pending_schedule_key(cluster_id), RedisLock(f"SCHEDULER:{cluster_id}", ttl_ms=0).key)
+
+
+class TestEnvironmentTestCase(TestCase):
+    """
+    Test Cases For The Test Environment Itself
+    """
+
+    def test_tests_are_isolated_from_app_redis_and_broker(self):
+        """
+        Test that tests use the dedicated Redis DB, and that capacity change events are off
+        """
+
+        self.assertEqual(RedisClient().get_connection().connection_pool.connection_kwargs["db"], settings.REDIS_TEST_DB)
+        self.assertFalse(settings.SCHEDULER_EVENTS_ENABLED)
 
 
 class LoginTestCase(TestCase):
@@ -96,7 +183,12 @@ class ResourceAllocationTestCase(TestCase):
             image_path="docker://test/image",
         )
 
+        self.deployment_service = DeploymentService()
         self.allocation_service = ResourceAllocationService()
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
 
     def test_resource_allocation(self):
         """
@@ -126,14 +218,59 @@ class ResourceAllocationTestCase(TestCase):
         self.assertEqual(available_resources["cpu"], 12)
         self.assertEqual(available_resources["ram"], 48 * 1024)
 
-    @patch("core.services.deployment.RedisClient.z_add")
-    def test_create_deployment_with_insufficient_resources(self, mock_z_add):
+    def test_release_resources_updates_counters(self):
+        """
+        Test that releasing an allocation frees resources without changing the cluster's total capacity
+        """
+
+        self.allocation_service.create(
+            ResourceAllocationRequestEntity(
+                cpu_allocated=4,
+                gpu_allocated=1,
+                ram_allocated=16 * 1024,
+                cluster_id=self.cluster.id,
+                deployment_id=self.deployment.id,
+            )
+        )
+
+        self.allocation_service.release_resources(deployment_id=self.deployment.id)
+        self.cluster.refresh_from_db()
+
+        self.assertEqual(self.cluster.cpu, 16)
+        self.assertEqual(self.cluster.available_resources(), {"cpu": 16, "ram": 64 * 1024, "gpu": 4})
+
+    def test_reconcile_allocated_counters(self):
+        """
+        Test that drifted counters are reported and recomputed from live allocations
+        """
+
+        self.allocation_service.create(
+            ResourceAllocationRequestEntity(
+                cpu_allocated=4,
+                gpu_allocated=1,
+                ram_allocated=16 * 1024,
+                cluster_id=self.cluster.id,
+                deployment_id=self.deployment.id,
+            )
+        )
+        Cluster.objects.filter(id=self.cluster.id).update(cpu_allocated=0)
+
+        drifts = ClusterService().reconcile_allocated_counters()
+        self.cluster.refresh_from_db()
+
+        self.assertEqual(len(drifts), 1)
+        self.assertEqual(drifts[0]["counters"]["cpu"], 0)
+        self.assertEqual(self.cluster.cpu_allocated, 4)
+        self.assertEqual(ClusterService().reconcile_allocated_counters(), [])
+
+    @patch("core.services.deployment.DeploymentQueue.push")
+    def test_create_deployment_with_insufficient_resources(self, mock_push):
         """
         Test that deployment is added to Redis when there are insufficient resources.
         """
 
-        # Simulating insufficient resources by reducing available GPU
-        self.cluster.gpu = 0
+        # Simulating insufficient resources by allocating all the GPUs
+        self.cluster.gpu_allocated = self.cluster.gpu
         self.cluster.save()
 
         # Create the deployment request payload
@@ -146,17 +283,204 @@ class ResourceAllocationTestCase(TestCase):
             image_path="docker://test/image",
         )
 
-        new_deployment = self.deployment_service.create(payload)
+        with self.captureOnCommitCallbacks(execute=True):
+            new_deployment = self.deployment_service.create(payload)
 
-        # Ensuring that the Redis z_add method was called
-        mock_z_add.assert_called_once_with(
-            "DEPLOYMENT_QUEUE", {new_deployment.id: -new_deployment.priority}
-        )
+        # Ensuring that the deployment was pushed to its cluster's queue
+        mock_push.assert_called_once_with(new_deployment)
 
         # Deployment status should be QUEUED due to insufficient resources
         self.assertEqual(new_deployment.status, DeploymentStatus.QUEUED)
 
 
+class AllocatedCountersMigrationTestCase(TransactionTestCase):
+    """
+    Test Cases For Backfilling Allocated Counters Of Existing Clusters (Migration 0005)
+    """
+
+    migrate_from = [("core", "0004_deployment_cancelled_status")]
+    migrate_to = [("core", "0005_cluster_allocated_counters")]
+
+    def setUp(self) -> None:
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        self.apps = executor.loader.project_state(self.migrate_from).apps
+
+    def tearDown(self) -> None:
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def _allocate(self, cluster, size: int, released: bool) -> None:
+        Deployment = self.apps.get_model("core", "Deployment")
+        ResourceAllocation = self.apps.get_model("core", "ResourceAllocation")
+
+        deployment = Deployment.objects.create(
+            cluster=cluster,
+            priority=1,
+            cpu_required=size,
+            gpu_required=size,
+            ram_required=size,
+            image_path="docker://test/image",
+        )
+        ResourceAllocation.objects.create(
+            cluster=cluster,
+            deployment=deployment,
+            cpu_allocated=size,
+            gpu_allocated=size,
+            ram_allocated=size,
+            is_deleted=released,
+        )
+
+    def test_backfill_takes_released_allocations_off_inflated_totals(self):
+        """
+        Test that counters are computed from live allocations, and that totals inflated by releases are restored
+        """
+
+        Organization = self.apps.get_model("core", "Organization")
+        Cluster = self.apps.get_model("core", "Cluster")
+
+        # A cluster of 8 which released allocations of 1 and 3 (inflating its totals to 12) and still runs one of 2
+        organization = Organization.objects.create(name="Test Organization")
+        cluster = Cluster.objects.create(cpu=12, gpu=12, ram=12, name="Test Cluster", organization=organization)
+        untouched = Cluster.objects.create(cpu=8, gpu=8, ram=8, name="Idle Cluster", organization=organization)
+
+        self._allocate(cluster, size=1, released=True)
+        self._allocate(cluster, size=3, released=True)
+        self._allocate(cluster, size=2, released=False)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        Cluster = executor.loader.project_state(self.migrate_to).apps.get_model("core", "Cluster")
+
+        cluster, untouched = Cluster.objects.get(id=cluster.id), Cluster.objects.get(id=untouched.id)
+
+        self.assertEqual((cluster.cpu, cluster.gpu, cluster.ram), (8, 8, 8))
+        self.assertEqual((cluster.cpu_allocated, cluster.gpu_allocated, cluster.ram_allocated), (2, 2, 2))
+        self.assertEqual((untouched.cpu, untouched.cpu_allocated), (8, 0))
+
+
+class TerminalCleanupTestCase(TestCase):
+    """
+    Test Cases For Releasing Resources Of Completed/Failed Deployments (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=4,
+            cpu=8,
+            ram=8,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        self.deployment_service = DeploymentService()
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+
+    def _create_deployments(self, count: int) -> list:
+        return [
+            self.deployment_service.create(
+                NewDeploymentRequestEntity(
+                    priority=1,
+                    cpu_required=2,
+                    gpu_required=1,
+                    ram_required=2,
+                    cluster_id=self.cluster.id,
+                    image_path="docker://test/image",
+                )
+            )
+            for _ in range(count)
+        ]
+
+    def test_cleanup_releases_pending_terminal_deployments(self):
+        """
+        Test that completed/failed deployments are released in bulk and running ones are left alone
+        """
+
+        completed, failed, running = self._create_deployments(3)
+        Deployment.objects.filter(id=completed.id).update(status=DeploymentStatus.COMPLETED)
+        Deployment.objects.filter(id=failed.id).update(status=DeploymentStatus.FAILED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Scheduler().cleanup_completed_deployments()
+
+        statuses = {
+            deployment.id: (deployment.status, deployment.completed_at is not None)
+            for deployment in Deployment.objects.filter(cluster=self.cluster)
+        }
+        self.assertEqual(statuses[completed.id], (DeploymentStatus.COMPLETED, True))
+        self.assertEqual(statuses[failed.id], (DeploymentStatus.FAILED, True))
+        self.assertEqual(statuses[running.id], (DeploymentStatus.IN_PROGRESS, False))
+
+        self.cluster.refresh_from_db()
+        self.assertEqual(self.cluster.available_resources(), {"cpu": 6, "gpu": 3, "ram": 6})
+        self.assertEqual(CapacityLedger().available(self.cluster.id), {"cpu": 6, "gpu": 3, "ram": 6})
+        self.assertFalse(self.deployment_service.pending_release().exists())
+
+    def test_cleanup_ignores_released_history(self):
+        """
+        Test that already released deployments are never read again
+        """
+
+        for deployment in self._create_deployments(4):
+            Deployment.objects.filter(id=deployment.id).update(status=DeploymentStatus.COMPLETED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Scheduler().cleanup_completed_deployments()
+
+        # Only the (empty) pending batch is read
+        with self.assertNumQueries(1):
+            Scheduler().cleanup_completed_deployments()
+
+    @override_settings(SCHEDULER_EVENTS_ENABLED=True)
+    @patch("core.utils.events.current_app.send_task")
+    def test_bulk_finalize(self, mock_send_task):
+        """
+        Test that terminal transitions are applied in bulk, invalid ones are rejected and the cluster is rescheduled once
+        """
+
+        completed, failed, running, _ = self._create_deployments(4)
+        queued = self._create_deployments(1)[0]
+        self.assertEqual(queued.status, DeploymentStatus.QUEUED)
+
+        transitions = [
+            DeploymentStatusTransitionEntity(deployment_id=completed.id, status=DeploymentStatus.COMPLETED),
+            DeploymentStatusTransitionEntity(deployment_id=failed.id, status=DeploymentStatus.FAILED),
+            DeploymentStatusTransitionEntity(deployment_id=failed.id, status=DeploymentStatus.COMPLETED),
+            DeploymentStatusTransitionEntity(deployment_id=queued.id, status=DeploymentStatus.FAILED),
+            DeploymentStatusTransitionEntity(deployment_id=999999, status=DeploymentStatus.COMPLETED),
+            DeploymentStatusTransitionEntity(deployment_id="abc", status=DeploymentStatus.COMPLETED),
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.deployment_service.bulk_finalize(transitions=transitions)
+
+        self.assertEqual(
+            result["finalized"],
+            [
+                {"deployment_id": completed.id, "status": DeploymentStatus.COMPLETED},
+                {"deployment_id": failed.id, "status": DeploymentStatus.FAILED},
+            ],
+        )
+        rejected = {str(rejection["deployment_id"]): rejection["error"] for rejection in result["rejected"]}
+        self.assertEqual(sorted(rejected), sorted(str(deployment_id) for deployment_id in (failed.id, queued.id, 999999, "abc")))
+        self.assertEqual(rejected["abc"], "Invalid deployment id")
+
+        statuses = dict(Deployment.objects.filter(cluster=self.cluster).values_list("id", "status"))
+        self.assertEqual(statuses[completed.id], DeploymentStatus.COMPLETED)
+        self.assertEqual(statuses[failed.id], DeploymentStatus.FAILED)
+        self.assertEqual(statuses[running.id], DeploymentStatus.IN_PROGRESS)
+        self.assertEqual(statuses[queued.id], DeploymentStatus.QUEUED)
+
+        self.cluster.refresh_from_db()
+        self.assertEqual(self.cluster.available_resources(), {"cpu": 4, "gpu": 2, "ram": 4})
+        self.assertFalse(self.deployment_service.pending_release().exists())
+        mock_send_task.assert_called_once()
+
+
 class TestDeploymentScheduling(TestCase):
     """
     Test Cases For Checking If High Priority Deployments Are Scheduled First.
@@ -164,17 +488,25 @@ class TestDeploymentScheduling(TestCase):
 
     def setUp(self) -> None:
         self.organization = Organization.objects.create(name="Test Organization")
+        # Fully allocated, so every deployment is queued
         self.cluster = Cluster.objects.create(
             gpu=1,
             cpu=2,
-            ram=2,
+            ram=32,
+            gpu_allocated=1,
+            cpu_allocated=2,
+            ram_allocated=32,
             name="Test Cluster",
             organization=self.organization,
         )
 
         self.deployment_service = DeploymentService()
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
 
-    @patch("core.services.deployment.RedisClient.z_range_by_score")
+    @patch("core.utils.queue.RedisClient.z_range_by_score")
     def test_high_priority_deployments_first(self, mock_z_range):
         """
         Test that high-priority deployments are scheduled before low-priority ones.
@@ -219,8 +551,8 @@ class TestDeploymentScheduling(TestCase):
 
         # Deployment IDs from Redis queue (mocked)
         deployment_ids_in_redis = mock_z_range(
-            self.deployment_service._DeploymentService__redis_client,
-            "DEPLOYMENT_QUEUE",
+            RedisClient(),
+            DeploymentQueue.key(self.cluster.id),
             "-inf",
             "+inf",
         )
@@ -232,3 +564,1714 @@ class TestDeploymentScheduling(TestCase):
         deployments = Deployment.objects.filter(cluster=self.cluster)
         for deployment in deployments:
             self.assertEqual(deployment.status, DeploymentStatus.QUEUED)
+
+
+class PlacementEngineTestCase(TestCase):
+    """
+    Test Cases For Scheduling Cycle Placement Strategies
+    """
+
+    def setUp(self) -> None:
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=4,
+            cpu=8,
+            ram=8,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+    def _deployments(self, specs: list) -> list:
+        """
+        Builds (unsaved) deployments from `(priority, cpu, gpu, ram)` tuples
+        """
+
+        queued_at = datetime(2024, 1, 1)
+        return [
+            Deployment(
+                id=index,
+                priority=priority,
+                cpu_required=cpu,
+                gpu_required=gpu,
+                ram_required=ram,
+                cluster=self.cluster,
+                queued_at=queued_at + timedelta(seconds=index),
+            )
+            for index, (priority, cpu, gpu, ram) in enumerate(specs, start=1)
+        ]
+
+    def test_strategy_without_place_can_not_be_instantiated(self):
+        """
+        Test that a placement strategy must implement `place`
+        """
+
+        class IncompletePlacementEngine(PlacementEngine):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompletePlacementEngine()
+
+    def test_greedy_places_in_priority_order(self):
+        """
+        Test that greedy placement follows priority and skips deployments which doesn't fit
+        """
+
+        deployments = self._deployments([(3, 2, 1, 2), (1, 6, 2, 6), (2, 4, 1, 4)])
+        available = {"cpu": 8, "gpu": 4, "ram": 8}
+
+        placed = get_placement_engine(PlacementStrategy.GREEDY).place(self.cluster, deployments, available)
+
+        self.assertEqual([deployment.id for deployment in placed], [2, 1])
+        self.assertEqual(available, {"cpu": 0, "gpu": 1, "ram": 0})
+
+    def test_best_fit_decreasing_reduces_fragmentation(self):
+        """
+        Test that largest deployments are placed first
+        """
+
+        deployments = self._deployments([(1, 2, 1, 2), (1, 2, 1, 2), (2, 6, 2, 6)])
+        available = {"cpu": 8, "gpu": 4, "ram": 8}
+
+        engine = get_placement_engine(PlacementStrategy.BEST_FIT_DECREASING)
+        placed = engine.place(self.cluster, deployments, available)
+
+        self.assertEqual([deployment.id for deployment in placed], [3, 1])
+
+    def test_knapsack_maximizes_priority_weight(self):
+        """
+        Test that knapsack prefers two high priority deployments over the single head deployment
+        """
+
+        deployments = self._deployments([(2, 8, 1, 8), (3, 4, 1, 4), (3, 4, 1, 4)])
+        available = {"cpu": 8, "gpu": 4, "ram": 8}
+
+        greedy = get_placement_engine(PlacementStrategy.GREEDY).place(self.cluster, deployments, dict(available))
+        knapsack = get_placement_engine(PlacementStrategy.KNAPSACK).place(self.cluster, deployments, dict(available))
+
+        self.assertEqual([deployment.id for deployment in greedy], [1])
+        self.assertEqual([deployment.id for deployment in knapsack], [2, 3])
+
+    def test_backfill_does_not_delay_head_reservation(self):
+        """
+        Test that only deployments estimated to complete before the blocked head's reservation are backfilled
+        """
+
+        now = timezone.now()
+        for image_path, duration in (("docker://test/short", 60), ("docker://test/long", 3600)):
+            Deployment.objects.create(
+                priority=1,
+                cpu_required=1,
+                gpu_required=1,
+                ram_required=1,
+                cluster=self.cluster,
+                image_path=image_path,
+                status=DeploymentStatus.COMPLETED,
+                started_at=now - timedelta(seconds=duration + 10),
+                completed_at=now - timedelta(seconds=10),
+            )
+
+        Deployment.objects.create(
+            priority=1,
+            cpu_required=4,
+            gpu_required=1,
+            ram_required=1,
+            cluster=self.cluster,
+            image_path="docker://test/long",
+            status=DeploymentStatus.IN_PROGRESS,
+            started_at=now - timedelta(seconds=100),
+        )
+
+        head, short, long = [
+            Deployment.objects.create(
+                priority=priority,
+                cpu_required=cpu,
+                gpu_required=1,
+                ram_required=1,
+                cluster=self.cluster,
+                image_path=image_path,
+            )
+            for priority, cpu, image_path in ((1, 8, "docker://test/long"), (5, 2, "docker://test/short"), (5, 2, "docker://test/long"))
+        ]
+        available = {"cpu": 4, "gpu": 3, "ram": 7}
+
+        greedy = get_placement_engine(PlacementStrategy.GREEDY).place(self.cluster, [head, short, long], dict(available))
+        backfill = get_placement_engine(PlacementStrategy.BACKFILL).place(self.cluster, [head, short, long], dict(available))
+
+        self.assertEqual(greedy, [short, long])
+        self.assertEqual(backfill, [short])
+
+    def test_unknown_strategy(self):
+        """
+        Test that an unknown strategy is rejected
+        """
+
+        with self.assertRaises(ValueError):
+            get_placement_engine("UNKNOWN")
+
+
+class ClusterQueueSchedulingTestCase(TestCase):
+    """
+    Test Cases For Per Cluster Deployment Queues (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.queue = DeploymentQueue()
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=1,
+            cpu=2,
+            ram=2,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        self.deployment_service = DeploymentService()
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+
+    def _create_deployment(self, priority: int = 1, cpu_required: int = 2) -> Deployment:
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.deployment_service.create(
+                NewDeploymentRequestEntity(
+                    priority=priority,
+                    cpu_required=cpu_required,
+                    gpu_required=1,
+                    ram_required=2,
+                    cluster_id=self.cluster.id,
+                    image_path="docker://test/image",
+                )
+            )
+
+    def test_queued_deployment_is_scheduled_on_its_cluster(self):
+        """
+        Test that a queued deployment is scheduled once its cluster has capacity, and the cluster is un-indexed
+        """
+
+        running = self._create_deployment()
+        queued = self._create_deployment()
+
+        self.assertEqual(running.status, DeploymentStatus.IN_PROGRESS)
+        self.assertEqual(queued.status, DeploymentStatus.QUEUED)
+        self.assertEqual(self.queue.members(self.cluster.id), [str(queued.id)])
+        self.assertIn(str(self.cluster.id), self.queue.clusters())
+
+        # Cluster is full, nothing should be scheduled
+        Scheduler().schedule_cluster(cluster_id=self.cluster.id)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, DeploymentStatus.QUEUED)
+
+        self.cluster.cpu, self.cluster.gpu, self.cluster.ram = 4, 2, 4
+        self.cluster.save()
+        CapacityLedger().seed(self.cluster, overwrite=True)
+
+        Scheduler().schedule_cluster(cluster_id=self.cluster.id)
+        queued.refresh_from_db()
+
+        self.assertEqual(queued.status, DeploymentStatus.IN_PROGRESS)
+        self.assertEqual(self.queue.members(self.cluster.id), [])
+        self.assertNotIn(str(self.cluster.id), self.queue.clusters())
+
+    def test_cycle_hydrates_queue_in_bulk(self):
+        """
+        Test that a cycle loads clusters and queued deployments in constant no. of queries
+        """
+
+        # Deployments which fit the cluster, but not next to the running one
+        Cluster.objects.filter(id=self.cluster.id).update(cpu=4, gpu=2, ram=4)
+        self._create_deployment(cpu_required=3)
+
+        for _index in range(20):
+            self._create_deployment(cpu_required=4)
+
+        # Stale queue entry, for a deployment which does not exist
+        RedisClient().z_add(DeploymentQueue.key(self.cluster.id), {"999999": 1})
+
+        with self.assertNumQueries(2):
+            Scheduler().schedule_cluster(cluster_id=self.cluster.id)
+
+        self.assertEqual(len(self.queue.members(self.cluster.id)), 20)
+        self.assertNotIn("999999", self.queue.members(self.cluster.id))
+
+    def test_placements_are_written_in_bulk(self):
+        """
+        Test that the no. of statements of a cycle doesn't grow with the no. of deployments it places
+        """
+
+        Cluster.objects.filter(id=self.cluster.id).update(cpu=100, gpu=100, ram=100)
+        self.cluster.refresh_from_db()
+        CapacityLedger().seed(self.cluster)
+
+        statements = []
+        for placements in (2, 20):
+            deployments = Deployment.objects.bulk_create(
+                Deployment(
+                    priority=1,
+                    cpu_required=1,
+                    gpu_required=1,
+                    ram_required=1,
+                    cluster=self.cluster,
+                    image_path="docker://test/image",
+                )
+                for _index in range(placements)
+            )
+            self.queue.push_many(deployments)
+
+            with CaptureQueriesContext(connection) as context:
+                Scheduler().schedule_cluster(cluster_id=self.cluster.id)
+
+            statements.append(len(context.captured_queries))
+
+        self.assertEqual(statements[0], statements[1])
+        self.assertEqual(Deployment.objects.filter(cluster=self.cluster, status=DeploymentStatus.IN_PROGRESS).count(), 22)
+        self.assertEqual(ResourceAllocation.objects.filter(cluster=self.cluster).count(), 22)
+
+        self.cluster.refresh_from_db()
+        self.assertEqual(self.cluster.available_resources(), {"cpu": 78, "gpu": 78, "ram": 78})
+        self.assertEqual(CapacityLedger().available(self.cluster.id), {"cpu": 78, "gpu": 78, "ram": 78})
+        self.assertEqual(self.queue.members(self.cluster.id), [])
+
+    def test_cluster_locked_by_another_worker_is_skipped(self):
+        """
+        Test that a cluster being scheduled by another worker is not scheduled again
+        """
+
+        self._create_deployment()
+        queued = self._create_deployment()
+        self.cluster.cpu, self.cluster.gpu, self.cluster.ram = 4, 2, 4
+        self.cluster.save()
+        CapacityLedger().seed(self.cluster, overwrite=True)
+
+        lock = RedisLock(f"SCHEDULER:{self.cluster.id}", ttl_ms=10_000)
+        self.assertTrue(lock.acquire())
+
+        self.assertFalse(Scheduler().schedule_cluster(cluster_id=self.cluster.id))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, DeploymentStatus.QUEUED)
+
+        self.assertTrue(lock.release())
+        self.assertTrue(Scheduler().schedule_cluster(cluster_id=self.cluster.id))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, DeploymentStatus.IN_PROGRESS)
+
+    @patch("core.tasks.schedule_cluster_deployments.delay")
+    def test_beat_fans_out_per_cluster(self, mock_delay):
+        """
+        Test that the beat job dispatches one scheduling task per cluster having queued deployments
+        """
+
+        self._create_deployment()
+        self._create_deployment()
+
+        consume_enqueued_deployments()
+
+        mock_delay.assert_called_once_with(str(self.cluster.id))
+
+
+@override_settings(SCHEDULER_EVENTS_ENABLED=True)
+class EventDrivenSchedulingTestCase(TestCase):
+    """
+    Test Cases For Capacity Change Events (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.queue = DeploymentQueue()
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=2,
+            cpu=4,
+            ram=4,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        self.deployment_service = DeploymentService()
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+
+    def _create_deployment(self) -> Deployment:
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.deployment_service.create(
+                NewDeploymentRequestEntity(
+                    priority=1,
+                    cpu_required=2,
+                    gpu_required=1,
+                    ram_required=2,
+                    cluster_id=self.cluster.id,
+                    image_path="docker://test/image",
+                )
+            )
+
+    @patch("core.utils.events.current_app.send_task")
+    def test_releases_are_debounced_into_single_run(self, mock_send_task):
+        """
+        Test that multiple releases on a cluster dispatch a single scheduling run, after commit
+        """
+
+        deployments = [self._create_deployment(), self._create_deployment()]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for deployment in deployments:
+                ResourceAllocationService().release_resources(deployment_id=deployment.id)
+
+            mock_send_task.assert_not_called()
+
+        mock_send_task.assert_called_once()
+        self.assertEqual(mock_send_task.call_args.kwargs["args"], [self.cluster.id])
+
+    @patch("core.utils.events.current_app.send_task")
+    def test_cancel_queued_deployment(self, mock_send_task):
+        """
+        Test that cancelling a queued deployment removes it from the queue, once committed
+        """
+
+        _ = mock_send_task
+        for _running in range(2):
+            self._create_deployment()
+
+        queued = self._create_deployment()
+        self.assertEqual(queued.status, DeploymentStatus.QUEUED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cancelled = self.deployment_service.cancel(deployment_id=queued.id)
+            self.assertEqual(self.queue.members(self.cluster.id), [str(queued.id)])
+
+        self.assertEqual(cancelled.status, DeploymentStatus.CANCELLED)
+        self.assertEqual(self.queue.members(self.cluster.id), [])
+
+
+class CapacityLedgerTestCase(TestCase):
+    """
+    Test Cases For Redis Capacity Ledger Admission Control (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.ledger = CapacityLedger()
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=2,
+            cpu=4,
+            ram=4,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        self.deployment_service = DeploymentService()
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+
+    def _payload(self) -> NewDeploymentRequestEntity:
+        return NewDeploymentRequestEntity(
+            priority=1,
+            cpu_required=2,
+            gpu_required=1,
+            ram_required=2,
+            cluster_id=self.cluster.id,
+            image_path="docker://test/image",
+        )
+
+    def test_reserve_is_seeded_lazily_and_bounded(self):
+        """
+        Test that the ledger is seeded from the DB and never reserves beyond the capacity
+        """
+
+        self.assertIsNone(self.ledger.available(self.cluster.id))
+
+        results = [self.ledger.reserve(self.cluster, cpu=2, gpu=1, ram=2) for _index in range(3)]
+
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(self.ledger.available(self.cluster.id), {"cpu": 0, "gpu": 0, "ram": 0})
+
+    @patch("core.services.resource.ResourceAllocation.objects.create", side_effect=RuntimeError("DB is down"))
+    def test_reservation_is_compensated_on_db_failure(self, mock_create):
+        """
+        Test that a failed DB write gives the reservation back to the ledger
+        """
+
+        _ = mock_create
+
+        with self.assertRaises(RuntimeError):
+            self.deployment_service.create(self._payload())
+
+        self.assertEqual(self.ledger.available(self.cluster.id), {"cpu": 4, "gpu": 2, "ram": 4})
+        self.assertFalse(Deployment.objects.filter(cluster=self.cluster).exists())
+
+
+class PreemptionTestCase(TestCase):
+    """
+    Test Cases For Priority Based Preemption (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.queue = DeploymentQueue()
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=3,
+            cpu=6,
+            ram=6,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        self.deployment_service = DeploymentService()
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+
+    def _create_deployment(self, priority: int) -> Deployment:
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.deployment_service.create(
+                NewDeploymentRequestEntity(
+                    priority=priority,
+                    cpu_required=2,
+                    gpu_required=1,
+                    ram_required=2,
+                    cluster_id=self.cluster.id,
+                    image_path="docker://test/image",
+                )
+            )
+
+    @override_settings(SCHEDULER_PREEMPTION_ENABLED=True)
+    def test_preempts_cheapest_lower_priority_deployment(self):
+        """
+        Test that the lower priority deployment which lost the least work is requeued for a higher priority one
+        """
+
+        high, old, new = self._create_deployment(1), self._create_deployment(5), self._create_deployment(5)
+        Deployment.objects.filter(id=old.id).update(started_at=timezone.now() - timedelta(seconds=1000))
+
+        critical = self._create_deployment(2)
+        self.assertEqual(critical.status, DeploymentStatus.QUEUED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Scheduler().schedule_cluster(cluster_id=self.cluster.id)
+
+        statuses = dict(Deployment.objects.filter(cluster=self.cluster).values_list("id", "status"))
+        self.assertEqual(statuses[critical.id], DeploymentStatus.IN_PROGRESS)
+        self.assertEqual(statuses[high.id], DeploymentStatus.IN_PROGRESS)
+        self.assertEqual(statuses[old.id], DeploymentStatus.IN_PROGRESS)
+        self.assertEqual(statuses[new.id], DeploymentStatus.QUEUED)
+
+        new_queued_at = Deployment.objects.get(id=new.id).queued_at
+        self.assertEqual(new_queued_at, new.queued_at)
+        self.assertEqual(self.queue.members(self.cluster.id), [str(new.id)])
+
+        self.cluster.refresh_from_db()
+        self.assertEqual(self.cluster.available_resources(), {"cpu": 0, "gpu": 0, "ram": 0})
+        self.assertEqual(CapacityLedger().available(self.cluster.id), {"cpu": 0, "gpu": 0, "ram": 0})
+
+    def test_preemption_is_disabled_by_default(self):
+        """
+        Test that nothing is preempted unless enabled
+        """
+
+        for priority in (5, 5, 5):
+            self._create_deployment(priority)
+
+        critical = self._create_deployment(1)
+        Scheduler().schedule_cluster(cluster_id=self.cluster.id)
+
+        critical.refresh_from_db()
+        self.assertEqual(critical.status, DeploymentStatus.QUEUED)
+
+
+class LifecycleEventsTestCase(TestCase):
+    """
+    Test Cases For The Lifecycle Events Outbox And Stream (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=2,
+            cpu=4,
+            ram=4,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        self.deployment_service = DeploymentService()
+        reset_cluster_state(self.cluster.id)
+        RedisClient().delete(STREAM_KEY)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+        RedisClient().delete(STREAM_KEY)
+
+    def _create_deployment(self) -> Deployment:
+        return self.deployment_service.create(
+            NewDeploymentRequestEntity(
+                priority=1,
+                cpu_required=2,
+                gpu_required=1,
+                ram_required=2,
+                cluster_id=self.cluster.id,
+                image_path="docker://test/image",
+            )
+        )
+
+    def test_events_are_published_on_commit(self):
+        """
+        Test that state changes are published to the stream once committed, in order
+        """
+
+        consumer = LifecycleEventConsumer(group="test", consumer="test-1")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deployment = self._create_deployment()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.deployment_service.bulk_finalize(
+                transitions=[
+                    DeploymentStatusTransitionEntity(deployment_id=deployment.id, status=DeploymentStatus.COMPLETED)
+                ]
+            )
+
+        messages = consumer.read()
+        self.assertEqual(
+            [event["event"] for _, event in messages],
+            [
+                LifecycleEvent.DEPLOYMENT_STARTED,
+                LifecycleEvent.ALLOCATION_CREATED,
+                LifecycleEvent.ALLOCATION_RELEASED,
+                LifecycleEvent.DEPLOYMENT_COMPLETED,
+            ],
+        )
+        self.assertEqual(messages[0][1]["entity_id"], deployment.id)
+        self.assertEqual(messages[1][1]["data"]["deployment_id"], deployment.id)
+        self.assertFalse(OutboxEvent.objects.filter(published_at__isnull=True).exists())
+
+        self.assertEqual(consumer.ack(*(message_id for message_id, _ in messages)), 4)
+        self.assertEqual(consumer.read(), [])
+
+    def test_unrelayed_events_are_caught_up(self):
+        """
+        Test that events which were not relayed on commit are published by the periodic relay, once
+        """
+
+        with self.captureOnCommitCallbacks(execute=False):
+            self._create_deployment()
+
+        outbox = LifecycleOutbox()
+        self.assertEqual(outbox.relay(), 2)
+        self.assertEqual(outbox.relay(), 0)
+
+        consumer = LifecycleEventConsumer(group="test", consumer="test-1")
+        self.assertEqual(len(consumer.read()), 2)
+
+    def test_stale_events_are_claimed(self):
+        """
+        Test that events left unacknowledged by a consumer can be taken over by another one
+        """
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_deployment()
+
+        crashed = LifecycleEventConsumer(group="test", consumer="test-1")
+        self.assertEqual(len(crashed.read()), 2)
+
+        takeover = LifecycleEventConsumer(group="test", consumer="test-2")
+        self.assertEqual(takeover.read(), [])
+        self.assertEqual(len(takeover.claim_stale(min_idle_ms=0)), 2)
+
+
+class ArchiveTestCase(TestCase):
+    """
+    Test Cases For Archival Of Finalized Deployments (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=4,
+            cpu=8,
+            ram=8,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        self.deployment_service = DeploymentService()
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+
+    def _create_deployment(self) -> Deployment:
+        return self.deployment_service.create(
+            NewDeploymentRequestEntity(
+                priority=1,
+                cpu_required=2,
+                gpu_required=1,
+                ram_required=2,
+                cluster_id=self.cluster.id,
+                image_path="docker://test/image",
+            )
+        )
+
+    def test_archives_old_finalized_deployments(self):
+        """
+        Test that only deployments finalized long enough ago are moved, along with their released allocation
+        """
+
+        old, recent, running = self._create_deployment(), self._create_deployment(), self._create_deployment()
+        self.deployment_service.bulk_finalize(
+            transitions=[
+                DeploymentStatusTransitionEntity(deployment_id=old.id, status=DeploymentStatus.COMPLETED),
+                DeploymentStatusTransitionEntity(deployment_id=recent.id, status=DeploymentStatus.FAILED),
+            ]
+        )
+        Deployment.objects.filter(id=old.id).update(completed_at=timezone.now() - timedelta(days=60))
+
+        archived = ArchiveService().archive(older_than=timedelta(days=30))
+        self.assertEqual(archived, {"deployments": 1, "allocations": 1})
+
+        self.assertEqual(set(Deployment.objects.values_list("id", flat=True)), {recent.id, running.id})
+        self.assertFalse(ResourceAllocation.objects.filter(deployment_id=old.id).exists())
+
+        archived_deployment = ArchiveService().get(deployment_id=old.id)
+        self.assertEqual(archived_deployment.status, DeploymentStatus.COMPLETED)
+        self.assertEqual(archived_deployment.queued_at, old.queued_at)
+        self.assertEqual(archived_deployment.resource_allocation.cpu_allocated, 2)
+
+        # Capacity is unaffected, archived allocations were released already
+        self.cluster.refresh_from_db()
+        self.assertEqual(self.cluster.available_resources(), {"cpu": 6, "gpu": 3, "ram": 6})
+        self.assertEqual(ArchiveService().archive(older_than=timedelta(days=30)), {"deployments": 0, "allocations": 0})
+        self.assertEqual(ArchivedDeployment.objects.count(), 1)
+
+    def test_archived_deployments_are_paged_by_cursor(self):
+        """
+        Test that the archive listing is read newest first by keyset, and rejects a malformed cursor
+        """
+
+        deployments = [self._create_deployment() for _ in range(3)]
+        self.deployment_service.bulk_finalize(
+            transitions=[
+                DeploymentStatusTransitionEntity(deployment_id=deployment.id, status=DeploymentStatus.COMPLETED)
+                for deployment in deployments
+            ]
+        )
+        Deployment.objects.update(completed_at=timezone.now() - timedelta(days=60))
+        ArchiveService().archive(older_than=timedelta(days=30))
+
+        user = User.objects.create_user(username="test_viewer", password="password@123")
+        Membership.objects.create(user=user, role=UserRole.VIEWER, organization=self.organization)
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        url, ids, cursor = reverse("archived-deployments"), [], None
+        while True:
+            response = client.get(url, {"limit": 2, **({"cursor": cursor} if cursor else {})})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [deployment["id"] for deployment in response.data["data"]["deployments"]]
+            cursor = response.data["data"]["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(ids, sorted((deployment.id for deployment in deployments), reverse=True))
+
+        response = client.get(url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class QueueExpiryTestCase(TestCase):
+    """
+    Test Cases For Queue Deadlines Of Deployments (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.queue = DeploymentQueue()
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=1,
+            cpu=2,
+            ram=2,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        self.deployment_service = DeploymentService()
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+
+    def _create_deployment(self, queue_ttl: Optional[int] = None) -> Deployment:
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.deployment_service.create(
+                NewDeploymentRequestEntity(
+                    priority=1,
+                    cpu_required=2,
+                    gpu_required=1,
+                    ram_required=2,
+                    cluster_id=self.cluster.id,
+                    image_path="docker://test/image",
+                    queue_ttl=queue_ttl,
+                )
+            )
+
+    def _expire_deadline(self, deployment: Deployment) -> None:
+        Deployment.objects.filter(id=deployment.id).update(queue_deadline=timezone.now() - timedelta(seconds=1))
+
+    def test_overdue_deployments_are_expired_in_bulk(self):
+        """
+        Test that only queued deployments past their deadline are failed, with the reason, and leave the queue
+        """
+
+        running = self._create_deployment(queue_ttl=60)
+        overdue, waiting, unbounded = self._create_deployment(60), self._create_deployment(60), self._create_deployment()
+
+        self.assertIsNone(running.queue_deadline)
+        self.assertIsNotNone(waiting.queue_deadline)
+        self.assertIsNone(unbounded.queue_deadline)
+
+        self._expire_deadline(overdue)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.deployment_service.expire_overdue(), 1)
+
+        overdue.refresh_from_db()
+        self.assertEqual(overdue.status, DeploymentStatus.FAILED)
+        self.assertEqual(overdue.failure_reason, "Queue deadline exceeded")
+        self.assertIsNotNone(overdue.completed_at)
+        self.assertTrue(OutboxEvent.objects.filter(event=LifecycleEvent.DEPLOYMENT_FAILED, entity_id=overdue.id).exists())
+
+        self.assertEqual(set(self.queue.members(self.cluster.id)), {str(waiting.id), str(unbounded.id)})
+        self.assertEqual(self.deployment_service.expire_overdue(), 0)
+
+    def test_scheduler_never_starts_overdue_deployments(self):
+        """
+        Test that a scheduling cycle expires overdue deployments rather than starting them
+        """
+
+        running = self._create_deployment()
+        overdue, waiting = self._create_deployment(queue_ttl=60), self._create_deployment(queue_ttl=60)
+        self._expire_deadline(overdue)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.deployment_service.cancel(deployment_id=running.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Scheduler().schedule_cluster(cluster_id=self.cluster.id)
+
+        overdue.refresh_from_db()
+        waiting.refresh_from_db()
+
+        self.assertEqual(overdue.status, DeploymentStatus.FAILED)
+        self.assertEqual(waiting.status, DeploymentStatus.IN_PROGRESS)
+        self.assertEqual(self.queue.members(self.cluster.id), [])
+
+
+class ParkedDeploymentTestCase(TestCase):
+    """
+    Test Cases For Deployments Exceeding Their Cluster's Total Capacity (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.queue = DeploymentQueue()
+        self.ledger = CapacityLedger()
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=2,
+            cpu=4,
+            ram=4,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        self.cluster_service = ClusterService()
+        self.deployment_service = DeploymentService()
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+
+    def _create_deployment(self, cpu_required: int) -> Deployment:
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.deployment_service.create(
+                NewDeploymentRequestEntity(
+                    priority=1,
+                    cpu_required=cpu_required,
+                    gpu_required=1,
+                    ram_required=2,
+                    cluster_id=self.cluster.id,
+                    image_path="docker://test/image",
+                )
+            )
+
+    def _resize(self, **resources) -> Cluster:
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.cluster_service.resize(cluster_id=self.cluster.id, payload=ClusterResizeRequestEntity(**resources))
+
+    def test_infeasible_deployment_is_parked_till_resized(self):
+        """
+        Test that a deployment exceeding total capacity is kept out of the queue, and queued once the cluster grows
+        """
+
+        running = self._create_deployment(cpu_required=2)
+        parked = self._create_deployment(cpu_required=8)
+
+        self.assertEqual(parked.status, DeploymentStatus.PARKED)
+        self.assertEqual(self.queue.members(self.cluster.id), [])
+        self.assertEqual(self.ledger.available(self.cluster.id), {"cpu": 2, "gpu": 1, "ram": 2})
+
+        self._resize(cpu=10)
+        parked.refresh_from_db()
+
+        self.assertEqual(parked.status, DeploymentStatus.QUEUED)
+        self.assertEqual(self.queue.members(self.cluster.id), [str(parked.id)])
+        self.assertEqual(self.ledger.available(self.cluster.id), {"cpu": 8, "gpu": 1, "ram": 2})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.deployment_service.cancel(deployment_id=running.id)
+            Scheduler().schedule_cluster(cluster_id=self.cluster.id)
+
+        parked.refresh_from_db()
+        self.assertEqual(parked.status, DeploymentStatus.IN_PROGRESS)
+
+    def test_shrinking_parks_queued_deployments(self):
+        """
+        Test that queued deployments which don't fit a shrunk cluster are parked, and it never shrinks below allocations
+        """
+
+        self._create_deployment(cpu_required=2)
+        queued = self._create_deployment(cpu_required=4)
+        self.assertEqual(queued.status, DeploymentStatus.QUEUED)
+
+        self._resize(cpu=3)
+        queued.refresh_from_db()
+
+        self.assertEqual(queued.status, DeploymentStatus.PARKED)
+        self.assertEqual(self.queue.members(self.cluster.id), [])
+        self.assertEqual(self.ledger.available(self.cluster.id)["cpu"], 1)
+
+        with self.assertRaises(BadRequestError):
+            self._resize(cpu=1)
+
+        self.cluster.refresh_from_db()
+        self.assertEqual(self.cluster.cpu, 3)
+        self.assertEqual(self.ledger.available(self.cluster.id)["cpu"], 1)
+
+
+class ClusterDeletionTestCase(TestCase):
+    """
+    Test Cases For Purging The Work Of Deleted Clusters (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.queue = DeploymentQueue()
+        self.ledger = CapacityLedger()
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=2,
+            cpu=4,
+            ram=4,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        self.deployment_service = DeploymentService()
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+
+    def _create_deployment(self, cpu_required: int) -> Deployment:
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.deployment_service.create(
+                NewDeploymentRequestEntity(
+                    priority=1,
+                    cpu_required=cpu_required,
+                    gpu_required=1,
+                    ram_required=2,
+                    cluster_id=self.cluster.id,
+                    image_path="docker://test/image",
+                )
+            )
+
+    def test_deletion_purges_queued_and_running_work(self):
+        """
+        Test that deleting a cluster cancels its deployments, releases their resources and drops its queue
+        """
+
+        running = self._create_deployment(cpu_required=2)
+        queued = [self._create_deployment(cpu_required=4) for _ in range(3)]
+        parked = self._create_deployment(cpu_required=8)
+
+        self.assertEqual(len(self.queue.members(self.cluster.id)), 3)
+        self.assertIn(str(self.cluster.id), self.queue.clusters())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            purged = ClusterService().delete(cluster_id=self.cluster.id)
+
+        self.assertEqual(sorted(purged["cancelled"]), sorted(deployment.id for deployment in [running, *queued, parked]))
+        self.assertEqual(purged["released"], [running.id])
+
+        deployments = Deployment.objects.filter(cluster=self.cluster)
+        self.assertFalse(deployments.exclude(status=DeploymentStatus.CANCELLED).exists())
+        self.assertFalse(deployments.filter(completed_at__isnull=True).exists())
+        self.assertEqual(set(deployments.values_list("failure_reason", flat=True)), {"Cluster deleted"})
+        self.assertFalse(ResourceAllocation.objects.filter(cluster=self.cluster, is_deleted=False).exists())
+
+        self.cluster.refresh_from_db()
+        self.assertTrue(self.cluster.is_deleted)
+        self.assertEqual((self.cluster.cpu_allocated, self.cluster.gpu_allocated, self.cluster.ram_allocated), (0, 0, 0))
+
+        self.assertEqual(self.queue.members(self.cluster.id), [])
+        self.assertNotIn(str(self.cluster.id), self.queue.clusters())
+        self.assertIsNone(self.ledger.available(self.cluster.id))
+
+        with self.assertRaises(ResourceDoesNotExistsError):
+            ClusterService().delete(cluster_id=self.cluster.id)
+
+
+class ClusterListingTestCase(TestCase):
+    """
+    Test Cases For Listing Clusters With Their Available Resources
+    """
+
+    def setUp(self) -> None:
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.other_organization = Organization.objects.create(name="Other Organization")
+
+        user = User.objects.create_user(username="test_admin", password="password@123")
+        Membership.objects.create(user=user, role=UserRole.ADMIN, organization=self.organization)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+        self.clusters = Cluster.objects.bulk_create(
+            Cluster(
+                cpu=8,
+                gpu=4,
+                ram=8,
+                cpu_allocated=index,
+                name=f"Test Cluster {index}",
+                organization=self.organization if index % 2 else self.other_organization,
+            )
+            for index in range(6)
+        )
+        self.clusters[0].delete()
+
+        # Created in bulk, i.e. not through the service which invalidates the cached listings
+        ResponseCache().invalidate(CLUSTERS_SCOPE, organization_scope(self.organization.id))
+
+    def _list(self, **params) -> Tuple[list, Optional[str]]:
+        response = self.client.get(reverse("clusters"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["data"]["clusters"], response.data["data"]["next_cursor"]
+
+    def test_listing_is_paginated_and_filtered(self):
+        """
+        Test that clusters are listed newest first by keyset, filtered by organization and free capacity, in one query
+        """
+
+        # Only the clusters are read, however many are listed
+        with self.assertNumQueries(1):
+            page, cursor = self._list(limit=3)
+
+        self.assertEqual([cluster["id"] for cluster in page], [cluster.id for cluster in self.clusters[5:2:-1]])
+        self.assertEqual(page[0]["available_resources"], {"cpu": 3, "ram": 8, "gpu": 4})
+        self.assertIsNotNone(cursor)
+
+        page, cursor = self._list(limit=3, cursor=cursor)
+        self.assertEqual([cluster["id"] for cluster in page], [self.clusters[2].id, self.clusters[1].id])
+        self.assertIsNone(cursor)
+
+        page, cursor = self._list(organization_id=self.organization.id, min_cpu=5)
+        self.assertEqual([cluster["id"] for cluster in page], [self.clusters[3].id, self.clusters[1].id])
+        self.assertIsNone(cursor)
+
+        response = self.client.get(reverse("clusters"), {"min_gpu": -1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse("clusters"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch("core.views.cluster.ClusterSerializer", side_effect=RuntimeError("Serializer exploded"))
+    def test_listing_failure_is_reported(self, mock_serializer):
+        """
+        Test that an unexpected failure while listing is returned as an error response
+        """
+
+        _ = mock_serializer
+        with self.assertLogs("core.views.cluster", level="ERROR"):
+            response = self.client.get(reverse("clusters"))
+
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(response.data["message"], "Something went wrong")
+
+
+class DeploymentQueryTestCase(TestCase):
+    """
+    Test Cases For Reading Deployments
+    """
+
+    def setUp(self) -> None:
+        self.organization = Organization.objects.create(name="Test Organization")
+        other_organization = Organization.objects.create(name="Other Organization")
+
+        user = User.objects.create_user(username="test_admin", password="password@123")
+        Membership.objects.create(user=user, role=UserRole.ADMIN, organization=self.organization)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+        self.cluster = Cluster.objects.create(cpu=8, gpu=4, ram=8, name="Test Cluster", organization=self.organization)
+        other_cluster = Cluster.objects.create(cpu=8, gpu=4, ram=8, name="Other Cluster", organization=other_organization)
+
+        self.deployments = Deployment.objects.bulk_create(
+            Deployment(
+                cpu_required=1,
+                gpu_required=1,
+                ram_required=1,
+                priority=index % 3,
+                image_path="docker://test/image",
+                cluster=self.cluster if index % 4 else other_cluster,
+                status=DeploymentStatus.IN_PROGRESS if index % 5 == 0 else DeploymentStatus.QUEUED,
+            )
+            for index in range(20)
+        )
+
+    def _list(self, **params) -> dict:
+        response = self.client.get(reverse("deployments"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["data"]
+
+    def test_deployments_are_paged_by_keyset(self):
+        """
+        Test that filtered deployments are paged in (status, priority, queued_at) order, one query per page
+        """
+
+        expected = sorted(
+            (
+                deployment
+                for deployment in self.deployments
+                if deployment.status == DeploymentStatus.QUEUED and deployment.cluster_id == self.cluster.id
+            ),
+            key=lambda deployment: (deployment.priority, deployment.queued_at, deployment.id),
+        )
+
+        listed, cursor = [], None
+        while True:
+            with self.assertNumQueries(1):
+                page = self._list(status=DeploymentStatus.QUEUED, organization_id=self.organization.id, limit=4, cursor=cursor or "")
+
+            listed += [deployment["id"] for deployment in page["deployments"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(listed, [deployment.id for deployment in expected])
+
+        everything = self._list(limit=500)["deployments"]
+        self.assertEqual(len(everything), 20)
+        self.assertEqual(everything[0]["status"], DeploymentStatus.IN_PROGRESS)
+
+        page = self._list(min_priority=1, max_priority=1, fields="id,priority", limit=500)
+        self.assertEqual({tuple(deployment) for deployment in page["deployments"]}, {("id", "priority")})
+        self.assertEqual({deployment["priority"] for deployment in page["deployments"]}, {1})
+
+    def test_invalid_queries_are_rejected(self):
+        """
+        Test that unknown fields and cursors which can't be decoded are rejected
+        """
+
+        for params in ({"fields": "id,secret"}, {"cursor": "not-a-cursor"}, {"status": "UNKNOWN"}):
+            response = self.client.get(reverse("deployments"), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cursors_of_mismatched_types_are_rejected(self):
+        """
+        Test that cursors which decode, but whose values don't fit the ordering fields, are rejected
+        """
+
+        for values in ([1, 1, 1, 1], ["QUEUED", 1, {"a": 1}, 1], ["QUEUED", "high", "2024-01-01T00:00:00+00:00", 1]):
+            cursor = urlsafe_b64encode(dumps(values).encode()).decode()
+            response = self.client.get(reverse("deployments"), {"cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class OrganizationListingTestCase(TestCase):
+    """
+    Test Cases For Listing Organizations With Their Invite Codes
+    """
+
+    def setUp(self) -> None:
+        service = OrganizationService()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organizations = [service.create(OrganizationRequestEntity(name=f"Organization {index}")) for index in range(6)]
+
+        # The first invite code is revoked, the next active one is listed
+        InviteCode.objects.filter(organization=self.organizations[-1]).update(is_active=False)
+        self.invite_code = InviteCode.objects.create(organization=self.organizations[-1])
+
+        user = User.objects.create_user(username="test_admin", password="password@123")
+        Membership.objects.create(user=user, role=UserRole.ADMIN, organization=self.organizations[0])
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+    def test_listing_runs_constant_queries(self):
+        """
+        Test that organizations and their invite codes are read in two queries, however many are listed
+        """
+
+        for limit in (2, 6):
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse("organizations"), {"limit": limit})
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data["data"]["organizations"]), limit)
+
+        organizations = response.data["data"]["organizations"]
+        self.assertIsNone(response.data["data"]["next_cursor"])
+        self.assertEqual(
+            [organization["id"] for organization in organizations], [organization.id for organization in self.organizations[::-1]]
+        )
+        self.assertEqual(set(organizations[0]), {"id", "name", "created_at", "modified_at", "invite_code"})
+        self.assertEqual(organizations[0]["invite_code"], str(self.invite_code.code))
+
+        response = self.client.get(reverse("organizations"), {"limit": 2})
+        response = self.client.get(reverse("organizations"), {"cursor": response.data["data"]["next_cursor"]})
+        self.assertEqual(
+            [organization["id"] for organization in response.data["data"]["organizations"]],
+            [organization["id"] for organization in organizations[2:]],
+        )
+
+
+class ResponseCacheTestCase(TestCase):
+    """
+    Test Cases For Caching Reads, Invalidated By Writes (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.organization = Organization.objects.create(name="Test Organization")
+
+        user = User.objects.create_user(username="test_admin", password="password@123")
+        Membership.objects.create(user=user, role=UserRole.ADMIN, organization=self.organization)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cluster = ClusterService().create(
+                ClusterRequestEntity(cpu=4, gpu=2, ram=4, name="Test Cluster", organization_id=self.organization.id)
+            )
+
+        self.cache = ResponseCache()
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+
+    def _available(self, path: str, queries: int) -> dict:
+        with self.assertNumQueries(queries):
+            response = self.client.get(path)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data["data"]
+        return data["clusters"][0]["available_resources"] if "clusters" in data else data["available_resources"]
+
+    def test_reads_are_cached_till_a_write(self):
+        """
+        Test that reads are served from the cache, and that a write to the cluster invalidates them once committed
+        """
+
+        detail = reverse("cluster-detail", args=[self.cluster.id])
+        listing = f"{reverse('clusters')}?organization_id={self.organization.id}"
+        before = self.cache.metrics().get("cluster", {"hits": 0, "misses": 0})
+
+        self.assertEqual(self._available(detail, queries=1), {"cpu": 4, "gpu": 2, "ram": 4})
+        self.assertEqual(self._available(detail, queries=0), {"cpu": 4, "gpu": 2, "ram": 4})
+        self.assertEqual(self._available(listing, queries=1), {"cpu": 4, "gpu": 2, "ram": 4})
+        self.assertEqual(self._available(listing, queries=0), {"cpu": 4, "gpu": 2, "ram": 4})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            DeploymentService().create(
+                NewDeploymentRequestEntity(
+                    priority=1,
+                    cpu_required=2,
+                    gpu_required=1,
+                    ram_required=2,
+                    cluster_id=self.cluster.id,
+                    image_path="docker://test/image",
+                )
+            )
+
+        self.assertEqual(self._available(detail, queries=1), {"cpu": 2, "gpu": 1, "ram": 2})
+        self.assertEqual(self._available(listing, queries=1), {"cpu": 2, "gpu": 1, "ram": 2})
+
+        after = self.cache.metrics()["cluster"]
+        self.assertEqual(after["hits"] - before["hits"], 1)
+        self.assertEqual(after["misses"] - before["misses"], 2)
+
+    def test_allocation_writes_invalidate_without_reading_the_cluster(self):
+        """
+        Test that allocations and releases invalidate their organization's listings without looking the organization up
+        """
+
+        listing = f"{reverse('clusters')}?organization_id={self.organization.id}"
+        self.assertEqual(self._available(listing, queries=1), {"cpu": 4, "gpu": 2, "ram": 4})
+
+        with patch("core.utils.cache.Cluster") as mock_cluster, self.captureOnCommitCallbacks(execute=True):
+            deployment = DeploymentService().create(
+                NewDeploymentRequestEntity(
+                    priority=1,
+                    cpu_required=2,
+                    gpu_required=1,
+                    ram_required=2,
+                    cluster_id=self.cluster.id,
+                    image_path="docker://test/image",
+                )
+            )
+            ResourceAllocationService().bulk_release_resources(deployment_ids=[deployment.id])
+
+        mock_cluster.objects.filter.assert_not_called()
+        self.assertEqual(self._available(listing, queries=1), {"cpu": 4, "gpu": 2, "ram": 4})
+
+
+class BatchSubmissionTestCase(TestCase):
+    """
+    Test Cases For Submitting Deployments In Bulk (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.queue = DeploymentQueue()
+        self.ledger = CapacityLedger()
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=2,
+            cpu=4,
+            ram=4,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        user = User.objects.create_user(username="test_admin", password="password@123")
+        Membership.objects.create(user=user, role=UserRole.ADMIN, organization=self.organization)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+
+    def _payload(self, cpu_required: int, cluster_id: Optional[int] = None) -> dict:
+        return {
+            "priority": 1,
+            "cpu_required": cpu_required,
+            "gpu_required": 1,
+            "ram_required": 1,
+            "cluster_id": cluster_id or self.cluster.id,
+            "image_path": "docker://test/image",
+        }
+
+    def test_batch_is_admitted_against_one_snapshot(self):
+        """
+        Test that a batch starts what fits in order, queues or parks the rest, and reports a result per item
+        """
+
+        payloads = [self._payload(2), self._payload(2), self._payload(2), self._payload(8), self._payload(1, cluster_id=999999)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("deployment-batch"), {"deployments": payloads}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["data"]
+
+        self.assertEqual(
+            [result.get("status") for result in results],
+            [DeploymentStatus.IN_PROGRESS, DeploymentStatus.IN_PROGRESS, DeploymentStatus.QUEUED, DeploymentStatus.PARKED, None],
+        )
+        self.assertEqual(results[4], {"index": 4, "error": "Cluster does not exists"})
+
+        self.assertEqual(self.queue.members(self.cluster.id), [str(results[2]["id"])])
+        self.assertEqual(
+            set(ResourceAllocation.objects.filter(cluster=self.cluster).values_list("deployment_id", flat=True)),
+            {results[0]["id"], results[1]["id"]},
+        )
+
+        self.cluster.refresh_from_db()
+        self.assertEqual(self.cluster.available_resources(), {"cpu": 0, "gpu": 0, "ram": 2})
+        self.assertEqual(self.ledger.available(self.cluster.id), {"cpu": 0, "gpu": 0, "ram": 2})
+        self.assertEqual(OutboxEvent.objects.filter(event=LifecycleEvent.ALLOCATION_CREATED).count(), 2)
+
+        response = self.client.post(reverse("deployment-batch"), {"deployments": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_statements_do_not_grow_with_its_size(self):
+        """
+        Test that the no. of statements of a batch doesn't depend on the no. of deployments in it
+        """
+
+        Cluster.objects.filter(id=self.cluster.id).update(cpu=100, gpu=100, ram=100)
+        self.cluster.refresh_from_db()
+        self.ledger.seed(self.cluster)
+
+        statements = []
+        for size in (2, 20):
+            payloads = [NewDeploymentRequestEntity(**self._payload(1)) for _ in range(size)]
+
+            with CaptureQueriesContext(connection) as context:
+                results = DeploymentService().create_many(payloads=payloads)
+
+            statements.append(len(context.captured_queries))
+            self.assertEqual({result["status"] for result in results}, {DeploymentStatus.IN_PROGRESS})
+
+        self.assertEqual(statements[0], statements[1])
+        self.assertEqual(ResourceAllocation.objects.filter(cluster=self.cluster).count(), 22)
+
+
+class QueueReconciliationTestCase(TestCase):
+    """
+    Test Cases For Reconciling Redis Queues With The DB (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.queue = DeploymentQueue()
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=1,
+            cpu=2,
+            ram=2,
+            cpu_allocated=2,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        self.deployment_service = DeploymentService()
+        reset_cluster_state(self.cluster.id)
+        RedisClient().delete(METRICS_KEY)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+        RedisClient().delete(METRICS_KEY)
+
+    def _create_deployment(self, priority: int = 1) -> Deployment:
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.deployment_service.create(
+                NewDeploymentRequestEntity(
+                    priority=priority,
+                    cpu_required=2,
+                    gpu_required=1,
+                    ram_required=2,
+                    cluster_id=self.cluster.id,
+                    image_path="docker://test/image",
+                )
+            )
+
+    def test_drifted_queue_is_rebuilt(self):
+        """
+        Test that missing and mis-scored deployments are restored, orphans removed, and the drift is exported
+        """
+
+        deployments = [self._create_deployment(priority=priority) for priority in (1, 2, 3)]
+        self.assertEqual(len(self.queue.members(self.cluster.id)), 3)
+
+        # Redis lost an entry, another one got a stale score, and one isn't queued anymore in the DB
+        self.queue.remove(self.cluster.id, [deployments[0].id])
+        RedisClient().z_add(DeploymentQueue.key(self.cluster.id), {deployments[1].id: 9, "999999": 1})
+
+        report = QueueReconciler().reconcile(dry_run=True)
+        self.assertEqual(report["drift"], {str(self.cluster.id): {"missing": 1, "rescored": 1, "orphaned": 1}})
+        self.assertEqual(len(self.queue.members(self.cluster.id)), 3)
+
+        report = QueueReconciler().reconcile()
+        self.assertEqual((report["queued"], report["missing"], report["rescored"], report["orphaned"]), (3, 1, 1, 1))
+        self.assertEqual(self.queue.members(self.cluster.id), [str(deployment.id) for deployment in deployments])
+
+        self.assertEqual(QueueReconciler().reconcile()["drift"], {})
+
+        metrics = RedisClient().h_get_all(METRICS_KEY)
+        self.assertEqual((metrics["runs_total"], metrics["missing_total"], metrics["orphaned"]), ("2", "1", "0"))
+
+    def test_cluster_being_scheduled_is_skipped(self):
+        """
+        Test that a cluster is left alone while it is locked by a scheduling cycle
+        """
+
+        self._create_deployment()
+        self.queue.drop(self.cluster.id)
+
+        lock = RedisLock(name=f"SCHEDULER:{self.cluster.id}", ttl_ms=10_000)
+        self.assertTrue(lock.acquire())
+
+        try:
+            report = QueueReconciler().reconcile()
+        finally:
+            lock.release()
+
+        self.assertEqual(report["skipped"], [str(self.cluster.id)])
+        self.assertEqual(self.queue.members(self.cluster.id), [])
+
+
+class LedgerReconciliationTestCase(TestCase):
+    """
+    Test Cases For Reconciling Redis Capacity Ledgers With The DB (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.ledger = CapacityLedger()
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=2,
+            cpu=4,
+            ram=4,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        reset_cluster_state(self.cluster.id)
+        RedisClient().delete(LEDGER_DRIFT_KEY)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+        RedisClient().delete(LEDGER_DRIFT_KEY)
+
+    def _reconcile(self) -> Tuple[Optional[Dict], bool]:
+        report = LedgerReconciler().reconcile()
+        return report["drift"].get(str(self.cluster.id)), str(self.cluster.id) in report["reseeded"]
+
+    def test_leaked_reservation_is_reseeded_once_confirmed(self):
+        """
+        Test that a reservation which never made it to the DB is given back, once found by two consecutive runs
+        """
+
+        # The process died right after reserving, the allocation was never written
+        self.assertTrue(self.ledger.reserve(self.cluster, cpu=2, gpu=1, ram=2))
+
+        self.assertEqual(self._reconcile(), ({"cpu": -2, "gpu": -1, "ram": -2}, False))
+        self.assertEqual(self.ledger.available(self.cluster.id), {"cpu": 2, "gpu": 1, "ram": 2})
+
+        self.assertEqual(self._reconcile(), ({"cpu": -2, "gpu": -1, "ram": -2}, True))
+        self.assertEqual(self.ledger.available(self.cluster.id), {"cpu": 4, "gpu": 2, "ram": 4})
+
+        self.assertEqual(self._reconcile(), (None, False))
+
+    def test_in_flight_reservation_is_left_alone(self):
+        """
+        Test that a reservation whose allocation commits before the next run is not mistaken for a leak
+        """
+
+        self.assertTrue(self.ledger.reserve(self.cluster, cpu=2, gpu=1, ram=2))
+        self.assertEqual(self._reconcile(), ({"cpu": -2, "gpu": -1, "ram": -2}, False))
+
+        Cluster.objects.filter(id=self.cluster.id).update(cpu_allocated=2, gpu_allocated=1, ram_allocated=2)
+
+        self.assertEqual(self._reconcile(), (None, False))
+        self.assertEqual(self.ledger.available(self.cluster.id), {"cpu": 2, "gpu": 1, "ram": 2})
+        self.assertEqual(RedisClient().h_get_all(LEDGER_DRIFT_KEY).get(str(self.cluster.id)), None)
+
+    def test_reseed_keeps_changes_made_since_the_comparison(self):
+        """
+        Test that a ledger is not re-seeded if it was reserved on after its drift was read
+        """
+
+        self.assertTrue(self.ledger.reserve(self.cluster, cpu=2, gpu=1, ram=2))
+        compared = self.ledger.available(self.cluster.id)
+
+        self.assertTrue(self.ledger.reserve(self.cluster, cpu=1, gpu=0, ram=1))
+        self.assertFalse(self.ledger.reseed(self.cluster, expected=compared))
+        self.assertEqual(self.ledger.available(self.cluster.id), {"cpu": 1, "gpu": 1, "ram": 1})
+
+
+class SingletonTaskTestCase(TestCase):
+    """
+    Test Cases For Singleton Task Execution (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.name = "test.singleton"
+        RedisClient().delete(f"TASK_FOLLOW_UP:{self.name}", RedisLock(f"TASK:{self.name}", ttl_ms=0).key)
+
+    def test_overlapping_invocations_are_coalesced(self):
+        """
+        Test that invocations arriving during a run are coalesced into a single follow-up run
+        """
+
+        runs = []
+
+        @singleton(name=self.name)
+        def task() -> int:
+            runs.append(len(runs))
+            if len(runs) == 1:
+                # Overlapping invocations, e.g. beat firing while the first run is still going
+                self.assertEqual([task(), task(), task()], [None, None, None])
+            return len(runs)
+
+        self.assertEqual(task(), 2)
+        self.assertEqual(runs, [0, 1])
+
+        # Nothing is left behind, the next invocation runs right away
+        self.assertEqual(task(), 3)
+
+    @override_settings(TASK_LOCK_TTL_MS=300)
+    def test_heartbeat_keeps_the_lease(self):
+        """
+        Test that a run longer than the lease TTL keeps holding the lock
+        """
+
+        lock_key = RedisLock(f"TASK:{self.name}", ttl_ms=0).key
+
+        @singleton(name=self.name)
+        def task() -> bool:
+            sleep(0.7)
+            return RedisClient().get_connection().exists(lock_key) == 1
+
+        self.assertTrue(task())
+        self.assertEqual(RedisClient().get_connection().exists(lock_key), 0)
+
+
+class PreemptionCommitOrderTestCase(TransactionTestCase):
+    """
+    Test Cases For Preemption With Real Commits, i.e. Redis Writes Happen In Commit Order (Requires Redis)
+    """
+
+    def setUp(self) -> None:
+        self.queue = DeploymentQueue()
+        self.organization = Organization.objects.create(name="Test Organization")
+        self.cluster = Cluster.objects.create(
+            gpu=4,
+            cpu=4,
+            ram=4,
+            name="Test Cluster",
+            organization=self.organization,
+        )
+
+        self.deployment_service = DeploymentService()
+        reset_cluster_state(self.cluster.id)
+
+    def tearDown(self) -> None:
+        reset_cluster_state(self.cluster.id)
+
+    def _create_deployment(self, priority: int, size: int) -> Deployment:
+        return self.deployment_service.create(
+            NewDeploymentRequestEntity(
+                priority=priority,
+                cpu_required=size,
+                gpu_required=size,
+                ram_required=size,
+                cluster_id=self.cluster.id,
+                image_path="docker://test/image",
+            )
+        )
+
+    @override_settings(SCHEDULER_PREEMPTION_ENABLED=True)
+    def test_deployment_evicted_in_its_placement_cycle_stays_queued(self):
+        """
+        Test that a deployment placed and then preempted within the same cycle is not dropped from the queue
+        """
+
+        self._create_deployment(priority=5, size=2)
+        finished = self._create_deployment(priority=5, size=2)
+        evicted, critical = self._create_deployment(priority=3, size=2), self._create_deployment(priority=1, size=4)
+
+        self.deployment_service.clean_up_deployment(deployment_id=finished.id, status=DeploymentStatus.COMPLETED)
+        Scheduler().schedule_cluster(cluster_id=self.cluster.id)
+
+        critical.refresh_from_db()
+        evicted.refresh_from_db()
+
+        self.assertEqual(critical.status, DeploymentStatus.IN_PROGRESS)
+        self.assertEqual(evicted.status, DeploymentStatus.QUEUED)
+        self.assertIn(str(evicted.id), self.queue.members(self.cluster.id))
+
+
+class SchedulerSimulationTestCase(TransactionTestCase):
+    """
+    Test Cases For The Offline Scheduler Simulation (Requires Redis)
+    """
+
+    def _simulate(self, trace: WorkloadTrace) -> dict:
+        simulation = SchedulerSimulation(trace=trace)
+
+        for cluster in simulation.prepare():
+            reset_cluster_state(cluster.id)
+
+        try:
+            return simulation.run()
+        finally:
+            for cluster in simulation.clusters:
+                reset_cluster_state(cluster.id)
+
+    def test_replays_trace_on_virtual_clock(self):
+        """
+        Test that a trace is replayed in virtual time and the metrics are reported from it
+        """
+
+        trace = WorkloadTrace(
+            clusters=[SimulatedCluster(name="Simulated Cluster", cpu=4, gpu=1, ram=1024)],
+            deployments=[
+                SimulatedDeployment(arrival=0, duration=20, priority=2, cpu=4, gpu=1, ram=1024),
+                SimulatedDeployment(arrival=0, duration=10, priority=1, cpu=4, gpu=1, ram=1024),
+            ],
+        )
+
+        report = self._simulate(trace)
+
+        self.assertEqual(report["deployments"], {"submitted": 2, "completed": 2, "unscheduled": 0, "preemptions": 0})
+        self.assertEqual(report["makespan"], 30)
+        self.assertEqual(report["utilization"], {"cpu": 1, "gpu": 1, "ram": 1})
+        self.assertEqual(report["queue_wait"]["max"], 20)
+
+        # Recorded run times follow the virtual clock, not the wall clock
+        run_times = sorted(
+            (deployment.completed_at - deployment.started_at).total_seconds() for deployment in Deployment.objects.all()
+        )
+        self.assertAlmostEqual(run_times[0], 10, delta=1)
+        self.assertAlmostEqual(run_times[1], 20, delta=1)
+
+    def test_synthetic_trace_completes(self):
+        """
+        Test that a seeded synthetic workload is reproducible and runs to completion
+        """
+
+        trace = synthetic_trace(deployments=20, clusters=2, seed=7)
+        self.assertEqual(trace, synthetic_trace(deployments=20, clusters=2, seed=7))
+
+        report = self._simulate(trace)
+
+        self.assertEqual(report["deployments"]["completed"], 20)
+        self.assertGreater(report["cycle_latency_ms"]["cycles"], 0)
+        self.assertTrue(all(0 < share <= 1 for share in report["utilization"].values()))
+
+    def test_command_refuses_redis_dbs_in_use(self):
+        """
+        Test that the simulation command refuses the app's (or Celery's) Redis DB, and any DB which holds keys
+        """
+
+        with self.assertRaisesMessage(CommandError, "used by the application or Celery"):
+            call_command("simulate_scheduler", "--synthetic", "1", "--redis-db", "0")
+
+        with patch("redis.StrictRedis.dbsize", return_value=3), self.assertRaisesMessage(CommandError, "already holds 3 keys"):
+            call_command("simulate_scheduler", "--synthetic", "1", "--redis-db", "15")
+
+        self.assertEqual(RedisClient().get_connection().connection_pool.connection_kwargs["db"], settings.REDIS_DB)
+
+    def test_trace_with_unknown_cluster_is_rejected(self):
+        """
+        Test that a trace whose deployment refers to a cluster missing from it is rejected when parsed
+        """
+
+        trace = {
+            "clusters": [{"name": "Simulated Cluster", "cpu": 4, "gpu": 1, "ram": 1024}],
+            "deployments": [{"arrival": 0, "duration": 10, "cluster": 1, "priority": 1, "cpu": 1, "gpu": 1, "ram": 1}],
+        }
+
+        with self.assertRaisesMessage(ValidationError, "refers to cluster 1"):
+            WorkloadTrace.model_validate(trace)
+
+        with NamedTemporaryFile(mode="w", suffix=".json") as trace_file:
+            trace_file.write(dumps(trace))
+            trace_file.flush()
+
+            with self.assertRaisesMessage(CommandError, "Invalid workload trace"):
+                call_command("simulate_scheduler", "--trace", trace_file.name)
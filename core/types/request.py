@@ -1,8 +1,9 @@
-from typing import Union
+from datetime import datetime
+from typing import List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field, PositiveInt, constr
+from pydantic import BaseModel, Field, NonNegativeInt, PositiveInt, constr, field_validator
 
-from core.constants import UserRole
+from core.constants import DeploymentStatus, UserRole
 
 
 class ClusterRequestEntity(BaseModel):
@@ -17,6 +18,29 @@ class ClusterRequestEntity(BaseModel):
     organization_id: Union[str, int]
 
 
+class ClusterResizeRequestEntity(BaseModel):
+    """
+    Request entity to resize a `Cluster`, resources which aren't given are left as is
+    """
+
+    cpu: Optional[PositiveInt] = None
+    ram: Optional[PositiveInt] = None
+    gpu: Optional[PositiveInt] = None
+
+
+class ClusterQueryEntity(BaseModel):
+    """
+    Query entity to list `Cluster`, newest first, `cursor` pages past the last one read, `min_*` are free capacity thresholds
+    """
+
+    organization_id: Optional[int] = None
+    min_cpu: Optional[NonNegativeInt] = None
+    min_ram: Optional[NonNegativeInt] = None
+    min_gpu: Optional[NonNegativeInt] = None
+    cursor: Optional[str] = None
+    limit: int = Field(default=100, ge=1, le=500)
+
+
 class OrganizationRequestEntity(BaseModel):
     """
     Request entity to create an `Organization`
@@ -25,6 +49,15 @@ class OrganizationRequestEntity(BaseModel):
     name: constr(max_length=255)
 
 
+class OrganizationQueryEntity(BaseModel):
+    """
+    Query entity to list `Organization`, newest first, `cursor` pages past the last one read
+    """
+
+    cursor: Optional[str] = None
+    limit: int = Field(default=100, ge=1, le=500)
+
+
 class MembershipRequestEntity(BaseModel):
     """
     Request entity to join an `Organization`
@@ -49,6 +82,18 @@ class NewDeploymentRequestEntity(BaseModel):
 
     cluster_id: Union[str, int]
     image_path: str = Field(..., max_length=512, description="Docker image path")
+    queue_ttl: Optional[PositiveInt] = Field(
+        default=None, description="Seconds the deployment may wait in queue before it fails, if it can't start right away"
+    )
+
+
+class BulkDeploymentRequestEntity(BaseModel):
+    """
+    Request entity to create many `Deployment` at once
+    """
+
+    # NOTE: Bounded to stay within SQLite's bound parameters limit of `IN` queries
+    deployments: List[NewDeploymentRequestEntity] = Field(..., min_length=1, max_length=500)
 
 
 class ResourceAllocationRequestEntity(BaseModel):
@@ -62,3 +107,59 @@ class ResourceAllocationRequestEntity(BaseModel):
     cpu_allocated: PositiveInt
     ram_allocated: PositiveInt
     gpu_allocated: PositiveInt
+
+
+class DeploymentStatusTransitionEntity(BaseModel):
+    """
+    Request entity to move an in-progress `Deployment` to a terminal status
+    """
+
+    deployment_id: Union[str, int]
+    status: Literal[DeploymentStatus.COMPLETED, DeploymentStatus.FAILED]
+
+
+class BulkDeploymentStatusRequestEntity(BaseModel):
+    """
+    Request entity to move many `Deployment` to terminal statuses at once
+    """
+
+    # NOTE: Bounded to stay within SQLite's bound parameters limit of `IN` queries
+    transitions: List[DeploymentStatusTransitionEntity] = Field(..., min_length=1, max_length=500)
+
+
+class ArchivedDeploymentQueryEntity(BaseModel):
+    """
+    Query entity to read `ArchivedDeployment`, newest first, `cursor` pages past the last one read
+    """
+
+    cluster_id: Optional[int] = None
+    status: Optional[DeploymentStatus] = None
+    cursor: Optional[str] = None
+    limit: int = Field(default=100, ge=1, le=500)
+
+
+class DeploymentQueryEntity(BaseModel):
+    """
+    Query entity to read `Deployment`, by (status, priority, queued_at), `cursor` pages past the last one read
+
+    `fields` (comma separated) picks the fields to return, all by default
+    """
+
+    status: Optional[DeploymentStatus] = None
+    cluster_id: Optional[int] = None
+    organization_id: Optional[int] = None
+    min_priority: Optional[int] = None
+    max_priority: Optional[int] = None
+    queued_after: Optional[datetime] = None
+    queued_before: Optional[datetime] = None
+    fields: Optional[List[str]] = None
+    cursor: Optional[str] = None
+    limit: int = Field(default=100, ge=1, le=500)
+
+    @field_validator("fields", mode="before")
+    @classmethod
+    def split_fields(cls, value: Union[str, List[str], None]) -> Optional[List[str]]:
+        if isinstance(value, str):
+            return [field.strip() for field in value.split(",") if field.strip()]
+
+        return value
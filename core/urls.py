@@ -5,8 +5,34 @@ import core.views as views
 urlpatterns = [
     path("auth/", views.TokenAPIView.as_view(), name="auth"),
     path("clusters/", views.ClusterAPIView.as_view(), name="clusters"),
+    path(
+        "clusters/<int:cluster_id>/",
+        views.ClusterDetailAPIView.as_view(),
+        name="cluster-detail",
+    ),
+    path(
+        "clusters/<int:cluster_id>/resize/",
+        views.ClusterResizeAPIView.as_view(),
+        name="cluster-resize",
+    ),
     path("deployments/", views.DeploymentAPIView.as_view(), name="deployments"),
+    path(
+        "deployments/batch/",
+        views.DeploymentBatchAPIView.as_view(),
+        name="deployment-batch",
+    ),
+    path(
+        "deployments/status/",
+        views.DeploymentStatusAPIView.as_view(),
+        name="deployment-status",
+    ),
+    path(
+        "deployments/<int:deployment_id>/cancel/",
+        views.DeploymentCancelAPIView.as_view(),
+        name="deployment-cancel",
+    ),
     path("memberships/", views.MembershipAPIView.as_view(), name="memberships"),
     path("organizations/", views.OrganizationAPIView.as_view(), name="organizations"),
     path("allocations/", views.ResourceAllocationAPIView.as_view(), name="allocations"),
+    path("archive/deployments/", views.ArchivedDeploymentAPIView.as_view(), name="archived-deployments"),
 ]
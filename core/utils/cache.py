@@ -0,0 +1,175 @@
+from hashlib import sha1
+from json import dumps, loads
+from logging import getLogger
+from typing import Any, Callable, Dict, List, Optional, Union
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import transaction
+
+from core.base.redis import RedisClient
+from core.models.resource import Cluster
+
+logger = getLogger(__name__)
+
+METRICS_KEY: str = "RESPONSE_CACHE_METRICS"
+
+# Scopes of listings which aren't narrowed to a cluster or an organization
+CLUSTERS_SCOPE: str = "CLUSTERS"
+ORGANIZATIONS_SCOPE: str = "ORGANIZATIONS"
+
+# Reads the current version of every scope (a scope without one gets the given fresh version), then the
+# entry stored under the versions, and counts the hit or miss. All in a single round trip.
+# KEYS: Version keys, ARGV: Entry key prefix, Fresh version, Metrics key, Namespace
+LOOKUP_SCRIPT = """
+local versions = {}
+for index, key in ipairs(KEYS) do
+    local version = redis.call('GET', key)
+    if not version then
+        version = ARGV[2]
+        redis.call('SET', key, version)
+    end
+    versions[index] = version
+end
+
+local key = ARGV[1] .. ':' .. table.concat(versions, ':')
+local value = redis.call('GET', key)
+
+redis.call('HINCRBY', ARGV[3], ARGV[4] .. (value and ':hits' or ':misses'), 1)
+return {key, value}
+"""
+
+
+def cluster_scope(cluster_id: Union[str, int]) -> str:
+    """
+    Returns the cache scope of a cluster.
+    """
+
+    return f"CLUSTER:{cluster_id}"
+
+
+def organization_scope(organization_id: Union[str, int]) -> str:
+    """
+    Returns the cache scope of an organization (and its clusters).
+    """
+
+    return f"ORGANIZATION:{organization_id}"
+
+
+class ResponseCache:
+    """
+    Caches responses of read endpoints in Redis, invalidated by the writes.
+
+    Every entry is stored under the current versions of the scopes (a cluster, an organization or
+    a whole listing) it was computed from, and writes replace the versions of the scopes they touch
+    once committed. So invalidation is O(1), whatever the no. of entries, and an entry computed
+    from the state before a write is never read after it. Obsolete entries are left to expire (TTLs
+    per namespace, `RESPONSE_CACHE_TTLS`). Versions are random rather than counters, so a version
+    which got evicted never brings back the entries of an older one.
+
+    Hits and misses per namespace are counted in the `RESPONSE_CACHE_METRICS` hash. If Redis is
+    unavailable, responses are computed as if nothing was cached.
+    """
+
+    KEY_PREFIX: str = "RESPONSE_CACHE"
+    VERSION_PREFIX: str = "RESPONSE_CACHE_VERSION"
+
+    def __init__(self) -> None:
+        self.__redis_client = RedisClient()
+        self.__lookup = self.__redis_client.register_script(LOOKUP_SCRIPT)
+
+    @classmethod
+    def version_key(cls, scope: str) -> str:
+        """
+        Returns the Redis key of the scope's version.
+        """
+
+        return f"{cls.VERSION_PREFIX}:{scope}"
+
+    def get_or_set(self, namespace: str, params: Dict, scopes: List[str], compute: Callable[[], Any]) -> Any:
+        """
+        Returns the cached response of the namespace for the params, else computes (and caches) it.
+
+        The response must be JSON serializable, and computed only from the state of the given scopes.
+        """
+
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return compute()
+
+        digest = sha1(dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+        try:
+            key, value = self.__lookup(
+                keys=[self.version_key(scope) for scope in scopes],
+                args=[f"{self.KEY_PREFIX}:{namespace}:{digest}", uuid4().hex, METRICS_KEY, namespace],
+            )
+        except Exception as exception:
+            logger.exception(f"[ResponseCache]: Lookup of {namespace} failed, Err: {exception}")
+            return compute()
+
+        if value is not None:
+            return loads(value)
+
+        response = compute()
+
+        try:
+            ttl = settings.RESPONSE_CACHE_TTLS.get(namespace, settings.RESPONSE_CACHE_TTL)
+            self.__redis_client.get_connection().set(key, dumps(response), ex=ttl)
+        except Exception as exception:
+            logger.exception(f"[ResponseCache]: Failed to store {namespace}, Err: {exception}")
+
+        return response
+
+    def invalidate(self, *scopes: str) -> None:
+        """
+        Replaces the versions of the scopes (in a single round trip), so entries computed from them are never read again.
+        """
+
+        if not scopes:
+            return
+
+        pipeline = self.__redis_client.pipeline(transaction=False)
+        for scope in scopes:
+            pipeline.set(self.version_key(scope), uuid4().hex)
+        pipeline.execute()
+
+    def metrics(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the no. of hits and misses per namespace.
+        """
+
+        metrics: Dict[str, Dict[str, int]] = {}
+        for field, count in self.__redis_client.h_get_all(METRICS_KEY).items():
+            namespace, outcome = field.rsplit(":", 1)
+            metrics.setdefault(namespace, {"hits": 0, "misses": 0})[outcome] = int(count)
+
+        return metrics
+
+
+def invalidate_cluster(cluster_id: Union[str, int], organization_id: Optional[Union[str, int]] = None) -> None:
+    """
+    Invalidates cached reads of the cluster, its organization and the cluster listings, once the transaction commits.
+
+    The organization is read from the DB (once committed) if not given.
+    """
+
+    def on_commit() -> None:
+        organization = organization_id
+        if organization is None:
+            organization = Cluster.objects.filter(id=cluster_id).values_list("organization_id", flat=True).first()
+
+        scopes = [cluster_scope(cluster_id), CLUSTERS_SCOPE]
+        if organization is not None:
+            scopes.append(organization_scope(organization))
+
+        ResponseCache().invalidate(*scopes)
+
+    transaction.on_commit(on_commit, robust=True)
+
+
+def invalidate_organizations() -> None:
+    """
+    Invalidates cached organization listings, once the transaction commits.
+    """
+
+    transaction.on_commit(lambda: ResponseCache().invalidate(ORGANIZATIONS_SCOPE), robust=True)
@@ -0,0 +1,60 @@
+from logging import getLogger
+from typing import Union
+
+from celery import current_app
+from django.conf import settings
+from django.db import transaction
+
+from core.base.redis import RedisClient
+
+logger = getLogger(__name__)
+
+SCHEDULE_CLUSTER_TASK: str = "core.tasks.schedule_cluster_deployments"
+
+
+def pending_schedule_key(cluster_id: Union[str, int]) -> str:
+    """
+    Redis key marking that a scheduling run is already pending for the cluster.
+    """
+
+    return f"SCHEDULE_PENDING:{cluster_id}"
+
+
+def emit_capacity_changed(cluster_id: Union[str, int]) -> None:
+    """
+    Notifies the scheduler that the capacity of a cluster has changed.
+
+    The event is dispatched only once the current transaction commits, so the scheduler
+    always observes the released (or added) capacity.
+    """
+
+    if not settings.SCHEDULER_EVENTS_ENABLED:
+        return
+
+    transaction.on_commit(lambda: dispatch_schedule_cluster(cluster_id), robust=True)
+
+
+def dispatch_schedule_cluster(cluster_id: Union[str, int]) -> bool:
+    """
+    Dispatches a debounced scheduling run for the cluster.
+
+    Only the first event in a debounce window dispatches the task, the rest are coalesced into it.
+    The pending marker expires on its own, in case the dispatched task is lost.
+    """
+
+    debounce_ms: int = settings.SCHEDULER_EVENT_DEBOUNCE_MS
+    key = pending_schedule_key(cluster_id)
+    redis_client = RedisClient()
+
+    try:
+        if not redis_client.set_nx(key, 1, ttl_ms=settings.SCHEDULER_EVENT_PENDING_TTL_MS):
+            return False
+
+        current_app.send_task(SCHEDULE_CLUSTER_TASK, args=[cluster_id], countdown=debounce_ms / 1000)
+        return True
+
+    except Exception as exception:
+        # Beat job will pick it up, capacity events are only an optimization
+        logger.exception(f"[Events]: Failed to dispatch scheduling for cluster {cluster_id}, Err: {exception}")
+        redis_client.delete(key)
+        return False
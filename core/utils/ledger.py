@@ -0,0 +1,231 @@
+from logging import getLogger
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from core.base.redis import RedisClient
+from core.models.resource import Cluster
+
+logger = getLogger(__name__)
+
+# KEYS[1]: Ledger key, ARGV: CPU, GPU, RAM
+# Returns -1 if the ledger is not seeded, 0 if there isn't enough capacity, 1 once reserved.
+RESERVE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+
+local available = redis.call('HMGET', KEYS[1], 'cpu', 'gpu', 'ram')
+for index = 1, 3 do
+    if tonumber(available[index]) < tonumber(ARGV[index]) then
+        return 0
+    end
+end
+
+redis.call('HINCRBY', KEYS[1], 'cpu', 0 - tonumber(ARGV[1]))
+redis.call('HINCRBY', KEYS[1], 'gpu', 0 - tonumber(ARGV[2]))
+redis.call('HINCRBY', KEYS[1], 'ram', 0 - tonumber(ARGV[3]))
+return 1
+"""
+
+# KEYS[1]: Ledger key, ARGV: CPU, GPU, RAM of every request, in order
+# Returns -1 if the ledger is not seeded, else 1 (reserved) or 0 (not enough capacity left) per request.
+RESERVE_MANY_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+
+local available = redis.call('HMGET', KEYS[1], 'cpu', 'gpu', 'ram')
+local cpu, gpu, ram = tonumber(available[1]), tonumber(available[2]), tonumber(available[3])
+local reserved = {}
+
+for index = 1, #ARGV, 3 do
+    local required_cpu, required_gpu, required_ram = tonumber(ARGV[index]), tonumber(ARGV[index + 1]), tonumber(ARGV[index + 2])
+
+    if required_cpu <= cpu and required_gpu <= gpu and required_ram <= ram then
+        cpu, gpu, ram = cpu - required_cpu, gpu - required_gpu, ram - required_ram
+        reserved[#reserved + 1] = 1
+    else
+        reserved[#reserved + 1] = 0
+    end
+end
+
+redis.call('HSET', KEYS[1], 'cpu', cpu, 'gpu', gpu, 'ram', ram)
+return reserved
+"""
+
+# KEYS[1]: Ledger key, ARGV: CPU, GPU, RAM
+# Returns -1 if the ledger is not seeded (It'll be seeded from the DB, which already has the release), 1 otherwise.
+RELEASE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+
+redis.call('HINCRBY', KEYS[1], 'cpu', tonumber(ARGV[1]))
+redis.call('HINCRBY', KEYS[1], 'gpu', tonumber(ARGV[2]))
+redis.call('HINCRBY', KEYS[1], 'ram', tonumber(ARGV[3]))
+return 1
+"""
+
+# KEYS[1]: Ledger key, ARGV: CPU, GPU, RAM, Overwrite (1 or 0)
+SEED_SCRIPT = """
+if ARGV[4] == '0' and redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+
+redis.call('HSET', KEYS[1], 'cpu', ARGV[1], 'gpu', ARGV[2], 'ram', ARGV[3])
+return 1
+"""
+
+# KEYS[1]: Ledger key, ARGV: Expected CPU, GPU, RAM, then the CPU, GPU, RAM to seed
+# Returns 1 once re-seeded, 0 if the ledger is missing or no longer holds the expected values.
+RESEED_SCRIPT = """
+local available = redis.call('HMGET', KEYS[1], 'cpu', 'gpu', 'ram')
+for index = 1, 3 do
+    if tonumber(available[index]) ~= tonumber(ARGV[index]) then
+        return 0
+    end
+end
+
+redis.call('HSET', KEYS[1], 'cpu', ARGV[4], 'gpu', ARGV[5], 'ram', ARGV[6])
+return 1
+"""
+
+
+class CapacityLedger:
+    """
+    Redis resident ledger of available resources per cluster, used for admission control.
+
+    Check and reserve (and release) happen atomically on the Redis server, so concurrent API
+    workers and schedulers can't over-allocate a cluster. The ledger is seeded lazily from the
+    cluster's allocated counters in the DB, which remain the source of truth.
+    """
+
+    KEY_PREFIX: str = "CLUSTER_CAPACITY"
+
+    def __init__(self) -> None:
+        self.__redis_client = RedisClient()
+        self.__seed = self.__redis_client.register_script(SEED_SCRIPT)
+        self.__reserve = self.__redis_client.register_script(RESERVE_SCRIPT)
+        self.__reserve_many = self.__redis_client.register_script(RESERVE_MANY_SCRIPT)
+        self.__release = self.__redis_client.register_script(RELEASE_SCRIPT)
+        self.__reseed = self.__redis_client.register_script(RESEED_SCRIPT)
+
+    @classmethod
+    def key(cls, cluster_id: Union[str, int]) -> str:
+        """
+        Returns the Redis key of the cluster's ledger.
+        """
+
+        return f"{cls.KEY_PREFIX}:{cluster_id}"
+
+    def seed(self, cluster: Cluster, overwrite: bool = False) -> bool:
+        """
+        Seeds the cluster's ledger with its available resources from the DB (unless already seeded).
+        """
+
+        available = cluster.available_resources()
+        return bool(
+            self.__seed(
+                keys=[self.key(cluster.id)],
+                args=[available["cpu"], available["gpu"], available["ram"], int(overwrite)],
+            )
+        )
+
+    def reseed(self, cluster: Cluster, expected: Dict[str, int]) -> bool:
+        """
+        Re-seeds the cluster's ledger from the DB, only if it still holds the `expected` available resources.
+
+        Anything reserved or released after `expected` was read is kept, it'll be compared again later on.
+        """
+
+        available = cluster.available_resources()
+        return bool(
+            self.__reseed(
+                keys=[self.key(cluster.id)],
+                args=[
+                    expected["cpu"],
+                    expected["gpu"],
+                    expected["ram"],
+                    available["cpu"],
+                    available["gpu"],
+                    available["ram"],
+                ],
+            )
+        )
+
+    def reserve(self, cluster: Cluster, cpu: int, gpu: int, ram: int) -> bool:
+        """
+        Atomically reserves resources on the cluster if available, returns whether it was reserved.
+        """
+
+        reserved = self.__reserve(keys=[self.key(cluster.id)], args=[cpu, gpu, ram])
+
+        if reserved == -1:
+            cluster.refresh_from_db(fields=["cpu", "gpu", "ram", "cpu_allocated", "gpu_allocated", "ram_allocated"])
+            self.seed(cluster)
+            reserved = self.__reserve(keys=[self.key(cluster.id)], args=[cpu, gpu, ram])
+
+        return reserved == 1
+
+    def reserve_many(self, cluster: Cluster, requests: List[Tuple[int, int, int]]) -> List[bool]:
+        """
+        Atomically reserves resources on the cluster for many (CPU, GPU, RAM) requests in a single call.
+
+        Requests are reserved in order, each one only if it still fits. Returns whether each one was reserved.
+        """
+
+        if not requests:
+            return []
+
+        args = [value for request in requests for value in request]
+        reserved = self.__reserve_many(keys=[self.key(cluster.id)], args=args)
+
+        if reserved == -1:
+            cluster.refresh_from_db(fields=["cpu", "gpu", "ram", "cpu_allocated", "gpu_allocated", "ram_allocated"])
+            self.seed(cluster)
+            reserved = self.__reserve_many(keys=[self.key(cluster.id)], args=args)
+
+        if reserved == -1:
+            return [False] * len(requests)
+
+        return [flag == 1 for flag in reserved]
+
+    def release(self, cluster_id: Union[str, int], cpu: int, gpu: int, ram: int) -> None:
+        """
+        Atomically gives resources back to the cluster.
+        """
+
+        if self.__release(keys=[self.key(cluster_id)], args=[cpu, gpu, ram]) == -1:
+            logger.info(f"[CapacityLedger]: Ledger of cluster {cluster_id} is not seeded, nothing to release")
+
+    def adjust(self, cluster_id: Union[str, int], cpu: int, gpu: int, ram: int) -> bool:
+        """
+        Atomically shifts the cluster's available resources by the given (signed) amounts, e.g. on a resize.
+
+        Returns False if the ledger is not seeded, it'll be seeded from the DB (which has the change) instead.
+        """
+
+        return self.__release(keys=[self.key(cluster_id)], args=[cpu, gpu, ram]) != -1
+
+    def available(self, cluster_id: Union[str, int]) -> Optional[Dict[str, int]]:
+        """
+        Returns the cluster's available resources as per the ledger, None if not seeded.
+        """
+
+        available = self.__redis_client.h_get_all(self.key(cluster_id))
+        return {resource: int(value) for resource, value in available.items()} if available else None
+
+    def clusters(self) -> Set[str]:
+        """
+        Returns ids of all clusters having a seeded ledger (Scans the keyspace).
+        """
+
+        prefix = f"{self.KEY_PREFIX}:"
+        keys = self.__redis_client.get_connection().scan_iter(match=f"{prefix}*", count=1000)
+        return {key[len(prefix) :] for key in keys if key[len(prefix) :].isdigit()}
+
+    def forget(self, cluster_id: Union[str, int]) -> None:
+        """
+        Drops the cluster's ledger, it'll be re-seeded from the DB on next reservation.
+        """
+
+        self.__redis_client.delete(self.key(cluster_id))
@@ -0,0 +1,67 @@
+from uuid import uuid4
+
+from core.base.redis import RedisClient
+
+# Deletes / extends the lock only if it is still held by the same owner (token)
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+EXTEND_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class RedisLock:
+    """
+    Distributed lease lock on Redis.
+
+    The lock expires on its own after `ttl_ms`, so a crashed owner can never hold it forever,
+    and it can only be released or extended by the owner which acquired it.
+    """
+
+    KEY_PREFIX: str = "LOCK"
+
+    def __init__(self, name: str, ttl_ms: int) -> None:
+        self.name = name
+        self.ttl_ms = ttl_ms
+        self.token = uuid4().hex
+
+        self.__redis_client = RedisClient()
+        self.__release = self.__redis_client.register_script(RELEASE_SCRIPT)
+        self.__extend = self.__redis_client.register_script(EXTEND_SCRIPT)
+
+    @property
+    def key(self) -> str:
+        """
+        Returns the Redis key of the lock.
+        """
+
+        return f"{self.KEY_PREFIX}:{self.name}"
+
+    def acquire(self) -> bool:
+        """
+        Acquires the lock if it is free, returns whether it was acquired.
+        """
+
+        return self.__redis_client.set_nx(self.key, self.token, ttl_ms=self.ttl_ms)
+
+    def extend(self) -> bool:
+        """
+        Renews the lease for another `ttl_ms`, returns False if the lock was lost meanwhile.
+        """
+
+        return bool(self.__extend(keys=[self.key], args=[self.token, self.ttl_ms]))
+
+    def release(self) -> bool:
+        """
+        Releases the lock, returns False if it was not held (anymore).
+        """
+
+        return bool(self.__release(keys=[self.key], args=[self.token]))
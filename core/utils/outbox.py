@@ -0,0 +1,199 @@
+from datetime import timedelta
+from json import dumps, loads
+from logging import getLogger
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.base.redis import RedisClient
+from core.constants import DeploymentStatus, LifecycleEvent
+from core.models.deployment import Deployment
+from core.models.event import OutboxEvent
+
+logger = getLogger(__name__)
+
+STREAM_KEY: str = "LIFECYCLE_EVENTS"
+
+# Lifecycle event of a deployment moving to a terminal status
+TERMINAL_EVENTS: Dict[str, str] = {
+    DeploymentStatus.COMPLETED: LifecycleEvent.DEPLOYMENT_COMPLETED,
+    DeploymentStatus.FAILED: LifecycleEvent.DEPLOYMENT_FAILED,
+    DeploymentStatus.CANCELLED: LifecycleEvent.DEPLOYMENT_CANCELLED,
+}
+
+
+def deployment_event(event: str, deployment: Deployment) -> OutboxEvent:
+    """
+    Returns an (unsaved) lifecycle event of the deployment.
+    """
+
+    return OutboxEvent(
+        event=event,
+        entity_id=deployment.id,
+        cluster_id=deployment.cluster_id,
+        data={"status": deployment.status, "priority": deployment.priority},
+    )
+
+
+def allocation_event(
+    event: str, allocation_id: int, deployment_id: int, cluster_id: int, cpu: int, gpu: int, ram: int
+) -> OutboxEvent:
+    """
+    Returns an (unsaved) lifecycle event of a resource allocation.
+    """
+
+    return OutboxEvent(
+        event=event,
+        entity_id=allocation_id,
+        cluster_id=cluster_id,
+        data={"deployment_id": deployment_id, "cpu": cpu, "gpu": gpu, "ram": ram},
+    )
+
+
+class LifecycleOutbox:
+    """
+    Publishes deployment and allocation lifecycle events to the `LIFECYCLE_EVENTS` Redis Stream.
+
+    Events are written to the outbox table in the same transaction as the change they describe,
+    and are relayed to the stream right after commit. Whatever couldn't be relayed then (e.g. Redis
+    was down) is picked up by the periodic relay. Delivery is at least once, consumers may dedupe
+    by `event_id`.
+    """
+
+    def __init__(self) -> None:
+        self.__redis_client = RedisClient()
+
+    def record(self, *events: OutboxEvent) -> List[OutboxEvent]:
+        """
+        Writes the events to the outbox (in the current transaction), they are relayed once committed.
+        """
+
+        events = OutboxEvent.objects.bulk_create(events)
+        event_ids = [event.id for event in events]
+
+        transaction.on_commit(lambda: self.relay(event_ids=event_ids), robust=True)
+        return events
+
+    def relay(self, event_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Publishes unpublished events (all, in batches of `LIFECYCLE_RELAY_BATCH_SIZE`, or only the given ones).
+
+        Returns the no. of events published.
+        """
+
+        pending = OutboxEvent.objects.filter(published_at__isnull=True).order_by("id")
+        if event_ids is not None:
+            pending = pending.filter(id__in=list(event_ids))
+
+        published = 0
+
+        while True:
+            events = list(pending[: settings.LIFECYCLE_RELAY_BATCH_SIZE])
+            if not events:
+                break
+
+            pipeline = self.__redis_client.pipeline(transaction=False)
+            for event in events:
+                pipeline.xadd(
+                    STREAM_KEY,
+                    self.serialize(event),
+                    maxlen=settings.LIFECYCLE_STREAM_MAX_LEN,
+                    approximate=True,
+                )
+            pipeline.execute()
+
+            OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(published_at=timezone.now())
+            published += len(events)
+
+            if len(events) < settings.LIFECYCLE_RELAY_BATCH_SIZE:
+                break
+
+        return published
+
+    def purge(self) -> int:
+        """
+        Deletes published events older than `LIFECYCLE_OUTBOX_RETENTION` seconds, returns the no. deleted.
+        """
+
+        threshold = timezone.now() - timedelta(seconds=settings.LIFECYCLE_OUTBOX_RETENTION)
+        deleted, _ = OutboxEvent.objects.filter(published_at__lt=threshold).delete()
+        return deleted
+
+    @staticmethod
+    def serialize(event: OutboxEvent) -> Dict[str, Union[str, int]]:
+        """
+        Returns the stream message of the event (Flat, as stream fields are strings).
+        """
+
+        return {
+            "event_id": event.id,
+            "event": event.event,
+            "entity_id": event.entity_id,
+            "cluster_id": event.cluster_id,
+            "occurred_at": event.created_at.isoformat(),
+            "data": dumps(event.data),
+        }
+
+
+class LifecycleEventConsumer:
+    """
+    Reads the `LIFECYCLE_EVENTS` stream as a member of a consumer group.
+
+    Every event is delivered to one consumer of the group, and stays pending until acknowledged.
+    Events left pending by a crashed consumer can be taken over with `claim_stale`.
+
+    Usage:
+        consumer = LifecycleEventConsumer(group="billing", consumer="billing-1")
+        for message_id, event in consumer.read(block_ms=5000):
+            ...
+            consumer.ack(message_id)
+    """
+
+    def __init__(self, group: str, consumer: str) -> None:
+        self.group = group
+        self.consumer = consumer
+
+        self.__redis_client = RedisClient()
+        self.__redis_client.x_group_create(STREAM_KEY, group)
+
+    def read(self, count: int = 100, block_ms: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        """
+        Returns new events as (message id, event) pairs, blocks for up to `block_ms` if there aren't any.
+        """
+
+        streams = self.__redis_client.x_read_group(STREAM_KEY, self.group, self.consumer, count=count, block_ms=block_ms)
+        return [(message_id, self.deserialize(fields)) for _, messages in streams or [] for message_id, fields in messages]
+
+    def ack(self, *message_ids: str) -> int:
+        """
+        Acknowledges processed events.
+        """
+
+        return self.__redis_client.x_ack(STREAM_KEY, self.group, *message_ids) if message_ids else 0
+
+    def claim_stale(self, min_idle_ms: int, count: int = 100) -> List[Tuple[str, Dict]]:
+        """
+        Takes over events which are pending (unacknowledged) on any consumer for longer than `min_idle_ms`.
+        """
+
+        _, messages, *_ = self.__redis_client.x_auto_claim(
+            STREAM_KEY, self.group, self.consumer, min_idle_ms=min_idle_ms, count=count
+        )
+        return [(message_id, self.deserialize(fields)) for message_id, fields in messages if fields]
+
+    @staticmethod
+    def deserialize(fields: Dict[str, str]) -> Dict:
+        """
+        Returns the event of a stream message.
+        """
+
+        return {
+            "event_id": int(fields["event_id"]),
+            "event": fields["event"],
+            "entity_id": int(fields["entity_id"]),
+            "cluster_id": int(fields["cluster_id"]),
+            "occurred_at": fields["occurred_at"],
+            "data": loads(fields["data"]),
+        }
@@ -0,0 +1,105 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as DecodeError
+from datetime import datetime
+from json import dumps, loads
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Field, Func, Model, QuerySet, Value
+from django.db.models.lookups import GreaterThan, LessThan
+
+from core.errors import BadRequestError
+
+
+class RowValue(Func):
+    """
+    Row value i.e. `(a, b, ...)`, the DB compares row values column by column (lexicographically).
+    """
+
+    template = "(%(expressions)s)"
+    output_field = Field()
+
+
+class KeysetPaginator:
+    """
+    Pages a queryset by keyset (seek), in the order of the given fields, which must end with a unique one. The
+    order is ascending, or descending if every field is prefixed with `-` (row values can't mix directions).
+
+    A page is read as `WHERE (f1, f2, ...) > (<last row read>) ORDER BY f1, f2, ... LIMIT n`, so an index on
+    the fields serves every page at the cost of its size, however deep it is (unlike `OFFSET`). The last row
+    read is handed out as an opaque cursor.
+    """
+
+    def __init__(self, queryset: QuerySet, ordering: Sequence[str], limit: int) -> None:
+        descending = {name.startswith("-") for name in ordering}
+        if len(descending) != 1:
+            raise ValueError("Keyset ordering fields must all be ascending or all be descending")
+
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.descending = descending.pop()
+        self.fields = [name.lstrip("-") for name in ordering]
+        self.limit = limit
+
+    def page(self, cursor: Optional[str] = None) -> Tuple[List[Model], Optional[str]]:
+        """
+        Returns the page after the cursor (the first page, if there isn't one), and the cursor of the next page (if any).
+        """
+
+        queryset = self.queryset.order_by(*self.ordering)
+
+        if cursor:
+            model = queryset.model
+            values = self.decode(cursor)
+
+            try:
+                values = [model._meta.get_field(name).to_python(value) for name, value in zip(self.fields, values)]
+            except (ValidationError, TypeError, ValueError) as exception:
+                raise BadRequestError("Invalid cursor") from exception
+
+            lookup = LessThan if self.descending else GreaterThan
+            queryset = queryset.filter(
+                lookup(
+                    RowValue(*(F(name) for name in self.fields)),
+                    RowValue(*(Value(value, output_field=model._meta.get_field(name)) for name, value in zip(self.fields, values))),
+                )
+            )
+
+        rows = list(queryset[: self.limit + 1])
+        if len(rows) <= self.limit:
+            return rows, None
+
+        rows = rows[: self.limit]
+        return rows, self.encode([getattr(rows[-1], self.field_attname(name)) for name in self.fields])
+
+    def field_attname(self, name: str) -> str:
+        """
+        Returns the attribute holding the field's value on model instances (i.e. `cluster_id` for `cluster`).
+        """
+
+        return self.queryset.model._meta.get_field(name).attname
+
+    @staticmethod
+    def encode(values: List[Any]) -> str:
+        """
+        Returns the opaque cursor of the row's ordering values.
+        """
+
+        # NOTE: Not `DjangoJSONEncoder`, it truncates datetimes to milliseconds, which would skip or repeat rows
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+        return urlsafe_b64encode(dumps(values).encode()).decode()
+
+    def decode(self, cursor: str) -> List[Any]:
+        """
+        Returns the ordering values of the cursor's row, the cursor must be of the same ordering.
+        """
+
+        try:
+            values = loads(urlsafe_b64decode(cursor.encode()))
+        except (DecodeError, UnicodeError, ValueError) as exception:
+            raise BadRequestError("Invalid cursor") from exception
+
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise BadRequestError("Invalid cursor")
+
+        return values
@@ -0,0 +1,349 @@
+from abc import ABC, abstractmethod
+from logging import getLogger
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F
+from django.utils import timezone
+
+from core.constants import DeploymentStatus, PlacementStrategy
+from core.models.deployment import Deployment
+from core.models.resource import Cluster
+
+logger = getLogger(__name__)
+
+RESOURCES: Tuple[str, ...] = ("cpu", "gpu", "ram")
+
+
+class PlacementEngine(ABC):
+    """
+    Base class for the placement strategies used in a scheduling cycle.
+
+    A strategy receives every queued deployment of one cluster along with the cluster's
+    currently available resources and returns the deployments that should be started.
+    """
+
+    @abstractmethod
+    def place(self, cluster: Cluster, deployments: List[Deployment], available: Dict[str, int]) -> List[Deployment]:
+        """
+        Returns the deployments to be scheduled on the `cluster`, in scheduling order.
+        """
+
+    @staticmethod
+    def requirements(deployment: Deployment) -> Dict[str, int]:
+        """
+        Returns resources required by the deployment.
+        """
+
+        return {
+            "cpu": deployment.cpu_required,
+            "gpu": deployment.gpu_required,
+            "ram": deployment.ram_required,
+        }
+
+    @classmethod
+    def fits(cls, deployment: Deployment, available: Dict[str, int]) -> bool:
+        """
+        Checks if the deployment fits into the available resources.
+        """
+
+        required = cls.requirements(deployment)
+        return all(available[resource] >= required[resource] for resource in RESOURCES)
+
+    @classmethod
+    def reserve(cls, deployment: Deployment, available: Dict[str, int]) -> None:
+        """
+        Deducts deployment's requirements from the available resources (in place).
+        """
+
+        required = cls.requirements(deployment)
+        for resource in RESOURCES:
+            available[resource] -= required[resource]
+
+    @classmethod
+    def release(cls, deployment: Deployment, available: Dict[str, int]) -> None:
+        """
+        Adds deployment's requirements back to the available resources (in place).
+        """
+
+        required = cls.requirements(deployment)
+        for resource in RESOURCES:
+            available[resource] += required[resource]
+
+    @staticmethod
+    def priority_key(deployment: Deployment) -> Tuple:
+        """
+        Sort key for priority order (Lower no. means higher priority, then FIFO).
+        """
+
+        return deployment.priority, deployment.queued_at, deployment.id
+
+    def fill(self, deployments: List[Deployment], available: Dict[str, int]) -> List[Deployment]:
+        """
+        Places deployments in the given order, skipping the ones which doesn't fit.
+        """
+
+        placed: List[Deployment] = []
+
+        for deployment in deployments:
+            if self.fits(deployment, available):
+                self.reserve(deployment, available)
+                placed.append(deployment)
+
+        return placed
+
+
+class GreedyPlacementEngine(PlacementEngine):
+    """
+    Places deployments in priority order, skipping the ones which doesn't fit.
+    """
+
+    def place(self, cluster: Cluster, deployments: List[Deployment], available: Dict[str, int]) -> List[Deployment]:
+        _ = cluster
+        return self.fill(sorted(deployments, key=self.priority_key), available)
+
+
+class BestFitDecreasingPlacementEngine(PlacementEngine):
+    """
+    Places the largest deployments first, so that smaller ones fill the fragments left behind.
+
+    Size of a deployment is its dominant share i.e. the largest fraction of the cluster's
+    total capacity it asks for, across CPU/GPU/RAM. Ties are broken by priority.
+    """
+
+    def place(self, cluster: Cluster, deployments: List[Deployment], available: Dict[str, int]) -> List[Deployment]:
+        capacity = {"cpu": cluster.cpu, "gpu": cluster.gpu, "ram": cluster.ram}
+
+        def dominant_share(deployment: Deployment) -> float:
+            required = self.requirements(deployment)
+            return max(required[resource] / max(capacity[resource], 1) for resource in RESOURCES)
+
+        ordered = sorted(deployments, key=lambda deployment: (-dominant_share(deployment), *self.priority_key(deployment)))
+        return self.fill(ordered, available)
+
+
+class KnapsackPlacementEngine(PlacementEngine):
+    """
+    Selects the set of deployments with the highest total priority weight that fits the cluster.
+
+    This is a multi-dimensional knapsack, so the exact search (branch and bound) is bounded to the
+    `max_items` highest priority candidates and `max_nodes` explored nodes. Whatever capacity is
+    left after that is filled greedily by priority.
+    """
+
+    def __init__(self, max_items: Optional[int] = None, max_nodes: Optional[int] = None) -> None:
+        self.max_items: int = max_items or settings.SCHEDULER_KNAPSACK_MAX_ITEMS
+        self.max_nodes: int = max_nodes or settings.SCHEDULER_KNAPSACK_MAX_NODES
+
+    @staticmethod
+    def value(deployment: Deployment) -> float:
+        """
+        Weight of a deployment, higher for higher priority (i.e. lower priority no.)
+        """
+
+        return 1.0 / max(deployment.priority, 1)
+
+    def place(self, cluster: Cluster, deployments: List[Deployment], available: Dict[str, int]) -> List[Deployment]:
+        _ = cluster
+
+        ordered = [deployment for deployment in sorted(deployments, key=self.priority_key) if self.fits(deployment, available)]
+        pool = ordered[: self.max_items]
+
+        values = [self.value(deployment) for deployment in pool]
+        requirements = [self.requirements(deployment) for deployment in pool]
+
+        # Upper bound of value that can still be gained from `pool[index:]`
+        remaining_values = [0.0] * (len(pool) + 1)
+        for index in range(len(pool) - 1, -1, -1):
+            remaining_values[index] = remaining_values[index + 1] + values[index]
+
+        best_value, best_selection = 0.0, []
+        explored = 0
+
+        def search(index: int, capacity: Dict[str, int], selection: List[int], total: float) -> None:
+            nonlocal best_value, best_selection, explored
+
+            explored += 1
+            if total > best_value:
+                best_value, best_selection = total, list(selection)
+
+            if index == len(pool) or explored >= self.max_nodes:
+                return
+
+            if total + remaining_values[index] <= best_value:
+                return
+
+            required = requirements[index]
+            if all(capacity[resource] >= required[resource] for resource in RESOURCES):
+                selection.append(index)
+                search(
+                    index + 1,
+                    {resource: capacity[resource] - required[resource] for resource in RESOURCES},
+                    selection,
+                    total + values[index],
+                )
+                selection.pop()
+
+            search(index + 1, capacity, selection, total)
+
+        search(0, dict(available), [], 0.0)
+
+        selected = {pool[index].id for index in best_selection}
+        placed = [deployment for deployment in pool if deployment.id in selected]
+
+        for deployment in placed:
+            self.reserve(deployment, available)
+
+        # Fill the leftover capacity with whatever was not part of the exact search
+        leftovers = [deployment for deployment in ordered if deployment.id not in selected]
+        placed.extend(self.fill(leftovers, available))
+
+        return sorted(placed, key=self.priority_key)
+
+
+class DurationEstimator:
+    """
+    Estimates run time of deployments from the history of completed deployments on a cluster.
+
+    Mean run time of the same image is used if known, else the mean of the cluster,
+    else `SCHEDULER_BACKFILL_DEFAULT_DURATION` setting.
+    """
+
+    def __init__(self, cluster: Cluster) -> None:
+        history = (
+            Deployment.objects.filter(
+                cluster=cluster,
+                started_at__isnull=False,
+                completed_at__isnull=False,
+                status=DeploymentStatus.COMPLETED,
+            )
+            .values("image_path")
+            .annotate(
+                count=Count("id"),
+                duration=Avg(ExpressionWrapper(F("completed_at") - F("started_at"), output_field=DurationField())),
+            )
+        )
+
+        self.by_image: Dict[str, float] = {}
+        total_duration, total_count = 0.0, 0
+
+        for entry in history:
+            duration = entry["duration"].total_seconds()
+            self.by_image[entry["image_path"]] = duration
+            total_duration += duration * entry["count"]
+            total_count += entry["count"]
+
+        self.default: float = (total_duration / total_count) if total_count else settings.SCHEDULER_BACKFILL_DEFAULT_DURATION
+
+    def estimate(self, deployment: Deployment) -> float:
+        """
+        Returns the estimated run time (in seconds) of the deployment.
+        """
+
+        return self.by_image.get(deployment.image_path, self.default)
+
+
+class BackfillPlacementEngine(PlacementEngine):
+    """
+    EASY backfilling, deployments are started in priority order until the first one which doesn't fit.
+
+    That (head) deployment gets a reservation, the earliest time at which enough capacity frees up
+    for it as per the estimated completion of running deployments. Lower priority deployments are
+    then backfilled only if they can't delay the reservation, i.e. they are estimated to complete
+    before it or they only use capacity which the head deployment won't need at that time.
+    """
+
+    def place(self, cluster: Cluster, deployments: List[Deployment], available: Dict[str, int]) -> List[Deployment]:
+        ordered = sorted(deployments, key=self.priority_key)
+
+        placed: List[Deployment] = []
+        while ordered and self.fits(ordered[0], available):
+            deployment = ordered.pop(0)
+            self.reserve(deployment, available)
+            placed.append(deployment)
+
+        if not ordered:
+            return placed
+
+        head, rest = ordered[0], ordered[1:]
+        estimator = DurationEstimator(cluster)
+        reservation = self.reservation(cluster, head, available, placed, estimator)
+
+        # Head can never fit, there is nothing to protect
+        if reservation is None:
+            return placed + self.fill(rest, available)
+
+        shadow_time, spare = reservation
+        logger.info(f"[Scheduler]: {head} is reserved on {cluster} in ~{int(shadow_time)}s")
+
+        for deployment in rest:
+            if not self.fits(deployment, available):
+                continue
+
+            if estimator.estimate(deployment) <= shadow_time:
+                self.reserve(deployment, available)
+                placed.append(deployment)
+
+            elif self.fits(deployment, spare):
+                self.reserve(deployment, available)
+                self.reserve(deployment, spare)
+                placed.append(deployment)
+
+        return placed
+
+    def reservation(
+        self,
+        cluster: Cluster,
+        head: Deployment,
+        available: Dict[str, int],
+        placed: List[Deployment],
+        estimator: DurationEstimator,
+    ) -> Optional[Tuple[float, Dict[str, int]]]:
+        """
+        Returns the time (seconds from now) at which the head deployment fits and the capacity it
+        leaves spare at that time, None if it never fits.
+        """
+
+        now = timezone.now()
+        running = Deployment.objects.filter(cluster=cluster, status=DeploymentStatus.IN_PROGRESS).only(
+            "id", "image_path", "started_at", "cpu_required", "gpu_required", "ram_required"
+        )
+
+        releases: List[Tuple[float, Deployment]] = []
+        for deployment in running:
+            elapsed = (now - deployment.started_at).total_seconds() if deployment.started_at else 0.0
+            releases.append((max(estimator.estimate(deployment) - elapsed, 0.0), deployment))
+
+        # Deployments started in this cycle are running from now
+        releases.extend((estimator.estimate(deployment), deployment) for deployment in placed)
+
+        free = dict(available)
+        for release_time, deployment in sorted(releases, key=lambda release: release[0]):
+            self.release(deployment, free)
+
+            if self.fits(head, free):
+                self.reserve(head, free)
+                return release_time, free
+
+        return None
+
+
+PLACEMENT_ENGINES: Dict[str, type] = {
+    PlacementStrategy.GREEDY: GreedyPlacementEngine,
+    PlacementStrategy.BACKFILL: BackfillPlacementEngine,
+    PlacementStrategy.KNAPSACK: KnapsackPlacementEngine,
+    PlacementStrategy.BEST_FIT_DECREASING: BestFitDecreasingPlacementEngine,
+}
+
+
+def get_placement_engine(strategy: Optional[str] = None) -> PlacementEngine:
+    """
+    Returns the placement engine for the strategy, defaults to `SCHEDULER_PLACEMENT_STRATEGY` setting.
+    """
+
+    strategy = strategy or settings.SCHEDULER_PLACEMENT_STRATEGY
+
+    try:
+        return PLACEMENT_ENGINES[strategy]()
+    except KeyError as exception:
+        raise ValueError(f"Unknown placement strategy '{strategy}'") from exception
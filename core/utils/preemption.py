@@ -0,0 +1,61 @@
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.constants import DeploymentStatus
+from core.models.deployment import Deployment
+from core.models.resource import Cluster
+from core.utils.placement import RESOURCES, PlacementEngine
+
+
+class VictimSelector:
+    """
+    Picks the cheapest set of lower priority IN_PROGRESS deployments to preempt for a deployment.
+
+    Cheapest means the fewest evictions first and then the least work lost, i.e. the least time the
+    victims have already been running. The search is bounded to `max_victims` evictions among the
+    `max_candidates` lowest priority (most recently started) running deployments.
+    """
+
+    def __init__(self, max_victims: Optional[int] = None, max_candidates: Optional[int] = None) -> None:
+        self.max_victims: int = max_victims or settings.SCHEDULER_PREEMPTION_MAX_VICTIMS
+        self.max_candidates: int = max_candidates or settings.SCHEDULER_PREEMPTION_MAX_CANDIDATES
+
+    def select(self, cluster: Cluster, deployment: Deployment, available: Dict[str, int]) -> Optional[List[Deployment]]:
+        """
+        Returns the deployments to preempt so that the `deployment` fits, None if there is no such set.
+        """
+
+        required = PlacementEngine.requirements(deployment)
+        shortfall = {resource: max(required[resource] - available[resource], 0) for resource in RESOURCES}
+
+        if not any(shortfall.values()):
+            return []
+
+        now = timezone.now()
+        running = Deployment.objects.filter(
+            cluster=cluster,
+            status=DeploymentStatus.IN_PROGRESS,
+            priority__gt=deployment.priority,
+        ).only("id", "cluster_id", "priority", "queued_at", "started_at", "cpu_required", "gpu_required", "ram_required")
+
+        def lost_work(victim: Deployment) -> float:
+            return (now - victim.started_at).total_seconds() if victim.started_at else 0.0
+
+        candidates = sorted(running, key=lambda victim: (-victim.priority, lost_work(victim)))[: self.max_candidates]
+
+        def covers(victims: Sequence[Deployment]) -> bool:
+            return all(
+                sum(PlacementEngine.requirements(victim)[resource] for victim in victims) >= shortfall[resource]
+                for resource in RESOURCES
+            )
+
+        for size in range(1, min(self.max_victims, len(candidates)) + 1):
+            feasible = [victims for victims in combinations(candidates, size) if covers(victims)]
+
+            if feasible:
+                return list(min(feasible, key=lambda victims: sum(lost_work(victim) for victim in victims)))
+
+        return None
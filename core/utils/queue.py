@@ -0,0 +1,193 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Union
+
+from core.base.redis import RedisClient
+from core.models.deployment import Deployment
+
+# Removes the cluster from the index only if its queue is (still) empty, so that
+# a concurrent push between the check and the removal is never lost.
+FORGET_CLUSTER_SCRIPT = """
+if redis.call('ZCARD', KEYS[1]) == 0 then
+    return redis.call('SREM', KEYS[2], ARGV[1])
+end
+return 0
+"""
+
+
+class DeploymentQueue:
+    """
+    Per cluster Redis queues of deployments waiting for resources.
+
+    Each cluster has its own sorted set `DEPLOYMENT_QUEUE:<cluster_id>` scored by deployment
+    priority (Lower no. means higher priority, so it is popped first) and the set
+    `DEPLOYMENT_QUEUE:CLUSTERS` indexes all the clusters having waiting deployments.
+    """
+
+    KEY_PREFIX: str = "DEPLOYMENT_QUEUE"
+    INDEX_KEY: str = "DEPLOYMENT_QUEUE:CLUSTERS"
+
+    def __init__(self) -> None:
+        self.__redis_client = RedisClient()
+        self.__forget_cluster = self.__redis_client.register_script(FORGET_CLUSTER_SCRIPT)
+
+    @classmethod
+    def key(cls, cluster_id: Union[str, int]) -> str:
+        """
+        Returns the Redis key of the cluster's queue.
+        """
+
+        return f"{cls.KEY_PREFIX}:{cluster_id}"
+
+    @staticmethod
+    def score(deployment: Deployment) -> int:
+        """
+        Returns the queue score of the deployment.
+        """
+
+        return deployment.priority
+
+    def push(self, deployment: Deployment) -> None:
+        """
+        Adds the deployment to its cluster's queue.
+        """
+
+        pipeline = self.__redis_client.pipeline()
+        pipeline.zadd(self.key(deployment.cluster_id), {deployment.id: self.score(deployment)})
+        pipeline.sadd(self.INDEX_KEY, deployment.cluster_id)
+        pipeline.execute()
+
+    def push_many(self, deployments: Iterable[Deployment]) -> None:
+        """
+        Adds the deployments to their cluster queues, in a single round trip.
+        """
+
+        deployments = list(deployments)
+        if not deployments:
+            return
+
+        pipeline = self.__redis_client.pipeline()
+        for deployment in deployments:
+            pipeline.zadd(self.key(deployment.cluster_id), {deployment.id: self.score(deployment)})
+            pipeline.sadd(self.INDEX_KEY, deployment.cluster_id)
+        pipeline.execute()
+
+    def members(self, cluster_id: Union[str, int]) -> List[str]:
+        """
+        Returns all deployment ids queued on the cluster, in priority order.
+        """
+
+        return self.__redis_client.z_range_by_score(self.key(cluster_id), "-inf", "+inf")
+
+    def members_of(self, cluster_ids: Iterable[Union[str, int]]) -> Dict[str, List[str]]:
+        """
+        Returns deployment ids queued on each of the clusters, read in a single round trip.
+        """
+
+        cluster_ids = [str(cluster_id) for cluster_id in cluster_ids]
+
+        pipeline = self.__redis_client.pipeline(transaction=False)
+        for cluster_id in cluster_ids:
+            pipeline.zrangebyscore(self.key(cluster_id), "-inf", "+inf")
+
+        return dict(zip(cluster_ids, pipeline.execute()))
+
+    def scores(self, cluster_id: Union[str, int], deployment_ids: List[Union[str, int]]) -> List[Optional[float]]:
+        """
+        Returns queue scores of the deployments on the cluster's queue (None for the ones not queued), in one command.
+        """
+
+        if not deployment_ids:
+            return []
+
+        return self.__redis_client.get_connection().zmscore(self.key(cluster_id), deployment_ids)
+
+    def restore(self, cluster_id: Union[str, int], deployments: Dict[Union[str, int], int]) -> None:
+        """
+        Adds (or re-scores) deployments on the cluster's queue, keyed by id with their score, and indexes the cluster.
+        """
+
+        if not deployments:
+            return
+
+        pipeline = self.__redis_client.pipeline()
+        pipeline.zadd(self.key(cluster_id), deployments)
+        pipeline.sadd(self.INDEX_KEY, cluster_id)
+        pipeline.execute()
+
+    def scan(self, cluster_id: Union[str, int], count: int) -> Iterator[List[str]]:
+        """
+        Streams deployment ids queued on the cluster in pages of about `count`, without loading the whole queue.
+        """
+
+        page: List[str] = []
+        for deployment_id, _ in self.__redis_client.get_connection().zscan_iter(self.key(cluster_id), count=count):
+            page.append(deployment_id)
+
+            if len(page) >= count:
+                yield page
+                page = []
+
+        if page:
+            yield page
+
+    def queues(self) -> Set[str]:
+        """
+        Returns ids of all clusters having a queue in Redis, indexed or not (Scans the keyspace).
+        """
+
+        prefix = f"{self.KEY_PREFIX}:"
+        keys = self.__redis_client.get_connection().scan_iter(match=f"{prefix}*", count=1000)
+        return {key[len(prefix) :] for key in keys if key[len(prefix) :].isdigit()}
+
+    def remove(self, cluster_id: Union[str, int], deployment_ids: Iterable[Union[str, int]]) -> int:
+        """
+        Removes the deployments from the cluster's queue.
+        """
+
+        deployment_ids = list(deployment_ids)
+        if not deployment_ids:
+            return 0
+
+        return self.__redis_client.z_rem(self.key(cluster_id), *deployment_ids)
+
+    def flush(self, removals: Dict[Union[str, int], Iterable[Union[str, int]]]) -> None:
+        """
+        Removes deployments from several cluster queues and un-indexes the emptied ones, in a single round trip.
+        """
+
+        if not removals:
+            return
+
+        pipeline = self.__redis_client.pipeline(transaction=False)
+
+        for cluster_id, deployment_ids in removals.items():
+            deployment_ids = list(deployment_ids)
+            if deployment_ids:
+                pipeline.zrem(self.key(cluster_id), *deployment_ids)
+
+            self.__forget_cluster(keys=[self.key(cluster_id), self.INDEX_KEY], args=[cluster_id], client=pipeline)
+
+        pipeline.execute()
+
+    def clusters(self) -> List[str]:
+        """
+        Returns ids of all clusters having queued deployments.
+        """
+
+        return sorted(self.__redis_client.s_members(self.INDEX_KEY))
+
+    def forget(self, cluster_id: Union[str, int]) -> bool:
+        """
+        Removes the cluster from the index if there is nothing queued on it.
+        """
+
+        return bool(self.__forget_cluster(keys=[self.key(cluster_id), self.INDEX_KEY], args=[cluster_id]))
+
+    def drop(self, cluster_id: Union[str, int]) -> None:
+        """
+        Drops the cluster's queue entirely.
+        """
+
+        pipeline = self.__redis_client.pipeline()
+        pipeline.delete(self.key(cluster_id))
+        pipeline.srem(self.INDEX_KEY, cluster_id)
+        pipeline.execute()
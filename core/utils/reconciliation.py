@@ -0,0 +1,300 @@
+from logging import getLogger
+from time import perf_counter
+from typing import Dict, Optional, Union
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.base.redis import RedisClient
+from core.constants import DeploymentStatus
+from core.models.deployment import Deployment
+from core.models.resource import Cluster
+from core.utils.ledger import CapacityLedger
+from core.utils.lock import RedisLock
+from core.utils.queue import DeploymentQueue
+
+logger = getLogger(__name__)
+
+METRICS_KEY: str = "QUEUE_DRIFT_METRICS"
+LEDGER_DRIFT_KEY: str = "CAPACITY_LEDGER_DRIFT"
+
+DRIFTS = ("missing", "rescored", "orphaned")
+
+
+class QueueReconciler:
+    """
+    Reconciles the Redis deployment queues with the DB, which is the source of truth.
+
+    The queues drift apart from the DB if Redis loses data (e.g. restarts without persistence), a
+    process dies between the DB commit and the push, or the DB is edited by hand. Every cluster is
+    reconciled under its scheduling lock, so no cycle or preemption is moving its deployments
+    meanwhile, and both sides are streamed in chunks, never loaded at once:
+
+    - DB QUEUED rows are read in id order and looked up on the queue (`ZMSCORE`), the missing or
+      mis-scored ones are added back with a pipelined `ZADD`.
+    - Queue members are scanned (`ZSCAN`) and looked up in the DB, the ones which aren't QUEUED
+      there (or don't exist) are removed. Queues of missing or deleted clusters are dropped.
+
+    Drift is returned and exported to the `QUEUE_DRIFT_METRICS` Redis hash (last run and running totals).
+    """
+
+    CHUNK_SIZE: int = 900  # Keeps `IN` queries below SQLite's bound parameters limit
+
+    def __init__(self) -> None:
+        self.__queue = DeploymentQueue()
+        self.__redis_client = RedisClient()
+
+    def reconcile(self, dry_run: bool = False) -> Dict:
+        """
+        Reconciles the queues of every cluster having queued deployments (in the DB or in Redis).
+
+        Returns the drift found (and fixed, unless it's a `dry_run`), in total and per cluster.
+        """
+
+        started = perf_counter()
+
+        queued_clusters = set(
+            map(
+                str,
+                Deployment.objects.filter(status=DeploymentStatus.QUEUED, completed_at__isnull=True, is_deleted=False)
+                .values_list("cluster_id", flat=True)
+                .distinct(),
+            )
+        )
+        cluster_ids = sorted(queued_clusters | self.__queue.queues() | set(self.__queue.clusters()), key=int)
+        live = set(map(str, Cluster.objects.filter(is_deleted=False, id__in=cluster_ids).values_list("id", flat=True)))
+
+        report: Dict = {"clusters": 0, "skipped": [], "dropped": [], "queued": 0, **{name: 0 for name in DRIFTS}, "drift": {}}
+
+        for cluster_id in cluster_ids:
+            lock = RedisLock(name=f"SCHEDULER:{cluster_id}", ttl_ms=settings.SCHEDULER_LOCK_TTL_MS)
+
+            if not lock.acquire():
+                logger.info(f"[QueueReconciler]: Cluster {cluster_id} is being scheduled, skipping...")
+                report["skipped"].append(cluster_id)
+                continue
+
+            try:
+                if cluster_id in live:
+                    drift = self.reconcile_cluster(cluster_id=cluster_id, dry_run=dry_run)
+                else:
+                    drift = self.__drop(cluster_id=cluster_id, dry_run=dry_run)
+                    report["dropped"].append(cluster_id)
+            finally:
+                lock.release()
+
+            report["clusters"] += 1
+            report["queued"] += drift.pop("queued")
+
+            for name in DRIFTS:
+                report[name] += drift[name]
+
+            if any(drift.values()):
+                report["drift"][cluster_id] = drift
+
+        report["duration_ms"] = round((perf_counter() - started) * 1000, 3)
+
+        if not dry_run:
+            self.__export(report)
+
+        logger.info(
+            f"[QueueReconciler]: {report['clusters']} queues reconciled in {report['duration_ms']}ms, "
+            + ", ".join(f"{report[name]} {name}" for name in DRIFTS)
+        )
+        return report
+
+    def reconcile_cluster(self, cluster_id: Union[str, int], dry_run: bool = False) -> Dict[str, int]:
+        """
+        Reconciles the queue of a single cluster, the caller must hold its scheduling lock.
+        """
+
+        drift = {"queued": 0, **{name: 0 for name in DRIFTS}}
+
+        queued = Deployment.objects.filter(
+            status=DeploymentStatus.QUEUED,
+            cluster_id=cluster_id,
+            completed_at__isnull=True,
+            is_deleted=False,
+        ).order_by("id")
+
+        last_id = 0
+        while True:
+            chunk = list(queued.filter(id__gt=last_id).values_list("id", "priority")[: self.CHUNK_SIZE])
+            if not chunk:
+                break
+
+            last_id = chunk[-1][0]
+            drift["queued"] += len(chunk)
+
+            scores = self.__queue.scores(cluster_id, [deployment_id for deployment_id, _ in chunk])
+            restore: Dict[int, int] = {}
+
+            for (deployment_id, priority), score in zip(chunk, scores):
+                if score is None:
+                    drift["missing"] += 1
+                    restore[deployment_id] = priority
+                elif score != priority:
+                    drift["rescored"] += 1
+                    restore[deployment_id] = priority
+
+            if restore and not dry_run:
+                self.__queue.restore(cluster_id, restore)
+
+        for page in self.__queue.scan(cluster_id, count=self.CHUNK_SIZE):
+            deployment_ids = [int(member) for member in page if member.isdigit()]
+            expected = set(map(str, queued.filter(id__in=deployment_ids).values_list("id", flat=True)))
+
+            orphaned = [member for member in page if member not in expected]
+            drift["orphaned"] += len(orphaned)
+
+            # NOTE: Removing members mid scan is safe, the ones which stay are still returned exactly once
+            if orphaned and not dry_run:
+                self.__queue.remove(cluster_id, orphaned)
+
+        if not dry_run:
+            self.__queue.forget(cluster_id)
+
+        return drift
+
+    def __drop(self, cluster_id: str, dry_run: bool) -> Dict[str, int]:
+        """
+        Drops the queue of a missing or deleted cluster, nothing on it can ever be scheduled.
+        """
+
+        orphaned = self.__redis_client.z_card(DeploymentQueue.key(cluster_id))
+        if not dry_run:
+            self.__queue.drop(cluster_id)
+
+        return {"queued": 0, "missing": 0, "rescored": 0, "orphaned": orphaned}
+
+    def __export(self, report: Dict) -> None:
+        """
+        Exports the drift of the run, and running totals, to the `QUEUE_DRIFT_METRICS` hash.
+        """
+
+        pipeline = self.__redis_client.pipeline()
+        pipeline.hset(
+            METRICS_KEY,
+            mapping={
+                "reconciled_at": timezone.now().isoformat(),
+                "clusters": report["clusters"],
+                "skipped": len(report["skipped"]),
+                "queued": report["queued"],
+                "duration_ms": report["duration_ms"],
+                **{name: report[name] for name in DRIFTS},
+            },
+        )
+        for name in ("runs", *DRIFTS):
+            pipeline.hincrby(METRICS_KEY, f"{name}_total", 1 if name == "runs" else report[name])
+        pipeline.execute()
+
+
+class LedgerReconciler:
+    """
+    Reconciles the Redis capacity ledgers with the clusters' allocated counters in the DB, the source of truth.
+
+    A seeded ledger is never re-seeded on its own, so it leaks capacity for good if a process dies between a
+    reservation and the allocation's commit (or between a commit and the release which follows it). Every
+    cluster is compared under its scheduling lock, so no cycle or preemption reserves on it meanwhile. API
+    writers reserve without that lock though, and their reservations look like drift until they commit, so:
+
+    - A drift is only fixed once two consecutive runs find the same drift, the ones found once are kept in
+      the `CAPACITY_LEDGER_DRIFT` Redis hash for the next run to confirm.
+    - The ledger is re-seeded only if it still holds the compared values, i.e. nothing reserved or released
+      on it since. Ledgers of missing or deleted clusters are dropped.
+
+    Drift is the ledger's available resources minus the DB's, negative if capacity leaked.
+    """
+
+    def __init__(self) -> None:
+        self.__ledger = CapacityLedger()
+        self.__redis_client = RedisClient()
+
+    def reconcile(self, dry_run: bool = False) -> Dict:
+        """
+        Compares the ledger of every cluster having one with the DB, and re-seeds the confirmed drifts.
+
+        Returns the drift found per cluster, and the clusters re-seeded (none if it's a `dry_run`).
+        """
+
+        started = perf_counter()
+
+        cluster_ids = sorted(self.__ledger.clusters(), key=int)
+        clusters = Cluster.objects.filter(is_deleted=False, id__in=cluster_ids).in_bulk()
+        suspected = self.__redis_client.h_get_all(LEDGER_DRIFT_KEY)
+
+        report: Dict = {"clusters": 0, "skipped": [], "dropped": [], "reseeded": [], "drift": {}}
+        unconfirmed: Dict[str, str] = {}
+
+        for cluster_id in cluster_ids:
+            cluster = clusters.get(int(cluster_id))
+
+            if cluster is None:
+                if not dry_run:
+                    self.__ledger.forget(cluster_id)
+                report["dropped"].append(cluster_id)
+                continue
+
+            lock = RedisLock(name=f"SCHEDULER:{cluster_id}", ttl_ms=settings.SCHEDULER_LOCK_TTL_MS)
+
+            if not lock.acquire():
+                logger.info(f"[LedgerReconciler]: Cluster {cluster_id} is being scheduled, skipping...")
+                report["skipped"].append(cluster_id)
+                continue
+
+            try:
+                drift = self.__reconcile_cluster(cluster=cluster, suspected=suspected.get(cluster_id), dry_run=dry_run)
+            finally:
+                lock.release()
+
+            report["clusters"] += 1
+
+            if drift is None:
+                continue
+
+            report["drift"][cluster_id] = drift["drift"]
+            if drift["reseeded"]:
+                report["reseeded"].append(cluster_id)
+            else:
+                unconfirmed[cluster_id] = drift["signature"]
+
+        if not dry_run:
+            pipeline = self.__redis_client.pipeline()
+            pipeline.delete(LEDGER_DRIFT_KEY)
+            if unconfirmed:
+                pipeline.hset(LEDGER_DRIFT_KEY, mapping=unconfirmed)
+            pipeline.execute()
+
+        report["duration_ms"] = round((perf_counter() - started) * 1000, 3)
+
+        logger.info(
+            f"[LedgerReconciler]: {report['clusters']} ledgers reconciled in {report['duration_ms']}ms, "
+            f"{len(report['drift'])} drifted, {len(report['reseeded'])} re-seeded, {len(report['dropped'])} dropped"
+        )
+        return report
+
+    def __reconcile_cluster(self, cluster: Cluster, suspected: Optional[str], dry_run: bool) -> Optional[Dict]:
+        """
+        Compares the ledger of a single cluster with the DB, the caller must hold its scheduling lock.
+
+        Returns None if the ledger is in sync (or gone meanwhile), else its drift and whether it was re-seeded.
+        """
+
+        available = self.__ledger.available(cluster.id)
+        if available is None:
+            return None
+
+        cluster.refresh_from_db(fields=["cpu", "gpu", "ram", "cpu_allocated", "gpu_allocated", "ram_allocated"])
+        expected = cluster.available_resources()
+
+        drift = {resource: available.get(resource, 0) - expected[resource] for resource in ("cpu", "gpu", "ram")}
+        if not any(drift.values()):
+            return None
+
+        signature = ",".join(str(drift[resource]) for resource in ("cpu", "gpu", "ram"))
+        reseeded = signature == suspected and not dry_run and self.__ledger.reseed(cluster, expected=available)
+
+        if reseeded:
+            logger.warning(f"[LedgerReconciler]: Ledger of {cluster} drifted by {drift}, re-seeded from the DB")
+
+        return {"drift": drift, "signature": signature, "reseeded": reseeded}
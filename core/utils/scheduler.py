@@ -1,13 +1,18 @@
-from datetime import datetime
 from logging import getLogger
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from django.conf import settings
+from django.utils import timezone
 
-from core.base.redis import RedisClient
 from core.constants import DeploymentStatus
-from core.errors import ResourceDoesNotExistsError
 from core.models.deployment import Deployment
+from core.models.resource import Cluster
+from core.services.cluster import ClusterService
 from core.services.deployment import DeploymentService
-from core.services.resource import ResourceAllocationService
-from core.types.request import ResourceAllocationRequestEntity
+from core.utils.placement import PlacementEngine, get_placement_engine
+from core.utils.lock import RedisLock
+from core.utils.preemption import VictimSelector
+from core.utils.queue import DeploymentQueue
 
 logger = getLogger(__name__)
 
@@ -17,103 +22,274 @@ class Scheduler:
     Queued Deployment Scheduler Class
     """
 
-    def __init__(self) -> None:
-        self.__redis_client = RedisClient()
-        self.__REDIS_KEY: str = "DEPLOYMENT_QUEUE"
+    CHUNK_SIZE: int = 900  # Keeps `IN` queries below SQLite's bound parameters limit
+
+    def __init__(self, engine: Optional[PlacementEngine] = None) -> None:
+        self.__queue = DeploymentQueue()
 
+        self.__engine = engine or get_placement_engine()
+        self.__victim_selector = VictimSelector()
+        self.__cluster_service = ClusterService()
         self.__deployment_service = DeploymentService()
-        self.__allocation_service = ResourceAllocationService()
 
     def schedule_deployment(self) -> None:
         """
-        Schedules deployments from the Redis queue to clusters based on priority and resource availability.
+        Schedules deployments from the Redis queues to clusters based on priority and resource availability.
+
+        Only clusters indexed as having queued deployments are visited.
         """
 
-        # All highest-priority deployment from Redis
-        deployment_ids = self.__redis_client.z_range_by_score(self.__REDIS_KEY, "-inf", "+inf")
+        cluster_ids = self.__queue.clusters()
 
-        if not deployment_ids:
+        if not cluster_ids:
             logger.info("[Scheduler]: No deployments in the queue...")
             return
 
-        logger.info(f"[Scheduler]: {len(deployment_ids)} deployments to schedule...")
+        logger.info(f"[Scheduler]: {len(cluster_ids)} clusters with queued deployments to schedule...")
+        self.schedule_clusters(cluster_ids=cluster_ids)
 
-        for deployment_id in deployment_ids:
-            try:
-                deployment = self.__deployment_service.get(deployment_id=deployment_id)
+    def schedule_cluster(self, cluster_id: Union[str, int]) -> bool:
+        """
+        Schedules queued deployments of a single cluster.
+
+        Returns False if the cluster is being scheduled by another worker.
+        """
+
+        return not self.schedule_clusters(cluster_ids=[cluster_id])
+
+    def schedule_clusters(self, cluster_ids: Iterable[Union[str, int]]) -> List[str]:
+        """
+        Runs a scheduling cycle over the given clusters, each cluster under its own lease lock.
+
+        Overlapping runs (on any worker) thus never schedule the same cluster twice. Returns ids
+        of the clusters which were skipped, as those are being scheduled by another worker.
+        """
+
+        locks: Dict[str, RedisLock] = {}
+        busy: List[str] = []
+
+        for cluster_id in map(str, cluster_ids):
+            lock = RedisLock(name=f"SCHEDULER:{cluster_id}", ttl_ms=settings.SCHEDULER_LOCK_TTL_MS)
+
+            if lock.acquire():
+                locks[cluster_id] = lock
+            else:
+                logger.info(f"[Scheduler]: Cluster {cluster_id} is being scheduled by another worker, skipping...")
+                busy.append(cluster_id)
+
+        try:
+            if locks:
+                self.__run_cycle(cluster_ids=list(locks))
+        finally:
+            for lock in locks.values():
+                if not lock.release():
+                    logger.warning(f"[Scheduler]: Lease {lock.key} expired before the cycle completed")
+
+        return busy
+
+    def __run_cycle(self, cluster_ids: List[str]) -> None:
+        """
+        Runs a scheduling cycle over the given clusters.
+
+        A cycle is batched, clusters, their availability and all their queued deployments are loaded
+        in a few queries, and the queue removals are flushed to Redis in one pipeline at the end.
+        All queued deployments of a cluster are handed to the placement engine together, which
+        decides the ones to start, and the cluster's availability is kept as an in-memory ledger
+        while they are allocated. The decisions are written behind in bulk, one ledger call and one
+        transaction of a few statements per chunk of placements.
+        """
+
+        clusters = self.__cluster_service.list().select_related("organization").in_bulk([int(cluster_id) for cluster_id in cluster_ids])
+
+        for cluster_id in cluster_ids:
+            cluster = clusters.get(int(cluster_id))
+
+            # If the cluster is missing or deleted, nothing queued on it can ever be scheduled
+            if cluster is None or cluster.is_deleted:
+                logger.warning(f"[Scheduler]: Cluster {cluster_id} does not exist or is deleted, dropping its queue.")
+                self.__queue.drop(cluster_id)
+                clusters.pop(int(cluster_id), None)
+
+        available_resources = self.__cluster_service.available_resources(clusters.values())
+
+        # NOTE: Every deployment requires non-zero CPU, GPU and RAM, full clusters only matter for preemption
+        schedulable = [
+            cluster
+            for cluster in clusters.values()
+            if settings.SCHEDULER_PREEMPTION_ENABLED or min(available_resources[cluster.id].values()) > 0
+        ]
+        if not schedulable:
+            logger.info("[Scheduler]: No cluster with both queued deployments and free capacity...")
+            return
+
+        queued = self.__queue.members_of(cluster.id for cluster in schedulable)
+        deployments = self.__hydrate(clusters=schedulable, queued=queued)
+
+        # Every visited cluster is part of the flush, so that the emptied queues are un-indexed
+        removals: Dict[int, List[int]] = {cluster.id: [] for cluster in schedulable}
+        overdue: List[int] = []
+        now = timezone.now()
+
+        for cluster in schedulable:
+            candidates: List[Deployment] = []
+
+            for deployment_id in queued[str(cluster.id)]:
+                deployment = deployments.get(int(deployment_id))
+
+                if deployment is None:
+                    logger.warning(f"[Scheduler]: Deployment {deployment_id} does not exist.")
+                    removals[cluster.id].append(deployment_id)
+                    continue
 
                 if deployment.status != DeploymentStatus.QUEUED:
                     logger.warning(f"[Scheduler]: {deployment} is already in terminal state")
-                    self.__redis_client.z_rem(self.__REDIS_KEY, deployment_id)
+                    removals[cluster.id].append(deployment_id)
                     continue
 
-                # If the cluster associated with the deployment is deleted
-                if deployment.cluster.is_deleted:
-                    logger.warning(f"[Scheduler]: {deployment.cluster} is deleted.")
-                    self.__redis_client.z_rem(self.__REDIS_KEY, deployment_id)
+                # Past its queue deadline, it is expired rather than started
+                if deployment.queue_deadline is not None and deployment.queue_deadline <= now:
+                    overdue.append(deployment.id)
                     continue
 
-                available_resources = deployment.cluster.available_resources()
-
-                if self.__deployment_service.has_sufficient_resources(
-                    available=available_resources,
-                    cpu_required=deployment.cpu_required,
-                    gpu_required=deployment.gpu_required,
-                    ram_required=deployment.ram_required,
-                ):
-                    self.__allocate_resource(deployment)
-                else:
-                    logger.info(f"[Scheduler]: {deployment} cannot be scheduled due to insufficient resources.")
-
-            except ResourceDoesNotExistsError:
-                self.__redis_client.z_rem(self.__REDIS_KEY, deployment_id)
-                logger.exception(f"[Scheduler]: Deployment {deployment_id} does not exist.")
+                candidates.append(deployment)
+
+            if not candidates:
                 continue
 
+            try:
+                placements = self.__engine.place(
+                    cluster=cluster,
+                    deployments=candidates,
+                    available=available_resources[cluster.id],
+                )
             except Exception as exception:
-                logger.exception(f"[Scheduler]: Got un-handled exception {exception}")
+                logger.exception(f"[Scheduler]: Placement failed for {cluster}, Err: {exception}")
                 continue
 
-    def __allocate_resource(self, deployment: Deployment) -> None:
-        """ """
+            # Placements are written behind in bulk, a few statements per chunk rather than per deployment
+            for index in range(0, len(placements), self.CHUNK_SIZE):
+                chunk = placements[index : index + self.CHUNK_SIZE]
 
-        self.__allocation_service.create(
-            payload=ResourceAllocationRequestEntity(
-                deployment_id=deployment.id,
-                cluster_id=deployment.cluster_id,
-                cpu_allocated=deployment.cpu_required,
-                gpu_allocated=deployment.gpu_required,
-                ram_allocated=deployment.ram_required,
-            )
-        )
+                try:
+                    started = self.__deployment_service.start_many(cluster=cluster, deployments=chunk)
+                    removals[cluster.id].extend(deployment.id for deployment in started)
+                except Exception as exception:
+                    logger.exception(f"[Scheduler]: Failed to schedule {len(chunk)} deployments on {cluster}, Err: {exception}")
+                    continue
 
-        # Update deployment status to progress
-        deployment.started_at = datetime.now()
-        deployment.status = DeploymentStatus.IN_PROGRESS
-        deployment.save()
+            logger.info(f"[Scheduler]: {len(placements)} out of {len(candidates)} deployments placed on {cluster}")
 
-        # Remove deployment from Redis queue
-        self.__redis_client.z_rem(self.__REDIS_KEY, deployment.id)
-        logger.info(f"[Scheduler]: {deployment} scheduled successfully on cluster {deployment.cluster}")
+            if settings.SCHEDULER_PREEMPTION_ENABLED:
+                scheduled = set(removals[cluster.id])
+                started, evicted = self.__preempt(
+                    cluster=cluster,
+                    pending=[deployment for deployment in candidates if deployment.id not in scheduled],
+                    available=available_resources[cluster.id],
+                )
 
-    def cleanup_completed_deployments(self) -> None:
+                # Deployments placed in this cycle may be evicted right away, those are queued again
+                removals[cluster.id] = [
+                    deployment_id for deployment_id in removals[cluster.id] if int(deployment_id) not in evicted
+                ] + started
+
+        # Remove scheduled and stale deployments from the Redis queues
+        self.__queue.flush(removals)
+
+        if overdue:
+            try:
+                self.__deployment_service.expire_queued(deployment_ids=overdue)
+            except Exception as exception:
+                logger.exception(f"[Scheduler]: Failed to expire overdue deployments {overdue}, Err: {exception}")
+
+    def __preempt(
+        self, cluster: Cluster, pending: List[Deployment], available: Dict[str, int]
+    ) -> Tuple[List[int], Set[int]]:
         """
-        Frees resources for deployments that are marked as completed or failed.
+        Starts the highest priority pending deployments by preempting lower priority running ones.
+
+        At most `SCHEDULER_PREEMPTION_MAX_PER_CYCLE` deployments are considered per cluster per cycle.
+        Returns ids of the deployments which were started and of the ones which were evicted.
         """
 
-        logger.info("[Scheduler]: Checking for completed/failed deployments to cleanup...")
+        started: List[int] = []
+        evicted: Set[int] = set()
+        pending = sorted(pending, key=PlacementEngine.priority_key)[: settings.SCHEDULER_PREEMPTION_MAX_PER_CYCLE]
 
-        all_deployments = self.__deployment_service.list()
+        for deployment in pending:
+            victims = self.__victim_selector.select(cluster=cluster, deployment=deployment, available=available)
 
-        terminals = all_deployments.filter(
-            is_deleted=False,
-            status__in=[DeploymentStatus.COMPLETED, DeploymentStatus.FAILED],
-        )
+            # Either nothing can make it fit, or it fits already but the placement engine held it back
+            if not victims:
+                continue
 
-        for deployment in terminals:
             try:
-                self.__deployment_service.clean_up_deployment(deployment_id=deployment.id, status=deployment.status)
-                logger.info(f"[Scheduler]: {deployment} is marked as {deployment.status} and resources are cleaned up.")
+                self.__deployment_service.preempt(deployment=deployment, victims=victims)
             except Exception as exception:
-                logger.exception(f"[Scheduler]: Failed to cleanup deployment {deployment}, Err: {exception}")
+                logger.exception(f"[Scheduler]: Failed to preempt for {deployment}, Err: {exception}")
                 continue
+
+            for victim in victims:
+                PlacementEngine.release(victim, available)
+                evicted.add(victim.id)
+
+            PlacementEngine.reserve(deployment, available)
+            started.append(deployment.id)
+
+        return started, evicted
+
+    def __hydrate(self, clusters: List[Cluster], queued: Dict[str, List[str]]) -> Dict[int, Deployment]:
+        """
+        Loads all queued deployments of the clusters (keyed by id), in chunks.
+        """
+
+        by_id = {cluster.id: cluster for cluster in clusters}
+        deployment_ids = [int(deployment_id) for deployment_ids in queued.values() for deployment_id in deployment_ids]
+
+        deployments: Dict[int, Deployment] = {}
+        for index in range(0, len(deployment_ids), self.CHUNK_SIZE):
+            chunk = deployment_ids[index : index + self.CHUNK_SIZE]
+            for deployment in self.__deployment_service.list().filter(id__in=chunk, cluster__in=clusters):
+                # Avoids a lazy cluster query per deployment
+                deployment.cluster = by_id[deployment.cluster_id]
+                deployments[deployment.id] = deployment
+
+        return deployments
+
+    def cleanup_completed_deployments(self) -> None:
+        """
+        Frees resources for deployments that are marked as completed or failed.
+
+        Only the pending ones (not yet released) are read, in batches of `SCHEDULER_CLEANUP_BATCH_SIZE`,
+        and each cluster's share of a batch is released in a single transaction. So the cost follows
+        the no. of new terminal deployments rather than the whole history.
+        """
+
+        logger.info("[Scheduler]: Checking for completed/failed deployments to cleanup...")
+
+        failed_clusters: Set[int] = set()
+        released = 0
+
+        while True:
+            pending = list(
+                self.__deployment_service.pending_release()
+                .exclude(cluster_id__in=failed_clusters)
+                .order_by("id")
+                .values_list("id", "cluster_id")[: settings.SCHEDULER_CLEANUP_BATCH_SIZE]
+            )
+
+            if not pending:
+                break
+
+            by_cluster: Dict[int, List[int]] = {}
+            for deployment_id, cluster_id in pending:
+                by_cluster.setdefault(cluster_id, []).append(deployment_id)
+
+            for cluster_id, deployment_ids in by_cluster.items():
+                try:
+                    released += len(self.__deployment_service.release_terminal_deployments(deployment_ids=deployment_ids))
+                except Exception as exception:
+                    # Skipped for the rest of this run, so that the loop always makes progress
+                    logger.exception(f"[Scheduler]: Failed to cleanup deployments of cluster {cluster_id}, Err: {exception}")
+                    failed_clusters.add(cluster_id)
+
+        logger.info(f"[Scheduler]: Resources of {released} completed/failed deployments are cleaned up.")
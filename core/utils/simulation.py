@@ -0,0 +1,313 @@
+from datetime import timedelta
+from math import ceil
+from random import Random
+from time import perf_counter
+from typing import Dict, List, Optional
+
+from django.db.models import F, Sum
+from pydantic import BaseModel, Field, NonNegativeFloat, PositiveInt, model_validator
+
+from core.constants import DeploymentStatus
+from core.models.deployment import Deployment
+from core.models.organization import Organization
+from core.models.resource import Cluster
+from core.services.cluster import ClusterService
+from core.services.deployment import DeploymentService
+from core.types.request import ClusterRequestEntity, NewDeploymentRequestEntity
+from core.utils.placement import RESOURCES, PlacementEngine
+from core.utils.scheduler import Scheduler
+
+
+class SimulatedCluster(BaseModel):
+    """
+    Cluster of a workload trace
+    """
+
+    name: str
+    cpu: PositiveInt
+    ram: PositiveInt
+    gpu: PositiveInt
+
+
+class SimulatedDeployment(BaseModel):
+    """
+    Deployment of a workload trace, `cluster` is the index of its cluster in the trace
+    """
+
+    arrival: NonNegativeFloat  # Seconds since the start of the trace
+    duration: NonNegativeFloat  # Seconds, run time once started
+    cluster: int = 0
+    priority: PositiveInt
+    cpu: PositiveInt
+    ram: PositiveInt
+    gpu: PositiveInt
+    image_path: str = Field(default="simulation:latest", max_length=512)
+
+
+class WorkloadTrace(BaseModel):
+    """
+    Workload (synthetic or recorded) replayed by the scheduler simulation
+    """
+
+    clusters: List[SimulatedCluster]
+    deployments: List[SimulatedDeployment]
+
+    @model_validator(mode="after")
+    def check_cluster_indexes(self) -> "WorkloadTrace":
+        for index, deployment in enumerate(self.deployments):
+            if not 0 <= deployment.cluster < len(self.clusters):
+                raise ValueError(f"Deployment {index} refers to cluster {deployment.cluster}, the trace has {len(self.clusters)}")
+
+        return self
+
+
+def synthetic_trace(
+    deployments: int,
+    clusters: int = 1,
+    seed: Optional[int] = None,
+    arrival_rate: float = 0.05,
+    mean_duration: float = 600.0,
+    images: int = 8,
+) -> WorkloadTrace:
+    """
+    Generates a workload trace, Poisson arrivals (`arrival_rate` per second) with run times which
+    depend on the image and requirements between 1/16th and 1/2 of the cluster, per resource.
+    """
+
+    generator = Random(seed)
+    capacity = {"cpu": 64, "gpu": 8, "ram": 262_144}
+
+    trace_clusters = [SimulatedCluster(name=f"simulation-{index}", **capacity) for index in range(clusters)]
+    trace_deployments: List[SimulatedDeployment] = []
+
+    arrival = 0.0
+    for _ in range(deployments):
+        arrival += generator.expovariate(arrival_rate)
+        image = generator.randrange(images)
+
+        trace_deployments.append(
+            SimulatedDeployment(
+                arrival=round(arrival, 3),
+                # Same image runs for about the same time, so run time estimates have something to learn
+                duration=round(mean_duration * (0.5 + image / images) * generator.uniform(0.8, 1.2), 3),
+                cluster=generator.randrange(clusters),
+                priority=generator.randint(1, 5),
+                image_path=f"simulation/image-{image}:latest",
+                **{
+                    resource: max(ceil(total * generator.uniform(1 / 16, 1 / 2)), 1)
+                    for resource, total in capacity.items()
+                },
+            )
+        )
+
+    return WorkloadTrace(clusters=trace_clusters, deployments=trace_deployments)
+
+
+def percentile(values: List[float], rank: float) -> float:
+    """
+    Returns the nearest-rank percentile of the values, 0 if there aren't any.
+    """
+
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    return ordered[min(max(ceil(rank / 100 * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+
+class SchedulerSimulation:
+    """
+    Replays a workload trace against the real services and scheduler, on a virtual clock.
+
+    The simulation is event driven, at every arrival or completion the due deployments are
+    finalized and submitted through `DeploymentService` and a single scheduling cycle is run,
+    just like the capacity change events do. Run times are kept on the virtual clock by shifting
+    `started_at` of running deployments, so the run time history (used by BACKFILL) and the
+    preemption cost see simulated rather than wall clock durations.
+
+    It writes to whichever DB and Redis the process is connected to, `simulate_scheduler` command
+    points it to a throwaway test DB and a dedicated Redis DB.
+    """
+
+    def __init__(self, trace: WorkloadTrace, engine: Optional[PlacementEngine] = None) -> None:
+        self.trace = trace
+        self.clusters: List[Cluster] = []
+
+        self.__scheduler = Scheduler(engine=engine)
+        self.__cluster_service = ClusterService()
+        self.__deployment_service = DeploymentService()
+
+    def prepare(self) -> List[Cluster]:
+        """
+        Creates the trace's clusters (under a new organization).
+        """
+
+        organization = Organization.objects.create(name=f"Simulation {Organization.objects.count() + 1}")
+
+        self.clusters = [
+            self.__cluster_service.create(
+                payload=ClusterRequestEntity(organization_id=organization.id, **cluster.model_dump())
+            )
+            for cluster in self.trace.clusters
+        ]
+
+        return self.clusters
+
+    def run(self) -> Dict:
+        """
+        Runs the simulation till every deployment completes (or can never be scheduled), returns the report.
+        """
+
+        if not self.clusters:
+            self.prepare()
+
+        arrivals = sorted(self.trace.deployments, key=lambda deployment: deployment.arrival)
+        durations: Dict[int, float] = {}
+        arrived: Dict[int, float] = {}
+        started: Dict[int, float] = {}
+        running: Dict[int, float] = {}  # Deployment id -> Virtual completion time
+        completed: Dict[int, float] = {}
+
+        cycle_latencies: List[float] = []
+        allocated_time = {resource: 0.0 for resource in RESOURCES}
+        preemptions = 0
+
+        clock, next_arrival = 0.0, 0
+        wall_clock = perf_counter()
+
+        while next_arrival < len(arrivals) or running:
+            due = [deployment_id for deployment_id, end in running.items() if end <= clock]
+            for deployment_id in due:
+                self.__deployment_service.clean_up_deployment(deployment_id=deployment_id, status=DeploymentStatus.COMPLETED)
+                completed[deployment_id] = running.pop(deployment_id)
+
+            while next_arrival < len(arrivals) and arrivals[next_arrival].arrival <= clock:
+                deployment = self.__submit(arrivals[next_arrival])
+                durations[deployment.id] = arrivals[next_arrival].duration
+                arrived[deployment.id] = arrivals[next_arrival].arrival
+                next_arrival += 1
+
+            cycle_started = perf_counter()
+            self.__scheduler.schedule_deployment()
+            cycle_latencies.append(perf_counter() - cycle_started)
+
+            in_progress = set(
+                Deployment.objects.filter(cluster__in=self.clusters, status=DeploymentStatus.IN_PROGRESS).values_list(
+                    "id", flat=True
+                )
+            )
+
+            # Preempted deployments are back in the queue, they'll run for their full duration once restarted
+            for deployment_id in set(running) - in_progress:
+                running.pop(deployment_id)
+                preemptions += 1
+
+            for deployment_id in in_progress - set(running):
+                started.setdefault(deployment_id, clock)
+                running[deployment_id] = clock + durations[deployment_id]
+
+            upcoming = list(running.values())
+            if next_arrival < len(arrivals):
+                upcoming.append(arrivals[next_arrival].arrival)
+
+            # Whatever is still queued can never fit, nothing is running to free up capacity for it
+            if not upcoming:
+                break
+
+            step = max(min(upcoming) - clock, 0.0)
+            allocated = self.__allocated()
+            for resource in RESOURCES:
+                allocated_time[resource] += allocated[resource] * step
+
+            clock += step
+
+            # Running deployments must appear to have run for `step` seconds, whatever the wall clock says
+            now = perf_counter()
+            drift = step - (now - wall_clock)
+            wall_clock = now
+
+            if drift:
+                Deployment.objects.filter(id__in=running).update(started_at=F("started_at") - timedelta(seconds=drift))
+
+        return self.report(
+            arrived=arrived,
+            started=started,
+            completed=completed,
+            cycle_latencies=cycle_latencies,
+            allocated_time=allocated_time,
+            preemptions=preemptions,
+        )
+
+    def report(
+        self,
+        arrived: Dict[int, float],
+        started: Dict[int, float],
+        completed: Dict[int, float],
+        cycle_latencies: List[float],
+        allocated_time: Dict[str, float],
+        preemptions: int,
+    ) -> Dict:
+        """
+        Summarizes the simulation, times are in (virtual) seconds and cycle latencies in milliseconds.
+        """
+
+        makespan = (max(completed.values()) - min(arrived.values())) if completed else 0.0
+        capacity = {resource: sum(getattr(cluster, resource) for cluster in self.clusters) for resource in RESOURCES}
+        waits = [started[deployment_id] - arrived[deployment_id] for deployment_id in started]
+        latencies = [latency * 1000 for latency in cycle_latencies]
+
+        return {
+            "deployments": {
+                "submitted": len(arrived),
+                "completed": len(completed),
+                "unscheduled": len(arrived) - len(started),
+                "preemptions": preemptions,
+            },
+            "makespan": round(makespan, 3),
+            "throughput_per_hour": round(len(completed) / makespan * 3600, 3) if makespan else 0.0,
+            "placements_per_second": round(len(started) / sum(cycle_latencies), 3) if sum(cycle_latencies) else 0.0,
+            "utilization": {
+                resource: round(allocated_time[resource] / (capacity[resource] * makespan), 4) if makespan else 0.0
+                for resource in RESOURCES
+            },
+            "queue_wait": {
+                "mean": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "p50": round(percentile(waits, 50), 3),
+                "p90": round(percentile(waits, 90), 3),
+                "p99": round(percentile(waits, 99), 3),
+                "max": round(max(waits, default=0.0), 3),
+            },
+            "cycle_latency_ms": {
+                "cycles": len(latencies),
+                "p50": round(percentile(latencies, 50), 3),
+                "p95": round(percentile(latencies, 95), 3),
+                "p99": round(percentile(latencies, 99), 3),
+                "max": round(max(latencies, default=0.0), 3),
+            },
+        }
+
+    def __submit(self, deployment: SimulatedDeployment) -> Deployment:
+        """
+        Submits a trace deployment, as the API would.
+        """
+
+        return self.__deployment_service.create(
+            payload=NewDeploymentRequestEntity(
+                cluster_id=self.clusters[deployment.cluster].id,
+                priority=deployment.priority,
+                image_path=deployment.image_path,
+                cpu_required=deployment.cpu,
+                gpu_required=deployment.gpu,
+                ram_required=deployment.ram,
+            )
+        )
+
+    def __allocated(self) -> Dict[str, int]:
+        """
+        Returns resources allocated across the simulated clusters.
+        """
+
+        allocated: Dict[str, Optional[int]] = Cluster.objects.filter(id__in=[cluster.id for cluster in self.clusters]).aggregate(
+            **{resource: Sum(f"{resource}_allocated") for resource in RESOURCES}
+        )
+        return {resource: allocated[resource] or 0 for resource in RESOURCES}
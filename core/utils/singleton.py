@@ -0,0 +1,86 @@
+from functools import wraps
+from logging import getLogger
+from threading import Event, Thread
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+
+from core.base.redis import RedisClient
+from core.utils.lock import RedisLock
+
+logger = getLogger(__name__)
+
+
+class Heartbeat:
+    """
+    Keeps renewing the lease of a lock (every third of its TTL) from a background thread, while in context.
+
+    So a long run never loses its lock, while a crashed one (no more heartbeats) lets it expire.
+    """
+
+    def __init__(self, lock: RedisLock) -> None:
+        self.lock = lock
+
+        self.__stopped = Event()
+        self.__thread = Thread(target=self.__beat, name=f"Heartbeat {lock.key}", daemon=True)
+
+    def __enter__(self) -> "Heartbeat":
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.__stopped.set()
+        self.__thread.join()
+
+    def __beat(self) -> None:
+        while not self.__stopped.wait(self.lock.ttl_ms / 3000):
+            try:
+                if not self.lock.extend():
+                    logger.warning(f"[Heartbeat]: Lease {self.lock.key} was lost")
+                    return
+            except Exception as exception:
+                logger.exception(f"[Heartbeat]: Failed to extend lease {self.lock.key}, Err: {exception}")
+
+
+def singleton(name: Optional[str] = None, ttl_ms: Optional[int] = None) -> Callable:
+    """
+    Runs the decorated function (e.g. a Celery task) on at most one worker at a time.
+
+    Runs hold a lease lock `LOCK:TASK:<name>` kept alive by a heartbeat. Invocations arriving while
+    a run is active are coalesced, they only flag a follow-up, and the active run goes once more
+    after it finishes, however many arrived meanwhile. Coalesced invocations return None.
+    """
+
+    def decorator(function: Callable) -> Callable:
+        task_name = name or f"{function.__module__}.{function.__name__}"
+        follow_up_key = f"TASK_FOLLOW_UP:{task_name}"
+
+        @wraps(function)
+        def wrapper(*args, **kwargs) -> Any:
+            redis_client = RedisClient()
+            lock = RedisLock(name=f"TASK:{task_name}", ttl_ms=ttl_ms or settings.TASK_LOCK_TTL_MS)
+
+            if not lock.acquire():
+                redis_client.set_nx(follow_up_key, lock.token, ttl_ms=settings.TASK_FOLLOW_UP_TTL_MS)
+                logger.info(f"[Singleton]: {task_name} is already running, coalesced into a follow-up run")
+                return None
+
+            while True:
+                # This run covers every invocation which arrived till now
+                redis_client.delete(follow_up_key)
+
+                try:
+                    with Heartbeat(lock):
+                        result = function(*args, **kwargs)
+                finally:
+                    lock.release()
+
+                # Invocations arriving from now on will acquire the lock themselves
+                if not redis_client.delete(follow_up_key) or not lock.acquire():
+                    return result
+
+                logger.info(f"[Singleton]: Running {task_name} again, for the invocations coalesced meanwhile")
+
+        return wrapper
+
+    return decorator
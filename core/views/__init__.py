@@ -1,7 +1,17 @@
 from typing import Union
 
-from core.views.cluster import ClusterAPIView
-from core.views.deployment import DeploymentAPIView
+from core.views.archive import ArchivedDeploymentAPIView
+from core.views.cluster import (
+    ClusterAPIView,
+    ClusterDetailAPIView,
+    ClusterResizeAPIView,
+)
+from core.views.deployment import (
+    DeploymentAPIView,
+    DeploymentBatchAPIView,
+    DeploymentCancelAPIView,
+    DeploymentStatusAPIView,
+)
 from core.views.membership import MembershipAPIView
 from core.views.organization import OrganizationAPIView
 from core.views.resource import ResourceAllocationAPIView
@@ -10,8 +20,14 @@ from core.views.token import TokenAPIView
 Views = Union[
     TokenAPIView,
     ClusterAPIView,
+    ClusterDetailAPIView,
+    ClusterResizeAPIView,
     DeploymentAPIView,
+    DeploymentBatchAPIView,
+    DeploymentCancelAPIView,
+    DeploymentStatusAPIView,
     MembershipAPIView,
     OrganizationAPIView,
     ResourceAllocationAPIView,
+    ArchivedDeploymentAPIView,
 ]
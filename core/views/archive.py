@@ -0,0 +1,62 @@
+from logging import getLogger
+
+from pydantic import ValidationError
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from core.auth.permissions import IsViewer
+from core.errors import BadRequestError
+from core.serializers.archive import ArchivedDeploymentSerializer
+from core.services.archive import ArchiveService
+from core.types.request import ArchivedDeploymentQueryEntity
+from core.utils.mixin import BaseResponseMixin
+from core.utils.pagination import KeysetPaginator
+
+logger = getLogger(__name__)
+
+
+class ArchivedDeploymentAPIView(APIView, BaseResponseMixin):
+    """
+    Handles Reads Of Archived Deployments.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsViewer]
+
+    def get(self, request: Request) -> Response:
+        """
+        Return Archived Deployments, Newest First
+        """
+
+        try:
+            query = ArchivedDeploymentQueryEntity(**request.query_params.dict())
+        except ValidationError as exception:
+            return self.error_response(errors=exception.errors(include_context=False), message="Invalid Query")
+
+        deployments = ArchiveService().list()
+
+        if query.cluster_id is not None:
+            deployments = deployments.filter(cluster_id=query.cluster_id)
+        if query.status is not None:
+            deployments = deployments.filter(status=query.status)
+
+        try:
+            page, next_cursor = KeysetPaginator(deployments, ordering=["-id"], limit=query.limit).page(query.cursor)
+            serialized = ArchivedDeploymentSerializer(page, many=True)
+        except BadRequestError as exception:
+            return self.error_response(message=str(exception))
+        except Exception as exception:
+            logger.exception(f"[ArchivedDeploymentAPIView]: Failed to list archived deployments, Err: {exception}")
+            return self.error_response(
+                errors=str(exception),
+                message="Something went wrong",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        return self.success_response(
+            data={"deployments": serialized.data, "next_cursor": next_cursor}, message="Archived Deployments"
+        )
@@ -1,4 +1,7 @@
+from logging import getLogger
+
 from pydantic import ValidationError
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -6,10 +9,24 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from core.auth.permissions import IsAdmin
+from core.errors import BadRequestError, ResourceDoesNotExistsError
 from core.serializers.cluster import ClusterSerializer
 from core.services.cluster import ClusterService
-from core.types.request import ClusterRequestEntity
+from core.types.request import (
+    ClusterQueryEntity,
+    ClusterRequestEntity,
+    ClusterResizeRequestEntity,
+)
+from core.utils.cache import (
+    CLUSTERS_SCOPE,
+    ResponseCache,
+    cluster_scope,
+    organization_scope,
+)
 from core.utils.mixin import BaseResponseMixin
+from core.utils.pagination import KeysetPaginator
+
+logger = getLogger(__name__)
 
 
 class ClusterAPIView(APIView, BaseResponseMixin):
@@ -20,22 +37,50 @@ class ClusterAPIView(APIView, BaseResponseMixin):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated, IsAdmin]
 
-    def list(self, request: Request) -> Response:
+    def get(self, request: Request) -> Response:
         """
-        Return All Cluster Metadata
+        Return Clusters With Their Available Resources, Newest First
         """
 
-        _ = request
-        service = ClusterService()
+        try:
+            query = ClusterQueryEntity(**request.query_params.dict())
+        except ValidationError as exception:
+            return self.error_response(errors=exception.errors(include_context=False), message="Invalid Query")
+
+        clusters = ClusterService().list_available()
+
+        if query.organization_id is not None:
+            clusters = clusters.filter(organization_id=query.organization_id)
+        if query.min_cpu is not None:
+            clusters = clusters.filter(cpu_available__gte=query.min_cpu)
+        if query.min_ram is not None:
+            clusters = clusters.filter(ram_available__gte=query.min_ram)
+        if query.min_gpu is not None:
+            clusters = clusters.filter(gpu_available__gte=query.min_gpu)
+
+        def compute() -> dict:
+            page, next_cursor = KeysetPaginator(clusters, ordering=["-id"], limit=query.limit).page(query.cursor)
+            return {"clusters": ClusterSerializer(page, many=True).data, "next_cursor": next_cursor}
 
         try:
-            clusters = service.list()
-            serialized = ClusterSerializer(clusters, many=True)
-            return self.success_response(
-                data=serialized.data, message="Clusters Metadata"
+            # Listings of an organization are invalidated only by writes to its clusters
+            data = ResponseCache().get_or_set(
+                namespace="clusters",
+                params=query.model_dump(mode="json"),
+                scopes=[CLUSTERS_SCOPE if query.organization_id is None else organization_scope(query.organization_id)],
+                compute=compute,
             )
+        except BadRequestError as exception:
+            return self.error_response(message=str(exception))
         except Exception as exception:
-            return self.error_response(errors=exception, message="Something went wrong")
+            logger.exception(f"[ClusterAPIView]: Failed to list clusters, Err: {exception}")
+            return self.error_response(
+                errors=str(exception),
+                message="Something went wrong",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        return self.success_response(data=data, message="Clusters Metadata")
 
     def post(self, request: Request) -> Response:
         """
@@ -53,3 +98,83 @@ class ClusterAPIView(APIView, BaseResponseMixin):
         return self.success_response(
             data={"id": new_cluster.id}, message="Cluster created successfully"
         )
+
+
+class ClusterResizeAPIView(APIView, BaseResponseMixin):
+    """
+    Handles Resizing Of Clusters.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request: Request, cluster_id: int) -> Response:
+        """
+        Change Total Capacity Of Cluster And Re-Check Its Parked Deployments
+        """
+
+        try:
+            payload = ClusterResizeRequestEntity(**request.data)
+        except ValidationError as exception:
+            return self.error_response(errors=exception, message="Invalid Payload")
+
+        service = ClusterService()
+
+        try:
+            cluster = service.resize(cluster_id=cluster_id, payload=payload)
+        except ResourceDoesNotExistsError as exception:
+            return self.error_response(message=str(exception), status_code=status.HTTP_404_NOT_FOUND)
+        except BadRequestError as exception:
+            return self.error_response(message=str(exception))
+
+        return self.success_response(
+            data=ClusterSerializer(cluster).data, message="Cluster resized successfully"
+        )
+
+
+class ClusterDetailAPIView(APIView, BaseResponseMixin):
+    """
+    Handles Reads And Deletion Of Clusters.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request: Request, cluster_id: int) -> Response:
+        """
+        Return Cluster With Its Available Resources
+        """
+
+        _ = request
+        service = ClusterService()
+
+        def compute() -> dict:
+            cluster = service.list_available().filter(id=cluster_id).first()
+            if cluster is None:
+                raise ResourceDoesNotExistsError("Cluster does not exists")
+
+            return ClusterSerializer(cluster).data
+
+        try:
+            data = ResponseCache().get_or_set(
+                namespace="cluster", params={"cluster_id": cluster_id}, scopes=[cluster_scope(cluster_id)], compute=compute
+            )
+        except ResourceDoesNotExistsError as exception:
+            return self.error_response(message=str(exception), status_code=status.HTTP_404_NOT_FOUND)
+
+        return self.success_response(data=data, message="Cluster Metadata")
+
+    def delete(self, request: Request, cluster_id: int) -> Response:
+        """
+        Soft Delete Cluster, Cancel Its Unfinished Deployments And Release Their Resources
+        """
+
+        _ = request
+        service = ClusterService()
+
+        try:
+            purged = service.delete(cluster_id=cluster_id)
+        except ResourceDoesNotExistsError as exception:
+            return self.error_response(message=str(exception), status_code=status.HTTP_404_NOT_FOUND)
+
+        return self.success_response(data=purged, message="Cluster deleted successfully")
@@ -1,4 +1,5 @@
 from pydantic import ValidationError
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -6,9 +7,17 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from core.auth.permissions import IsAdmin
+from core.errors import BadRequestError, ResourceDoesNotExistsError
+from core.serializers.deployment import DeploymentSerializer
 from core.services.deployment import DeploymentService
-from core.types.request import NewDeploymentRequestEntity
+from core.types.request import (
+    BulkDeploymentRequestEntity,
+    BulkDeploymentStatusRequestEntity,
+    DeploymentQueryEntity,
+    NewDeploymentRequestEntity,
+)
 from core.utils.mixin import BaseResponseMixin
+from core.utils.pagination import KeysetPaginator
 
 
 class DeploymentAPIView(APIView, BaseResponseMixin):
@@ -19,6 +28,56 @@ class DeploymentAPIView(APIView, BaseResponseMixin):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated, IsAdmin]
 
+    def get(self, request: Request) -> Response:
+        """
+        Return Deployments, Ordered By Status, Priority And Queue Time
+        """
+
+        try:
+            query = DeploymentQueryEntity(**request.query_params.dict())
+        except ValidationError as exception:
+            return self.error_response(errors=exception.errors(include_context=False), message="Invalid Query")
+
+        deployments = DeploymentService().list().filter(is_deleted=False)
+
+        # NOTE: Paged in the order of the (status, priority, queued_at) index, the status is left out of the
+        # keyset once it's filtered, so that the index is still read as a range within it
+        ordering = ["priority", "queued_at", "id"]
+
+        if query.status is not None:
+            deployments = deployments.filter(status=query.status)
+        else:
+            ordering.insert(0, "status")
+
+        if query.cluster_id is not None:
+            deployments = deployments.filter(cluster_id=query.cluster_id)
+        if query.organization_id is not None:
+            deployments = deployments.filter(cluster__organization_id=query.organization_id)
+        if query.min_priority is not None:
+            deployments = deployments.filter(priority__gte=query.min_priority)
+        if query.max_priority is not None:
+            deployments = deployments.filter(priority__lte=query.max_priority)
+        if query.queued_after is not None:
+            deployments = deployments.filter(queued_at__gte=query.queued_after)
+        if query.queued_before is not None:
+            deployments = deployments.filter(queued_at__lt=query.queued_before)
+
+        if query.fields is not None:
+            unknown = set(query.fields) - set(DeploymentSerializer().fields)
+            if unknown:
+                return self.error_response(errors=sorted(unknown), message="Unknown Fields")
+
+            # Only what's returned, and what the cursor is made of, is read
+            deployments = deployments.only(*query.fields, *ordering)
+
+        try:
+            page, next_cursor = KeysetPaginator(deployments, ordering=ordering, limit=query.limit).page(query.cursor)
+        except BadRequestError as exception:
+            return self.error_response(message=str(exception))
+
+        serialized = DeploymentSerializer(page, many=True, fields=query.fields)
+        return self.success_response(data={"deployments": serialized.data, "next_cursor": next_cursor}, message="Deployments")
+
     def post(self, request: Request) -> Response:
         """
         Create `Deployment` State
@@ -35,3 +94,82 @@ class DeploymentAPIView(APIView, BaseResponseMixin):
         return self.success_response(
             data={"id": new_deployment.id}, message="Deployment created successfully"
         )
+
+
+class DeploymentBatchAPIView(APIView, BaseResponseMixin):
+    """
+    Handles Submission Of Deployments, In Bulk.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request: Request) -> Response:
+        """
+        Create Many `Deployment` States At Once
+        """
+
+        try:
+            payload = BulkDeploymentRequestEntity(**request.data)
+        except ValidationError as exception:
+            return self.error_response(errors=exception.errors(include_context=False), message="Invalid Payload")
+
+        service = DeploymentService()
+        results = service.create_many(payloads=payload.deployments)
+
+        created = sum(1 for result in results if "id" in result)
+        return self.success_response(data=results, message=f"{created} deployments created")
+
+
+class DeploymentCancelAPIView(APIView, BaseResponseMixin):
+    """
+    Handles Cancellation Of Deployment.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request: Request, deployment_id: int) -> Response:
+        """
+        Cancel `Deployment` And Free Its Resources
+        """
+
+        _ = request
+        service = DeploymentService()
+
+        try:
+            deployment = service.cancel(deployment_id=deployment_id)
+        except ResourceDoesNotExistsError as exception:
+            return self.error_response(message=str(exception), status_code=status.HTTP_404_NOT_FOUND)
+        except BadRequestError as exception:
+            return self.error_response(message=str(exception))
+
+        return self.success_response(
+            data={"id": deployment.id, "status": deployment.status}, message="Deployment cancelled successfully"
+        )
+
+
+class DeploymentStatusAPIView(APIView, BaseResponseMixin):
+    """
+    Handles Terminal Status Updates Of Deployments, In Bulk.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request: Request) -> Response:
+        """
+        Mark `Deployment`s As Completed/Failed And Free Their Resources
+        """
+
+        try:
+            payload = BulkDeploymentStatusRequestEntity(**request.data)
+        except ValidationError as exception:
+            return self.error_response(errors=exception, message="Invalid Payload")
+
+        service = DeploymentService()
+        result = service.bulk_finalize(transitions=payload.transitions)
+
+        return self.success_response(
+            data=result, message=f"{len(result['finalized'])} deployments finalized"
+        )
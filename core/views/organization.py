@@ -1,4 +1,7 @@
+from logging import getLogger
+
 from pydantic import ValidationError
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -6,10 +9,15 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from core.auth.permissions import IsAdmin
+from core.errors import BadRequestError
 from core.serializers.organization import OrganizationSerializer
 from core.services.organization import OrganizationService
-from core.types.request import OrganizationRequestEntity
+from core.types.request import OrganizationQueryEntity, OrganizationRequestEntity
+from core.utils.cache import ORGANIZATIONS_SCOPE, ResponseCache
 from core.utils.mixin import BaseResponseMixin
+from core.utils.pagination import KeysetPaginator
+
+logger = getLogger(__name__)
 
 
 class OrganizationAPIView(APIView, BaseResponseMixin):
@@ -22,20 +30,38 @@ class OrganizationAPIView(APIView, BaseResponseMixin):
 
     def get(self, request: Request) -> Response:
         """
-        Return All Organization Metadata
+        Return Organizations With Their Invite Codes, Newest First
         """
 
-        _ = request
-        service = OrganizationService()
+        try:
+            query = OrganizationQueryEntity(**request.query_params.dict())
+        except ValidationError as exception:
+            return self.error_response(errors=exception.errors(include_context=False), message="Invalid Query")
+
+        organizations = OrganizationService().list_with_invite_codes()
+
+        def compute() -> dict:
+            page, next_cursor = KeysetPaginator(organizations, ordering=["-id"], limit=query.limit).page(query.cursor)
+            return {"organizations": OrganizationSerializer(page, many=True).data, "next_cursor": next_cursor}
 
         try:
-            organizations = service.list()
-            serialized = OrganizationSerializer(organizations, many=True)
-            return self.success_response(
-                data=serialized.data, message="Organizations Metadata"
+            data = ResponseCache().get_or_set(
+                namespace="organizations",
+                params=query.model_dump(mode="json"),
+                scopes=[ORGANIZATIONS_SCOPE],
+                compute=compute,
             )
+        except BadRequestError as exception:
+            return self.error_response(message=str(exception))
         except Exception as exception:
-            return self.error_response(errors=exception, message="Something went wrong")
+            logger.exception(f"[OrganizationAPIView]: Failed to list organizations, Err: {exception}")
+            return self.error_response(
+                errors=str(exception),
+                message="Something went wrong",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        return self.success_response(data=data, message="Organizations Metadata")
 
     def post(self, request: Request) -> Response:
         """
@@ -1,4 +1,5 @@
 from pydantic import ValidationError
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -6,6 +7,7 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from core.auth.permissions import IsAdmin
+from core.errors import BadRequestError, ResourceDoesNotExistsError
 from core.services.resource import ResourceAllocationService
 from core.types.request import ResourceAllocationRequestEntity
 from core.utils.mixin import BaseResponseMixin
@@ -30,7 +32,13 @@ class ResourceAllocationAPIView(APIView, BaseResponseMixin):
             return self.error_response(errors=exception, message="Invalid Payload")
 
         service = ResourceAllocationService()
-        allocation = service.create(payload=payload)
+
+        try:
+            allocation = service.create(payload=payload)
+        except ResourceDoesNotExistsError as exception:
+            return self.error_response(message=str(exception), status_code=status.HTTP_404_NOT_FOUND)
+        except BadRequestError as exception:
+            return self.error_response(message=str(exception))
 
         return self.success_response(
             data={"id": allocation.id}, message="Resource allocated successfully"
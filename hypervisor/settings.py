@@ -103,6 +103,11 @@ SIMPLE_JWT = {
 }
 
 # Redis Configuration
+REDIS_HOST = "localhost"
+REDIS_PORT = 6379
+REDIS_DB = 0  # Queues, capacity ledger, locks and caches
+REDIS_TEST_DB = 14  # Used instead of `REDIS_DB` while running tests (See `core.base.runner.TestRunner`)
+
 CELERY_BROKER_URL = "redis://localhost:6379/0"
 CELERY_RESULT_BACKEND = "redis://localhost:6379/1"
 
@@ -114,6 +119,48 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TIMEZONE = "UTC"
 CELERY_BEAT_SCHEDULE = CELERY_BEAT_SCHEDULE_CONFIG
 
+# Periodic tasks run one at a time, overlapping runs are coalesced into a single follow-up run
+TASK_LOCK_TTL_MS = 60_000  # Lease of a running task, renewed by its heartbeat and expires if the worker dies
+TASK_FOLLOW_UP_TTL_MS = 3_600_000  # Expiry of a pending follow-up run request
+
+# Scheduler Settings
+# One of `GREEDY`, `BEST_FIT_DECREASING`, `KNAPSACK` or `BACKFILL` (See `core.constants.PlacementStrategy`)
+SCHEDULER_PLACEMENT_STRATEGY = "GREEDY"
+SCHEDULER_KNAPSACK_MAX_ITEMS = 16  # Candidates per cluster considered by the exact knapsack search
+SCHEDULER_KNAPSACK_MAX_NODES = 50_000  # Search nodes explored per cluster before falling back to greedy
+SCHEDULER_BACKFILL_DEFAULT_DURATION = 3600  # Seconds, estimated run time of deployments without any history
+SCHEDULER_EVENTS_ENABLED = True  # Capacity change events trigger scheduling runs, else only the periodic run does
+SCHEDULER_EVENT_DEBOUNCE_MS = 50  # Capacity change events of a cluster within this window trigger a single run
+SCHEDULER_EVENT_PENDING_TTL_MS = 30_000  # Pending run marker expiry, in case the dispatched run is lost
+SCHEDULER_LOCK_TTL_MS = 120_000  # Lease of a cluster's scheduling lock, expires if the worker dies
+SCHEDULER_LOCK_RETRY_DELAY = 1  # Seconds, before retrying a cluster which is being scheduled by another worker
+SCHEDULER_LOCK_MAX_RETRIES = 120
+SCHEDULER_CLEANUP_BATCH_SIZE = 500  # Terminal deployments released per batch by the cleanup job
+SCHEDULER_PREEMPTION_ENABLED = False  # Preempt lower priority running deployments for blocked higher priority ones
+SCHEDULER_PREEMPTION_MAX_PER_CYCLE = 1  # Blocked deployments per cluster per cycle which may preempt others
+SCHEDULER_PREEMPTION_MAX_VICTIMS = 3  # Running deployments evicted at most for a single preemption
+SCHEDULER_PREEMPTION_MAX_CANDIDATES = 24  # Lowest priority running deployments considered as victims
+
+# Queue Expiry Settings
+DEPLOYMENT_QUEUE_TTL = None  # Seconds a deployment may wait in queue by default (`queue_ttl` overrides), None waits forever
+DEPLOYMENT_EXPIRY_BATCH_SIZE = 500  # Overdue deployments failed per transaction
+DEPLOYMENT_EXPIRY_MAX_BATCHES = 100  # Batches failed per expiry run
+
+# Lifecycle Events Settings
+LIFECYCLE_STREAM_MAX_LEN = 100_000  # Approximate length the `LIFECYCLE_EVENTS` stream is trimmed to
+LIFECYCLE_RELAY_BATCH_SIZE = 500  # Outbox events published per Redis round trip
+LIFECYCLE_OUTBOX_RETENTION = 86_400  # Seconds, published outbox events are purged after this
+
+# Archival Settings
+ARCHIVE_AFTER = 30 * 86_400  # Seconds, finalized deployments older than this are moved to the archive tables
+ARCHIVE_BATCH_SIZE = 500  # Deployments moved per transaction
+ARCHIVE_MAX_BATCHES = 100  # Batches moved per archival run
+
+# Response Cache Settings
+RESPONSE_CACHE_ENABLED = True  # Read endpoints are cached in Redis, and invalidated by the writes
+RESPONSE_CACHE_TTL = 60  # Seconds, expiry of cached responses of namespaces without their own TTL
+RESPONSE_CACHE_TTLS = {"clusters": 30, "cluster": 30, "organizations": 300}  # Seconds, expiry per namespace
+
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
@@ -125,6 +172,10 @@ DATABASES = {
 }
 
 
+# Test runner
+TEST_RUNNER = "core.base.runner.TestRunner"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 